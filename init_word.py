@@ -1,17 +1,24 @@
 import argparse
+import concurrent.futures
 import csv
+import functools
+import itertools
 import logging
 import os
 import sys
+import time
+import typing
 from pathlib import Path
 
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm.session import Session
-
 from word_way.app import create_app
-from word_way.scrapping.word import save_word
+from word_way.config import current_config, load_config
+from word_way.scrapping.bulk import insert_relations
+from word_way.scrapping.client import get_dictionary_client
+from word_way.scrapping.pipeline import ScrappingPipeline
+from word_way.scrapping.word_parser import get_parser_pool
 from word_way.context import create_session
 from word_way.models import SynonymsWordRelation
+from word_way.search.graph import relation_graph_path, update_relation_graph
 
 parser = argparse.ArgumentParser(
     formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -22,69 +29,269 @@ parser.add_argument(
     '-l', '--line', type=int, default=0,
     help='Options to determine which line synonyms.tsv should be read from'
 )
+parser.add_argument(
+    '-w', '--workers', type=int, default=1,
+    help='Number of processes saving rows concurrently'
+)
+parser.add_argument(
+    '--checkpoint', type=str, default='synonyms.checkpoint',
+    help='File that records saved rows; saved rows are skipped on restart'
+)
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+#: (:class:`int`) 작업 프로세스마다 미리 넘겨둘 줄 수
+ROWS_PER_WORKER = 4
+
+#: (:class:`word_way.scrapping.pipeline.ScrappingPipeline`)
+#: 작업 프로세스에서 사용할 파이프라인
+worker_pipeline = None
+
+
+class Checkpoint:
+    """저장을 마친 synonyms.tsv 의 줄 번호를 파일에 한 줄씩 기록합니다.
+
+    :param path: 기록할 파일 경로
+    :type path: :class:`str`
+
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.done = set()
+        if self.path.exists():
+            with open(self.path) as f:
+                self.done.update(int(line) for line in f if line.strip())
+        self.file = open(self.path, 'a', buffering=1)
+
+    def __contains__(self, row_num: int) -> bool:
+        return row_num in self.done
+
+    def add(self, row_num: int) -> None:
+        self.done.add(row_num)
+        self.file.write(f'{row_num}\n')
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class Progress:
+    """처리 속도와 남은 시간을 주기적으로 출력합니다.
+
+    :param total: 처리할 줄 수
+    :type total: :class:`int`
+    :param interval: 출력 간격 (초)
+    :type interval: :class:`float`
+
+    """
+
+    def __init__(self, total: int, interval: float = 10.0):
+        self.total = total
+        self.interval = interval
+        self.rows = 0
+        self.api_calls = 0
+        self.started_at = self.reported_at = time.monotonic()
+
+    def update(self, api_calls: int) -> None:
+        self.rows += 1
+        self.api_calls += api_calls
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval or self.rows == self.total:
+            self.reported_at = now
+            self.report()
+
+    def report(self) -> None:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        rows_per_second = self.rows / elapsed
+        eta = (self.total - self.rows) / rows_per_second \
+            if rows_per_second else float('inf')
+        logger.info(
+            f'{self.rows}/{self.total} rows, {rows_per_second:.2f} rows/s, '
+            f'{self.api_calls / elapsed:.2f} API calls/s, ETA {eta:.0f}s'
+        )
+
 
 def main():
     args = parser.parse_args()
-    wsgi_app = create_app(args.config)
-    with wsgi_app.app_context():
-        config = wsgi_app.config['APP_CONFIG']
-        session = create_session(config)
-        scrap_synonyms(session, args.line)
+    scrap_synonyms(
+        args.config, args.line, args.workers, Checkpoint(args.checkpoint),
+    )
 
 
-def scrap_synonyms(session: Session, start_line: int):
+def read_rows(
+    start_line: int, checkpoint: Checkpoint,
+) -> typing.List[typing.Tuple[int, typing.List[str]]]:
+    """synonyms.tsv 에서 아직 저장하지 않은 ``(줄 번호, 단어 목록)`` 을 읽습니다."""
+    synset_list_dir = Path('synonyms.tsv').resolve()
+    with open(synset_list_dir, newline='') as f:
+        return [
+            (row_num, [l.strip() for l in row[3].split(',')])
+            for row_num, row in enumerate(csv.reader(f, delimiter='\t'))
+            if row_num >= start_line and row_num not in checkpoint
+        ]
+
+
+def scrap_synonyms(
+    config_name: str, start_line: int, workers: int, checkpoint: Checkpoint,
+):
     """synonyms.tsv 파일을 읽어 유의어 및 단어 정보를 저장하는 함수
 
-    :param session: 사용할 세션
-    :type session: :class:`sqlalchemy.orm.session.Session`
+    ``workers`` 가 2 이상이면 줄을 여러 프로세스에 나눠서 저장합니다.
+    저장을 마친 줄은 ``checkpoint`` 에 기록하고 다시 실행할 때 건너뜁니다.
+
+    :param config_name: 사용할 설정 이름
+    :type config_name: :class:`str`
     :param start_line: 파일 읽기 시작할 라인
     :type start_line: :class:`int`
+    :param workers: 동시에 저장할 프로세스 수
+    :type workers: :class:`int`
+    :param checkpoint: 저장을 마친 줄 기록
+    :type checkpoint: :class:`Checkpoint`
 
     """
-    log = logger.getChild('scrap_synonyms')
-    synset_list_dir = Path('synonyms.tsv').resolve()
+    rows = read_rows(start_line, checkpoint)
+    progress = Progress(len(rows))
+    logger.info(f'{len(checkpoint.done)} rows were already saved')
+    try:
+        if workers > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=init_worker, initargs=(config_name,),
+            ) as executor:
+                failures = save_rows(
+                    rows, save_row, checkpoint, progress,
+                    executor, workers * ROWS_PER_WORKER,
+                )
+        else:
+            init_worker(config_name)
+            failures = save_rows(rows, save_row, checkpoint, progress)
+    finally:
+        checkpoint.close()
+        # 중간에 멈추더라도 저장한 줄까지는 관계 그래프에 반영합니다.
+        config = load_config(config_name)
+        path = relation_graph_path(config)
+        if path is not None:
+            logger.info(f'Updating the relation graph ({path})')
+            session = create_session(config)
+            try:
+                update_relation_graph(session, path)
+            finally:
+                session.close()
+    if failures:
+        logger.warning(
+            f'Failed to save {failures} rows; run again to retry them'
+        )
 
-    with open(synset_list_dir, newline='') as f:
-        rows = csv.reader(f, delimiter='\t')
-        for row_num, row in enumerate(rows):
-            if row_num < start_line:
-                continue
-            lemmas_list = [l.strip() for l in row[3].split(',')]
-            log.info(f'Start saving the row {row_num} ({lemmas_list})')
-            pronunciation_ids = []
-            for lemmas in lemmas_list:
-                log.info(f'Start saving the words ({lemmas})')
-                pronunciation_id = save_word(lemmas, session)
-                if pronunciation_id:
-                    pronunciation_ids.append(pronunciation_id)
-                log.info(f'Done saving the words ({lemmas})')
-            pronunciation_ids = list(set(pronunciation_ids))
-            if len(pronunciation_ids) < 2:
-                continue
-            for i in range(len(pronunciation_ids)):
-                synonyms_ids = pronunciation_ids[:]
-                criteria_id = synonyms_ids.pop(i)
-                log.info(f'Start saving the synonyms ({criteria_id})')
-                for synonyms_id in synonyms_ids:
-                    relation = SynonymsWordRelation(
-                        criteria_id=criteria_id, relation_id=synonyms_id,
-                    )
-                    session.add(relation)
-                    try:
-                        session.flush()
-                        log.info(f'Done saving the relationship'
-                                 f' ({relation.__dict__})')
-                    except IntegrityError:
-                        session.rollback()
-                        log.warning(f'The relationship ({relation.__dict__})'
-                                    ' already exists')
-                log.info(f'Done saving the synonyms ({criteria_id})')
-            session.commit()
-            log.info(f'Done saving the row {row_num} ({lemmas_list})')
+
+def save_rows(
+    rows: typing.Iterable[typing.Tuple[int, typing.List[str]]],
+    save: typing.Callable[[int, typing.List[str]], typing.Tuple[int, int]],
+    checkpoint: Checkpoint,
+    progress: Progress,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    window: int = 1,
+) -> int:
+    """``save`` 로 줄을 저장하고 저장을 마친 줄을 ``checkpoint`` 에 기록합니다.
+
+    실패한 줄은 로그만 남기고 건너뛰며 ``checkpoint`` 에 기록하지 않으므로
+    다시 실행하면 다시 저장합니다.  ``executor`` 를 넘기면 최대 ``window``
+    줄만 미리 넘겨두므로, 멈췄을 때 기다려야 하는 줄이 많지 않습니다.
+
+    :return: 저장에 실패한 줄 수
+    :rtype: :class:`int`
+
+    """
+    failures = 0
+
+    def done(row_num: int, result: typing.Callable[[], tuple]) -> None:
+        nonlocal failures
+        try:
+            _, api_calls = result()
+        except Exception:
+            logger.exception(f'Failed to save the row {row_num}')
+            failures += 1
+        else:
+            checkpoint.add(row_num)
+            progress.update(api_calls)
+
+    if executor is None:
+        for row in rows:
+            done(row[0], functools.partial(save, *row))
+        return failures
+    rows = iter(rows)
+    pending = {}
+    try:
+        while True:
+            for row in itertools.islice(rows, window - len(pending)):
+                pending[executor.submit(save, *row)] = row[0]
+            if not pending:
+                return failures
+            finished, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in finished:
+                done(pending.pop(future), future.result)
+    finally:
+        # 예외로 멈추면 아직 시작하지 않은 줄은 취소합니다.
+        for future in pending:
+            future.cancel()
+
+
+def init_worker(config_name: str) -> None:
+    global worker_pipeline
+    wsgi_app = create_app(config_name)
+    wsgi_app.app_context().push()
+    config = wsgi_app.config['APP_CONFIG']
+    # 이미 저장된 발음과 단어를 미리 읽어서 줄마다 조회하지 않도록 합니다.
+    worker_pipeline = ScrappingPipeline(
+        create_session(config),
+        get_dictionary_client(config),
+        get_parser_pool(config),
+        preload=True,
+    )
+
+
+def save_row(
+    row_num: int, lemmas_list: typing.List[str],
+) -> typing.Tuple[int, int]:
+    """한 줄을 저장하고 ``(줄 번호, API 요청 수)`` 를 반환합니다."""
+    stats = get_dictionary_client(current_config).stats
+    requests = stats.requests
+    try:
+        save_synonyms(worker_pipeline, row_num, lemmas_list)
+    except Exception:
+        # 다음 줄을 저장할 수 있도록 실패한 트랜잭션을 버립니다.
+        worker_pipeline.session.rollback()
+        raise
+    return row_num, stats.requests - requests
+
+
+def save_synonyms(
+    pipeline: ScrappingPipeline, row_num: int, lemmas_list: typing.List[str],
+):
+    """한 줄의 단어들을 저장하고 서로 유의어 관계로 연결하는 함수
+
+    :param pipeline: 단어를 저장할 파이프라인
+    :type pipeline: :class:`word_way.scrapping.pipeline.ScrappingPipeline`
+    :param row_num: synonyms.tsv 의 줄 번호
+    :type row_num: :class:`int`
+    :param lemmas_list: 유의어 목록
+    :type lemmas_list: typing.List[str]
+
+    """
+    log = logger.getChild('save_synonyms')
+    log.info(f'Start saving the row {row_num} ({lemmas_list})')
+    pronunciation_ids = pipeline.save_batch(list(dict.fromkeys(lemmas_list)))
+    # 서로 다른 두 발음의 모든 순서쌍을 유의어 관계로 저장합니다.
+    pairs = itertools.permutations(
+        {id_ for id_ in pronunciation_ids.values() if id_}, 2,
+    )
+    new_pairs = insert_relations(
+        pipeline.session, SynonymsWordRelation, pairs,
+    )
+    pipeline.session.commit()
+    log.info(f'Saved {len(new_pairs)} synonym relations')
+    log.info(f'Done saving the row {row_num} ({lemmas_list})')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,173 @@
+"""검색 결과 한 페이지를 불러오는 두 가지 방법의 속도와 메모리를 비교합니다.
+
+ORM 객체와 관계를 ``selectinload`` 로 불러오는 방법과
+:func:`word_way.search.rows.load_pronunciations` 로 필요한 컬럼만 불러오는
+방법으로 같은 응답을 만들어, 요청 하나에 걸린 시간과 메모리 할당 최대치를
+출력합니다.  임시 SQLite 데이터베이스를 만들어서 비교합니다.
+
+    $ python -m scripts.benchmark_search_rows -n 200
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.orm import selectinload
+
+from word_way.context import create_session
+from word_way.enum import WordPart
+from word_way.models import (IncludeWordRelation, Pronunciation,
+                             SynonymsWordRelation, Word)
+from word_way.orm import Base, create_engine
+from word_way.scrapping.bulk import (ensure_pronunciations, insert_relations,
+                                     insert_words)
+from word_way.search.rows import load_pronunciations
+
+parser = argparse.ArgumentParser(
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter
+)
+parser.add_argument('-n', '--size', type=int, default=200,
+                    help='Number of pronunciations in a page')
+parser.add_argument('-r', '--repeat', type=int, default=20,
+                    help='Number of requests to make')
+
+orm_loader_options = (
+    selectinload(Pronunciation.words)
+    .selectinload(Word.word_relation)
+    .selectinload(IncludeWordRelation.related_pronunciations),
+    selectinload(Pronunciation.word_relation)
+    .selectinload(SynonymsWordRelation.related_pronunciations),
+)
+
+
+def create_dataset(session, size: int) -> dict:
+    texts = [f'바다{i}' for i in range(size)]
+    related = [f'관련{i}' for i in range(size)]
+    ids = ensure_pronunciations(session, texts + related)
+    words = insert_words(session, [
+        {
+            'target_code': i * 2 + j, 'part': WordPart.noun,
+            'contents': f'{text}의 뜻 {j}', 'pronunciation_id': ids[text],
+        }
+        for i, text in enumerate(texts) for j in range(2)
+    ])
+    insert_relations(session, SynonymsWordRelation, [
+        (ids[text], ids[related[(i + k) % size]])
+        for i, text in enumerate(texts) for k in range(3)
+    ])
+    insert_relations(session, IncludeWordRelation, [
+        (word['id'], ids[related[(i + k) % size]])
+        for i, word in enumerate(words) for k in range(2)
+    ])
+    session.commit()
+    return {ids[text]: text for text in texts}
+
+
+def load_orm(session, pronunciations: dict) -> list:
+    return [
+        {
+            'id': p.id,
+            'pronunciation': p.pronunciation,
+            'words': [
+                {
+                    'id': word.id,
+                    'contents': word.contents,
+                    'part': word.part,
+                    'related_pronunciations':
+                        word.related_include_pronunciations,
+                }
+                for word in p.words
+            ],
+            'related_words': p.related_synonyms_pronunciations,
+        }
+        for p in session.query(Pronunciation).filter(
+            Pronunciation.id.in_(list(pronunciations)),
+        ).options(*orm_loader_options)
+    ]
+
+
+def load_rows(session, pronunciations: dict) -> list:
+    return [
+        {
+            'id': p.id,
+            'pronunciation': p.pronunciation,
+            'words': [
+                {
+                    'id': word.id,
+                    'contents': word.contents,
+                    'part': word.part,
+                    'related_pronunciations': word.related_pronunciations,
+                }
+                for word in p.words
+            ],
+            'related_words': p.related_words,
+        }
+        for p in load_pronunciations(session, pronunciations).values()
+    ]
+
+
+def measure(config, load, pronunciations: dict, repeat: int):
+    elapsed = []
+    peaks = []
+    for _ in range(repeat):
+        session = create_session(config)
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        load(session, pronunciations)
+        elapsed.append(time.perf_counter() - started_at)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        session.close()
+    return min(elapsed), min(peaks)
+
+
+def main():
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        config = {
+            'DATABASE': {
+                'URL': f'sqlite:///{os.path.join(directory, "bench.db")}',
+            },
+        }
+        Base.metadata.create_all(create_engine(config))
+        session = create_session(config)
+        try:
+            pronunciations = create_dataset(session, args.size)
+        finally:
+            session.close()
+
+        def key(item):
+            return item['id']
+
+        session = create_session(config)
+        try:
+            expected = sorted(load_orm(session, pronunciations), key=key)
+            actual = sorted(load_rows(session, pronunciations), key=key)
+        finally:
+            session.close()
+        for item in expected + actual:
+            item['related_words'].sort()
+            for word in item['words']:
+                word['related_pronunciations'].sort()
+            item['words'].sort(key=lambda word: word['contents'])
+        assert expected == actual, 'results differ'
+
+        results = [
+            (name, *measure(config, load, pronunciations, args.repeat))
+            for name, load in [('orm', load_orm), ('rows', load_rows)]
+        ]
+    for name, elapsed, peak in results:
+        print(
+            f'{name}: {elapsed * 1000:.2f}ms, '
+            f'{peak / 1024:,.0f}KiB peak per {args.size} pronunciations'
+        )
+    (_, orm_elapsed, orm_peak), (_, rows_elapsed, rows_peak) = results
+    print(
+        f'{orm_elapsed / rows_elapsed:.1f}x faster, '
+        f'{orm_peak / rows_peak:.1f}x less memory'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""검색 응답을 만드는 두 가지 직렬화 방법의 속도를 비교합니다.
+
+``jsonify(serialize(...))`` 와 :func:`word_way.api.serializer.json_response`
+로 같은 응답을 만들어 걸린 시간을 출력합니다.  DB 없이 검색 결과와 같은 모양의
+응답을 만들어서 비교합니다.
+
+    $ python -m scripts.benchmark_serializer -n 1000
+"""
+import argparse
+import timeit
+import uuid
+
+from flask import Flask, jsonify
+
+from word_way.api.serializer import json_response, serialize
+from word_way.enum import WordPart
+
+parser = argparse.ArgumentParser(
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter
+)
+parser.add_argument('-n', '--size', type=int, default=1000,
+                    help='Number of pronunciations in the response')
+parser.add_argument('-r', '--repeat', type=int, default=20,
+                    help='Number of responses to make')
+
+
+def create_response(size: int) -> list:
+    return [
+        {
+            'id': uuid.uuid4(),
+            'pronunciation': f'바다{i}',
+            'words': [
+                {
+                    'id': uuid.uuid4(),
+                    'contents': f'지구 위에서 육지를 제외한 부분 {i}-{j}',
+                    'part': WordPart.noun,
+                    'related_pronunciations': ['지구', '육지', '부분'],
+                }
+                for j in range(2)
+            ],
+            'related_words': ['해양', '바닷물'],
+            'priority': i % 3,
+            'score': 1000 - i,
+        }
+        for i in range(size)
+    ]
+
+
+def main():
+    args = parser.parse_args()
+    app = Flask(__name__)
+    response = create_response(args.size)
+    with app.app_context():
+        assert json_response(data=response).get_data() == \
+            jsonify(data=serialize(response)).get_data()
+        results = {}
+        for name, make in [
+            (
+                'jsonify(serialize())',
+                lambda: jsonify(data=serialize(response)),
+            ),
+            ('json_response()', lambda: json_response(data=response)),
+        ]:
+            elapsed = min(timeit.repeat(make, number=1, repeat=args.repeat))
+            results[name] = elapsed
+            print(f'{name}: {elapsed * 1000:.2f}ms per {args.size} items')
+    old, new = results.values()
+    print(f'{old / new:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""형태소 분석기의 속도와 분석 결과를 비교합니다.
+
+저장된 단어의 뜻풀이를 각 분석기로 분석해서 초당 형태소 수와, ``okt`` 가 찾은
+포함어 중 다른 분석기도 찾은 비율을 출력합니다.
+
+    $ python -m scripts.benchmark_tokenizer -c dev -n 5000
+"""
+import argparse
+import os
+import time
+import typing
+
+from word_way.config import load_config
+from word_way.context import create_session
+from word_way.models import Word
+from word_way.scrapping.tokenizer import create_tokenizer, load_vocabulary
+from word_way.scrapping.word_parser import WordParser
+
+parser = argparse.ArgumentParser(
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter
+)
+parser.add_argument('-c', '--config', type=str,
+                    default=str(os.environ.get('WORD_WAY_ENV', 'prod')))
+parser.add_argument('-n', '--limit', type=int, default=5000,
+                    help='Number of definitions to parse')
+parser.add_argument('-t', '--tokenizer', action='append',
+                    default=None, choices=['okt', 'vocabulary'],
+                    help='Tokenizers to compare (default: all)')
+
+
+def include_words(
+    tokens: typing.Sequence[typing.Tuple[str, str]],
+) -> typing.Set[str]:
+    return {
+        token for token, part in tokens
+        if part not in WordParser.unused_parts
+    }
+
+
+def main():
+    args = parser.parse_args()
+    config = load_config(args.config)
+    session = create_session(config)
+    try:
+        definitions = [
+            contents for contents, in session.query(Word.contents).filter(
+                Word.contents.isnot(None),
+            ).limit(args.limit)
+        ]
+        vocabulary = load_vocabulary(session)
+    finally:
+        session.close()
+    print(f'{len(definitions)} definitions, {len(vocabulary)} words')
+
+    results = {}
+    for name in args.tokenizer or ['okt', 'vocabulary']:
+        started_at = time.perf_counter()
+        tokenizer = create_tokenizer(name, vocabulary)
+        loaded_at = time.perf_counter()
+        parsed = [tokenizer.parse(contents) for contents in definitions]
+        elapsed = time.perf_counter() - loaded_at
+        tokens = sum(map(len, parsed))
+        print(
+            f'{name}: loaded in {loaded_at - started_at:.2f}s, '
+            f'{tokens / elapsed:,.0f} tokens/s, '
+            f'{len(definitions) / elapsed:,.0f} definitions/s'
+        )
+        results[name] = [include_words(tokens) for tokens in parsed]
+
+    baseline = results.get('okt')
+    if baseline is None:
+        return
+    for name, words in results.items():
+        if name == 'okt':
+            continue
+        found = sum(len(a & b) for a, b in zip(baseline, words))
+        expected = sum(map(len, baseline))
+        extra = sum(len(b - a) for a, b in zip(baseline, words))
+        print(
+            f'{name}: found {found / expected:.1%} of okt include words, '
+            f'{extra} words okt did not find'
+            if expected else f'{name}: okt found no include words'
+        )
+
+
+if __name__ == '__main__':
+    main()
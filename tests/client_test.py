@@ -0,0 +1,74 @@
+from word_way.scrapping.client import (DictionaryClient, RateLimiter,
+                                       SearchItem, Sense,
+                                       get_dictionary_client)
+
+
+def test_search_and_examples(fx_dictionary_server):
+    fx_dictionary_server.words['바다'] = [
+        ('바-다', [(1, '명사', '넓은 물'), (2, '명사', '많은 것')]),
+    ]
+    fx_dictionary_server.examples[1] = ['바다가 넓다.']
+    client = DictionaryClient(fx_dictionary_server.url, 'token')
+    assert client.search('바다') == [
+        SearchItem('바다', [Sense(1, '명사', '넓은 물'), Sense(2, '명사', '많은 것')]),
+    ]
+    assert client.search('하늘') == []
+    assert client.examples(1) == ['바다가 넓다.']
+    assert client.examples(2) == []
+    path, params = fx_dictionary_server.requests[0]
+    assert path == '/api/search'
+    assert params['key'] == 'token'
+    client.close()
+
+
+def test_retry(fx_dictionary_server):
+    fx_dictionary_server.failures = [503, 429]
+    client = DictionaryClient(fx_dictionary_server.url, 'token', backoff=0)
+    assert client.search('바다') == []
+    assert len(fx_dictionary_server.requests) == 3
+    fx_dictionary_server.failures = [503] * 3
+    client = DictionaryClient(
+        fx_dictionary_server.url, 'token', max_retries=2, backoff=0,
+    )
+    assert client.search('바다') is None
+    stats = client.stats.as_dict()
+    assert stats['requests'] == 1
+    assert stats['failures'] == 1
+    client.close()
+
+
+def test_retry_waits_for_rate_limiter(fx_dictionary_server, monkeypatch):
+    waits = []
+    wait = RateLimiter.wait
+
+    def counting_wait(self):
+        waits.append(self)
+        wait(self)
+
+    monkeypatch.setattr(RateLimiter, 'wait', counting_wait)
+    fx_dictionary_server.failures = [503, 429]
+    client = DictionaryClient(
+        fx_dictionary_server.url, 'token', backoff=0, rate_limit=1000,
+    )
+    assert client.search('바다') == []
+    # 재시도도 호스트별 초당 요청 수 제한을 거칩니다.
+    assert len(waits) == len(fx_dictionary_server.requests) == 3
+    assert client.stats.as_dict()['requests'] == 1
+    client.close()
+
+
+def test_map_reuses_connections(fx_dictionary_server):
+    client = DictionaryClient(fx_dictionary_server.url, 'token', concurrency=2)
+    words = [f'단어{i}' for i in range(20)]
+    assert client.map(client.search, words) == [[]] * 20
+    assert len(fx_dictionary_server.requests) == 20
+    assert len(fx_dictionary_server.connections) <= 2
+    assert client.stats.as_dict()['requests'] == 20
+    client.close()
+
+
+def test_get_dictionary_client(app):
+    config = app.config['APP_CONFIG']
+    client = get_dictionary_client(config)
+    assert get_dictionary_client(config) is client
+    assert client.concurrency == int(config['SCRAPPING']['CONCURRENCY'])
@@ -0,0 +1,121 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from pytest import fixture
+
+from word_way.app import create_app
+from word_way.context import create_session
+from word_way.orm import Base, create_engine
+from word_way.scrapping.tokenizer import Tokenizer
+from word_way.scrapping.word_parser import ParserPool
+
+
+@fixture
+def app(tmp_path):
+    os.environ.setdefault('WORD_API_TOKEN', 'test')
+    app = create_app('test')
+    config = app.config['APP_CONFIG']
+    config['DATABASE']['URL'] = f'sqlite:///{tmp_path}/word-way.db'
+    Base.metadata.create_all(create_engine(config))
+    return app
+
+
+@fixture
+def fx_session(app):
+    session = create_session(app.config['APP_CONFIG'])
+    yield session
+    session.close()
+
+
+@fixture
+def client(app):
+    return app.test_client()
+
+
+class FakeTokenizer(Tokenizer):
+    """형태소 분석기 대신 공백으로 단어를 나눕니다."""
+
+    def parse(self, contents):
+        return [(token, 'Noun') for token in contents.split()]
+
+
+@fixture
+def fx_parser_pool():
+    return ParserPool(0, FakeTokenizer)
+
+
+class DictionaryHandler(BaseHTTPRequestHandler):
+    """우리말샘 API 를 흉내내는 테스트 서버의 요청 처리기."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        with server.lock:
+            server.requests.append((url.path, params))
+            server.connections.add(self.client_address)
+            status = server.failures.pop(0) if server.failures else 200
+        if status != 200:
+            body = b''
+        elif url.path.endswith('/search'):
+            body = self.search_body(params['q'])
+        elif url.path.endswith('/view'):
+            body = self.view_body(int(params['q']))
+        else:
+            status, body = 404, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def search_body(self, word):
+        items = ''.join(
+            f'<item><word>{pronunciation}</word>' + ''.join(
+                f'<sense><target_code>{target_code}</target_code>'
+                f'<pos>{part}</pos><definition>{definition}</definition>'
+                '</sense>'
+                for target_code, part, definition in senses
+            ) + '</item>'
+            for pronunciation, senses in self.server.words.get(word, [])
+        )
+        return f'<channel>{items}</channel>'.encode()
+
+    def view_body(self, target_code):
+        examples = ''.join(
+            f'<example_info><example>{example}</example></example_info>'
+            for example in self.server.examples.get(target_code, [])
+        )
+        return (
+            f'<channel><item><senseInfo>{examples}</senseInfo></item>'
+            '</channel>'
+        ).encode()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@fixture
+def fx_dictionary_server():
+    """``words``, ``examples`` 에 응답할 내용을, ``failures`` 에 먼저 돌려줄
+    실패 상태 코드를 채워서 사용합니다.
+
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DictionaryHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.words = {}
+    server.examples = {}
+    server.failures = []
+    server.requests = []
+    server.connections = set()
+    server.url = f'http://127.0.0.1:{server.server_port}/api/'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
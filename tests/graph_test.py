@@ -0,0 +1,149 @@
+import os
+import uuid
+
+from word_way.models import IncludeWordRelation, SynonymsWordRelation
+from word_way.scrapping.bulk import (ensure_pronunciations, insert_relations,
+                                     insert_words)
+from word_way.enum import WordPart
+from word_way.search.graph import (RelationGraph, clear_update_pending,
+                                   get_relation_graph, mark_update_pending,
+                                   update_relation_graph, write_relation_graph)
+from word_way.utils import utc_now
+
+
+def test_write_relation_graph(tmp_path):
+    sea, ocean, water = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    path = str(tmp_path / 'graph.bin')
+    built_at = utc_now()
+    write_relation_graph(
+        path,
+        {sea: '바다', ocean: '해양', water: '물', uuid.uuid4(): '불'},
+        [(sea, ocean), (ocean, sea)],
+        [(sea, water)],
+        built_at,
+    )
+    graph = RelationGraph.load(path)
+    assert len(graph) == 3
+    assert graph.built_at == built_at
+    assert [graph.text(node) for node in range(len(graph))] == \
+        ['물', '바다', '해양']
+    assert graph.find('불') is None
+    assert graph.find('') is None
+    node = graph.find('바다')
+    assert graph.id(node) == sea
+    assert [graph.text(n) for n in graph.neighbors('synonyms', node)] == \
+        ['해양']
+    assert [graph.text(n) for n in graph.neighbors('includes', node)] == \
+        ['물']
+    assert list(graph.neighbors('included_by', node)) == []
+    water_node = graph.find('물')
+    assert graph.degree('included_by', water_node) == 1
+    assert set(graph.edges('synonyms')) == {(sea, ocean), (ocean, sea)}
+
+
+def test_write_empty_relation_graph(tmp_path):
+    path = str(tmp_path / 'graph.bin')
+    write_relation_graph(path, {}, [], [], utc_now())
+    graph = RelationGraph.load(path)
+    assert len(graph) == 0
+    assert graph.find('바다') is None
+
+
+def test_update_relation_graph(fx_session, tmp_path):
+    path = str(tmp_path / 'graph.bin')
+    ids = ensure_pronunciations(fx_session, ['바다', '해양', '물', '불'])
+    insert_relations(fx_session, SynonymsWordRelation, [
+        (ids['바다'], ids['해양']),
+    ])
+    fx_session.commit()
+    assert update_relation_graph(fx_session, path)
+    assert not update_relation_graph(fx_session, path)
+
+    # 관계 하나를 지우고 하나를 추가해서 수가 같아도 반영합니다.
+    graph = RelationGraph.load(path)
+    fx_session.query(SynonymsWordRelation).delete()
+    word, = insert_words(fx_session, [{
+        'target_code': 1, 'part': WordPart.noun, 'contents': '불',
+        'pronunciation_id': ids['물'],
+    }])
+    insert_relations(fx_session, IncludeWordRelation, [
+        (word['id'], ids['불']),
+    ])
+    fx_session.commit()
+    assert update_relation_graph(fx_session, path)
+    updated = RelationGraph.load(path)
+    assert set(updated.edges('synonyms')) == set()
+    assert set(updated.edges('includes')) == {(ids['물'], ids['불'])}
+    assert updated.find('바다') is None
+    assert updated.built_at > graph.built_at
+
+
+def test_mark_update_pending(tmp_path, monkeypatch):
+    path = str(tmp_path / 'graph.bin')
+    assert mark_update_pending(path)
+    assert not mark_update_pending(path)
+    clear_update_pending(path)
+    clear_update_pending(path)
+    assert mark_update_pending(path)
+
+    # 오래 풀리지 않은 예약은 작업을 잃어버린 것으로 보고 다시 예약합니다.
+    monkeypatch.setattr('word_way.search.graph.PENDING_TIMEOUT', 60)
+    os.utime(f'{path}.pending', (0, 0))
+    assert mark_update_pending(path)
+    assert not mark_update_pending(path)
+
+
+def test_update_relation_graph_removes_relations(fx_session, tmp_path):
+    path = str(tmp_path / 'graph.bin')
+    ids = ensure_pronunciations(fx_session, ['바다', '해양', '물'])
+    insert_relations(fx_session, SynonymsWordRelation, [
+        (ids['바다'], ids['해양']), (ids['해양'], ids['바다']),
+    ])
+    words = insert_words(fx_session, [
+        {
+            'target_code': target_code, 'part': WordPart.noun,
+            'contents': '물', 'pronunciation_id': ids['바다'],
+        }
+        for target_code in (1, 2)
+    ])
+    insert_relations(fx_session, IncludeWordRelation, [
+        (word['id'], ids['물']) for word in words
+    ])
+    fx_session.commit()
+    assert update_relation_graph(fx_session, path)
+    assert not update_relation_graph(fx_session, path)
+
+    # 같은 발음의 다른 단어에 남은 포함어 관계는 그래프에 남습니다.
+    fx_session.delete(fx_session.query(IncludeWordRelation).first())
+    fx_session.commit()
+    assert not update_relation_graph(fx_session, path)
+    fx_session.delete(fx_session.query(SynonymsWordRelation).filter_by(
+        criteria_id=ids['해양'],
+    ).one())
+    fx_session.commit()
+    assert update_relation_graph(fx_session, path)
+    graph = RelationGraph.load(path)
+    assert set(graph.edges('synonyms')) == {(ids['바다'], ids['해양'])}
+    assert set(graph.edges('includes')) == {(ids['바다'], ids['물'])}
+
+
+def test_get_relation_graph(app, fx_session, tmp_path, monkeypatch):
+    config = app.config['APP_CONFIG']
+    assert get_relation_graph(config) is None
+    path = str(tmp_path / 'graph.bin')
+    config['SEARCH_GRAPH'] = {'PATH': path}
+    assert get_relation_graph(config) is None
+    ids = ensure_pronunciations(fx_session, ['바다', '해양'])
+    insert_relations(fx_session, SynonymsWordRelation, [
+        (ids['바다'], ids['해양']),
+    ])
+    fx_session.commit()
+    update_relation_graph(fx_session, path)
+    graph = get_relation_graph(config)
+    assert graph.find('바다') is not None
+    assert get_relation_graph(config) is graph
+
+    monkeypatch.setattr('word_way.search.graph.REFRESH_INTERVAL', 0)
+    update_relation_graph(fx_session, path)
+    os.utime(path, (0, 0))
+    assert get_relation_graph(config) is not graph
@@ -0,0 +1,80 @@
+import concurrent.futures
+import logging
+import threading
+
+from init_word import Checkpoint, Progress, save_rows, save_synonyms
+from word_way.models import Pronunciation, SynonymsWordRelation
+from word_way.scrapping.client import get_dictionary_client
+from word_way.scrapping.pipeline import ScrappingPipeline
+from word_way.scrapping.word_parser import get_parser_pool
+
+
+def test_checkpoint(tmp_path):
+    path = tmp_path / 'synonyms.checkpoint'
+    checkpoint = Checkpoint(path)
+    checkpoint.add(3)
+    checkpoint.add(1)
+    checkpoint.close()
+    checkpoint = Checkpoint(path)
+    assert 1 in checkpoint
+    assert 2 not in checkpoint
+    assert checkpoint.done == {1, 3}
+    checkpoint.close()
+
+
+def test_progress(caplog):
+    # 진행 상황은 INFO 로 남기므로 기본 수준(WARNING)에서는 잡히지 않습니다.
+    caplog.set_level(logging.INFO, logger='init_word')
+    progress = Progress(2, interval=3600)
+    progress.update(4)
+    assert not caplog.records
+    progress.update(2)
+    assert '2/2 rows' in caplog.records[-1].getMessage()
+    assert progress.api_calls == 6
+
+
+def test_save_synonyms(app, fx_session, fx_dictionary_server):
+    app.config['APP_CONFIG']['WORD_API']['URL'] = fx_dictionary_server.url
+    fx_dictionary_server.words['바다'] = [('바다', [(1, '명사', '넓은 물')])]
+    fx_dictionary_server.words['해양'] = [('해양', [(2, '명사', '넓은 바다')])]
+    config = app.config['APP_CONFIG']
+    pipeline = ScrappingPipeline(
+        fx_session,
+        get_dictionary_client(config),
+        get_parser_pool(config),
+        preload=True,
+    )
+    save_synonyms(pipeline, 0, ['바다', '해양'])
+    save_synonyms(pipeline, 1, ['해양', '바다', '바다'])
+    sea = fx_session.query(Pronunciation).filter_by(pronunciation='바다').one()
+    assert sea.related_synonyms_pronunciations == ['해양']
+    assert fx_session.query(SynonymsWordRelation).count() == 2
+
+
+def test_save_rows(tmp_path):
+    started = []
+    lock = threading.Lock()
+
+    def save(row_num, lemmas_list):
+        with lock:
+            started.append(row_num)
+            # 넘겨둔 줄은 ``window`` 개를 넘지 않습니다.
+            assert len(started) - len(checkpoint.done) - len(failed) <= 2
+        if row_num % 3 == 0:
+            failed.append(row_num)
+            raise ValueError(row_num)
+        return row_num, 1
+
+    rows = [(row_num, ['바다']) for row_num in range(10)]
+    executors = None, concurrent.futures.ThreadPoolExecutor(2)
+    for i, executor in enumerate(executors):
+        del started[:]
+        failed = []
+        checkpoint = Checkpoint(tmp_path / f'{i}.checkpoint')
+        progress = Progress(len(rows), interval=3600)
+        # 실패한 줄을 건너뛰고 나머지 줄은 모두 기록합니다.
+        assert save_rows(rows, save, checkpoint, progress, executor, 2) == 4
+        assert checkpoint.done == {1, 2, 4, 5, 7, 8}
+        assert progress.api_calls == 6
+        checkpoint.close()
+    executors[1].shutdown()
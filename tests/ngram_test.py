@@ -0,0 +1,29 @@
+import uuid
+
+from word_way.models import Pronunciation
+from word_way.search.ngram import NgramIndex, get_ngram_index
+
+
+def test_ngram_index_search():
+    index = NgramIndex()
+    ids = {text: uuid.uuid4() for text in ['물', '물고기', '고기', '불고기']}
+    for text, id_ in ids.items():
+        index.add(id_, text)
+    assert set(index.search('물')) == {ids['물'], ids['물고기']}
+    assert set(index.search('고기')) == {ids['물고기'], ids['고기'], ids['불고기']}
+    assert index.search('물고기') == [ids['물고기']]
+    assert index.search_texts('물고기') == [(ids['물고기'], '물고기')]
+    assert index.search('기고') == []
+    assert index.search('') == []
+
+
+def test_ngram_index_refresh(fx_session):
+    fx_session.add(Pronunciation(pronunciation='사랑'))
+    fx_session.commit()
+    index = get_ngram_index(fx_session)
+    assert len(index.search('사랑')) == 1
+    fx_session.add(Pronunciation(pronunciation='첫사랑'))
+    fx_session.commit()
+    index.refreshed_at = 0.0
+    assert get_ngram_index(fx_session) is index
+    assert len(index.search('사랑')) == 2
@@ -0,0 +1,123 @@
+import uuid
+from configparser import ConfigParser
+
+from sqlalchemy.engine import create_engine as create_engine_
+
+from word_way.context import create_session
+from word_way.models import Pronunciation
+from word_way.orm import (Base, InstrumentedQueuePool, ReplicaSet,
+                          create_engine, engine_stats, get_replica_set,
+                          use_primary)
+
+
+def make_config(url: str, **options) -> ConfigParser:
+    config = ConfigParser()
+    config.optionxform = str
+    config.read_dict({'DATABASE': dict(URL=url, **options)})
+    return config
+
+
+def test_create_engine_is_cached_per_url(tmp_path):
+    url = f'sqlite:///{tmp_path}/a.db'
+    engine = create_engine(make_config(url))
+    assert create_engine(make_config(url)) is engine
+    assert create_engine(make_config(f'sqlite:///{tmp_path}/b.db')) \
+        is not engine
+
+
+def test_create_engine_pool_options():
+    engine = create_engine(make_config(
+        'postgresql://localhost:5432/word-way-pool-test',
+        POOL_SIZE='3', POOL_MAX_OVERFLOW='2', POOL_PRE_PING='false',
+    ))
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert not engine.pool._pre_ping
+    assert any(s['url'] == repr(engine.url) for s in engine_stats())
+
+
+def test_instrumented_queue_pool_stats(tmp_path):
+    engine = create_engine_(
+        f'sqlite:///{tmp_path}/stats.db', poolclass=InstrumentedQueuePool,
+    )
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute('SELECT 1')
+    stats = engine.pool.stats.as_dict()
+    assert stats['checkouts'] == 3
+    assert stats['checkins'] == 3
+    assert stats['wait_time'] >= stats['max_wait_time'] >= 0
+
+
+def test_replica_set_round_robin(tmp_path):
+    engines = [
+        create_engine_(f'sqlite:///{tmp_path}/{name}.db')
+        for name in ['a', 'b']
+    ]
+    # 없는 디렉터리의 SQLite 파일은 연결할 수 없습니다.
+    broken = create_engine_(f'sqlite:///{tmp_path}/missing/c.db')
+    replica_set = ReplicaSet([engines[0], broken, engines[1]], interval=60)
+    chosen = [replica_set.choose() for _ in range(6)]
+    assert chosen == [engines[0], engines[1], engines[1]] * 2
+    assert [s['healthy'] for s in replica_set.stats()] == [True, False, True]
+    assert ReplicaSet([broken], interval=60).choose() is None
+
+
+def test_replica_set_skips_replica_being_checked(tmp_path):
+    engines = [
+        create_engine_(f'sqlite:///{tmp_path}/{name}.db')
+        for name in ['a', 'b']
+    ]
+    replica_set = ReplicaSet(engines, interval=60)
+    assert replica_set.choose() is engines[0]
+    # 다른 스레드가 확인하는 중인 복제본은 마지막 상태가 정상이어도 건너뜁니다.
+    first = replica_set.replicas[0]
+    first.checked_at = 0.0
+    with first.lock:
+        assert [replica_set.choose() for _ in range(2)] == [engines[1]] * 2
+    assert replica_set.check(first)
+
+
+def make_primary_and_replica(tmp_path) -> ConfigParser:
+    config = make_config(
+        f'sqlite:///{tmp_path}/primary.db',
+        REPLICA_URLS=repr([f'sqlite:///{tmp_path}/replica.db']),
+    )
+    replica_set = get_replica_set(config)
+    engines = [create_engine(config)]
+    engines.extend(replica.engine for replica in replica_set.replicas)
+    for engine in engines:
+        Base.metadata.create_all(engine)
+        with engine.connect() as conn:
+            conn.execute(Pronunciation.__table__.insert(), {
+                'id': uuid.uuid4(), 'pronunciation': engine.url.database,
+            })
+    return config
+
+
+def test_routing_session(tmp_path):
+    config = make_primary_and_replica(tmp_path)
+    primary, replica = f'{tmp_path}/primary.db', f'{tmp_path}/replica.db'
+
+    def read(session):
+        return session.query(Pronunciation.pronunciation).scalar()
+
+    # Celery 작업처럼 복제본을 사용하지 않는 세션은 주 데이터베이스만 읽습니다.
+    session = create_session(config)
+    assert read(session) == primary
+    session.close()
+
+    session = create_session(config, replica=True)
+    assert read(session) == replica
+    with use_primary(session):
+        assert read(session) == primary
+    assert read(session) == replica
+    # 한 번 쓰고 나면 자신이 쓴 내용을 읽도록 주 데이터베이스를 사용합니다.
+    session.add(Pronunciation(pronunciation='바다'))
+    session.flush()
+    assert {p for p, in session.query(Pronunciation.pronunciation)} == {
+        primary, '바다',
+    }
+    session.commit()
+    session.close()
@@ -0,0 +1,47 @@
+from word_way.enum import WordPart
+from word_way.models import IncludeWordRelation, SynonymsWordRelation
+from word_way.scrapping.bulk import (ensure_pronunciations, insert_relations,
+                                     insert_words)
+from word_way.search.rows import (PronunciationRow, load_include_matched_words,
+                                  load_pronunciations)
+
+
+def test_load_pronunciations(fx_session):
+    ids = ensure_pronunciations(fx_session, ['불', '물', '고기', '빛', '해'])
+    fire, light = insert_words(fx_session, [
+        {
+            'target_code': 2, 'part': WordPart.noun, 'contents': '타는 것',
+            'pronunciation_id': ids['불'],
+        },
+        {
+            'target_code': 1, 'part': WordPart.noun, 'contents': '밝은 것',
+            'pronunciation_id': ids['불'],
+        },
+    ])
+    insert_relations(fx_session, SynonymsWordRelation, [
+        (ids['불'], ids['해']), (ids['불'], ids['빛']),
+    ])
+    insert_relations(fx_session, IncludeWordRelation, [
+        (fire['id'], ids['고기']), (light['id'], ids['해']),
+        (light['id'], ids['빛']),
+    ])
+    fx_session.commit()
+    rows = load_pronunciations(
+        fx_session, {ids['불']: '불', ids['물']: '물'},
+    )
+    fire_row = rows[ids['불']]
+    assert isinstance(fire_row, PronunciationRow)
+    assert not hasattr(fire_row, '__dict__')
+    assert fire_row.related_words == ['빛', '해']
+    assert [w.contents for w in fire_row.words] == ['밝은 것', '타는 것']
+    assert [w.part for w in fire_row.words] == [WordPart.noun] * 2
+    assert [w.related_pronunciations for w in fire_row.words] == \
+        [['빛', '해'], ['고기']]
+    assert rows[ids['물']].words == []
+
+    matched = load_include_matched_words(
+        fx_session, ['고기'], [ids['불'], ids['물']],
+    )
+    assert [w.id for w in matched[ids['불']]] == [fire['id']]
+    assert ids['물'] not in matched
+    assert load_include_matched_words(fx_session, ['고기'], []) == {}
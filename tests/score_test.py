@@ -0,0 +1,106 @@
+import uuid
+
+from pytest import mark
+
+from word_way.search.score import (MAX_RELATION_SCORE, PRIORITY_INCLUDE,
+                                   PRIORITY_PRONUNCIATION, PRIORITY_SYNONYMS,
+                                   RELATION_COUNT_LIMIT, SCORE_RELATION,
+                                   Candidate, contains_score, edit_distance,
+                                   rank_candidate, top_k)
+
+
+def candidate(pronunciation, *relations):
+    c = Candidate(pronunciation)
+    c.relations.update(relations)
+    return c
+
+
+@mark.parametrize('a, b, distance', [
+    ('바다', '바다', 0),
+    ('바다', '바닥', 1),
+    ('바다', '', 2),
+    ('바다새', '바다', 1),
+    ('물고기', '고기', 1),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+    assert edit_distance(b, a) == distance
+
+
+def test_rank_candidate():
+    keywords = ['바다']
+    exact = rank_candidate(candidate('바다'), keywords)
+    prefix = rank_candidate(candidate('바다새'), keywords)
+    longer_prefix = rank_candidate(candidate('바다거북이'), keywords)
+    infix = rank_candidate(candidate('앞바다'), keywords)
+    synonym = rank_candidate(
+        candidate('해양', ('바다', 'synonyms')), keywords,
+    )
+    include = rank_candidate(
+        candidate('해변', ('바다', 'includes')), keywords,
+    )
+    assert exact > prefix > longer_prefix > infix > synonym > include
+    assert [r.priority for r in (exact, infix, synonym, include)] == [
+        PRIORITY_PRONUNCIATION, PRIORITY_PRONUNCIATION, PRIORITY_SYNONYMS,
+        PRIORITY_INCLUDE,
+    ]
+    both = rank_candidate(
+        candidate('해양', ('바다', 'synonyms'), ('바다', 'includes')),
+        keywords,
+    )
+    assert both.score > synonym.score
+    assert both.priority == PRIORITY_SYNONYMS
+
+
+def test_rank_candidate_co_occurrence():
+    keywords = ['바다', '물']
+    one = rank_candidate(candidate('바다새'), keywords)
+    two = rank_candidate(candidate('바닷물', ('바다', 'includes')), keywords)
+    assert two.score > one.score
+    unrelated = rank_candidate(candidate('불'), keywords)
+    assert unrelated.score == 0
+
+
+def test_rank_candidate_relation_count():
+    keywords = ['바다']
+    rank = rank_candidate(candidate('앞바다'), keywords)
+    related = candidate('앞바다')
+    related.relation_count = 2
+    assert rank_candidate(related, keywords).score == \
+        rank.score + 2 * SCORE_RELATION
+    related.relation_count = RELATION_COUNT_LIMIT + 10
+    assert rank_candidate(related, keywords).score == \
+        rank.score + RELATION_COUNT_LIMIT * SCORE_RELATION
+    # 검색어에 걸리지 않은 발음은 유의어가 많아도 점수가 없습니다.
+    unrelated = candidate('하늘')
+    unrelated.relation_count = 3
+    assert rank_candidate(unrelated, keywords).score == 0
+
+
+@mark.parametrize('text, keywords, score', [
+    ('바다', ['바다'], 1150),
+    ('바다새', ['바다'], 700),
+    ('앞바다', ['바다', '앞'], 400 + 100 + 600 + 50 + 500),
+])
+def test_contains_score(text, keywords, score):
+    assert contains_score(text, keywords) == score
+    # 유의어 수 점수는 MAX_RELATION_SCORE 를 넘지 않습니다.
+    rank = rank_candidate(Candidate(text, RELATION_COUNT_LIMIT * 2), keywords)
+    assert rank.score == score + MAX_RELATION_SCORE
+
+
+def test_top_k():
+    keywords = ['바다']
+    candidates = {
+        uuid.uuid4(): candidate(text)
+        for text in ['바다', '바다새', '앞바다', '바닷가', '먼바다', '바다']
+    }
+    expected = top_k(candidates, keywords)
+    assert [candidates[id_].pronunciation for id_, _ in expected[:3]] == \
+        ['바다', '바다', '바다새']
+    # 같은 점수는 발음 id 순서로 정렬합니다.
+    assert expected[0][0] < expected[1][0]
+    assert top_k(candidates, keywords, 2) == expected[:2]
+    id_, rank = expected[2]
+    assert top_k(candidates, keywords, 2, (rank.score, id_)) == expected[3:5]
+    assert top_k(candidates, keywords, 10, (rank.score, id_)) == expected[3:]
@@ -0,0 +1,267 @@
+from sqlalchemy import event
+
+from word_way.celery import celery
+from word_way.context import create_session
+from word_way.enum import WordPart
+from word_way.models import (IncludeWordRelation, Pronunciation, Sentence,
+                             SynonymsWordRelation, Word, WordRelation)
+from word_way.scrapping import bulk
+from word_way.scrapping.bulk import (ensure_pronunciations, get_lookup_cache,
+                                     insert_relations, insert_words)
+from word_way.scrapping.client import DictionaryClient
+from word_way.scrapping.pipeline import (ScrappingPipeline,
+                                         iter_pending_pronunciations)
+from word_way.scrapping.word import (save_word, save_word_task,
+                                     save_words_task,
+                                     schedule_relation_graph_update,
+                                     update_relation_graph_task)
+from word_way.search.graph import RelationGraph
+
+
+def test_ensure_pronunciations(fx_session):
+    fx_session.add(Pronunciation(pronunciation='바다'))
+    fx_session.flush()
+    ids = ensure_pronunciations(fx_session, ['바다', '하늘', '하늘'])
+    assert ensure_pronunciations(fx_session, ['바다', '하늘']) == ids
+    assert fx_session.query(Pronunciation).count() == 2
+
+
+def test_lookup_cache(fx_session):
+    ensure_pronunciations(fx_session, ['바다'])
+    fx_session.commit()
+    lookup = get_lookup_cache(fx_session)
+    assert get_lookup_cache(fx_session) is lookup
+    lookup.preload(fx_session)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = fx_session.bind
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        ids = ensure_pronunciations(fx_session, ['바다'], lookup)
+        assert not statements
+        ensure_pronunciations(fx_session, ['하늘'], lookup)
+        word = {
+            'target_code': 1, 'part': WordPart.noun, 'contents': '넓은 물',
+            'pronunciation_id': ids['바다'],
+        }
+        assert len(insert_words(fx_session, [word], lookup)) == 1
+        fx_session.commit()
+        del statements[:]
+        assert ensure_pronunciations(fx_session, ['바다', '하늘'], lookup)
+        assert insert_words(fx_session, [word], lookup) == []
+        assert not statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    # 롤백한 값은 버립니다.
+    ensure_pronunciations(fx_session, ['구름'], lookup)
+    fx_session.rollback()
+    assert lookup.get_pronunciation_id('구름') is None
+    assert lookup.get_pronunciation_id('하늘') is not None
+
+
+def test_insert_words_and_relations(fx_session):
+    ids = ensure_pronunciations(fx_session, ['바다', '하늘'])
+    word = {
+        'target_code': 1, 'part': WordPart.noun, 'contents': '넓은 물',
+        'pronunciation_id': ids['바다'],
+    }
+    new_words = insert_words(fx_session, [word, word])
+    assert len(new_words) == 1
+    assert insert_words(fx_session, [word]) == []
+
+    pairs = [(ids['바다'], ids['하늘']), (ids['하늘'], ids['바다'])]
+    assert insert_relations(fx_session, SynonymsWordRelation, pairs) == \
+        set(pairs)
+    assert insert_relations(fx_session, SynonymsWordRelation, pairs) == set()
+    include = (new_words[0]['id'], ids['하늘'])
+    assert insert_relations(fx_session, IncludeWordRelation, [include]) == \
+        {include}
+    fx_session.commit()
+    sea = fx_session.query(Pronunciation).filter_by(pronunciation='바다').one()
+    assert sea.related_synonyms_pronunciations == ['하늘']
+    assert sea.words[0].related_include_pronunciations == ['하늘']
+
+
+def test_insert_concurrently_saved_rows(fx_session, monkeypatch):
+    ids = ensure_pronunciations(fx_session, ['바다', '하늘'])
+    word = {
+        'target_code': 1, 'part': WordPart.noun, 'contents': '넓은 물',
+        'pronunciation_id': ids['바다'],
+    }
+    saved_word, = insert_words(fx_session, [word])
+    pair = ids['바다'], ids['하늘']
+    insert_relations(fx_session, SynonymsWordRelation, [pair])
+    fx_session.commit()
+    select_in = bulk.select_in
+
+    def select_in_before_commit(session, columns, key, values):
+        # 다른 작업이 저장한 행을 확인한 뒤에 커밋한 것처럼 보이게 합니다.
+        if key in (Word.target_code, SynonymsWordRelation.criteria_id):
+            return []
+        return select_in(session, columns, key, values)
+
+    monkeypatch.setattr(bulk, 'select_in', select_in_before_commit)
+    assert insert_words(fx_session, [word]) == []
+    assert insert_relations(fx_session, SynonymsWordRelation, [pair]) == set()
+    fx_session.commit()
+    assert fx_session.query(Word).one().id == saved_word['id']
+    assert fx_session.query(WordRelation).count() == 1
+
+
+def test_scrapping_pipeline(fx_session, fx_dictionary_server, fx_parser_pool):
+    fx_dictionary_server.words['바다'] = [('바다', [(1, '명사', '넓은 물')])]
+    fx_dictionary_server.examples[1] = ['바다가 넓다.']
+    # '바다' 검색, 예문 요청 다음에 '하늘' 을 검색하므로 '하늘' 만 실패합니다.
+    fx_dictionary_server.failures = [200, 200, 404]
+    fx_session.add_all([
+        Pronunciation(pronunciation='바다'),
+        Pronunciation(pronunciation='하늘'),
+    ])
+    fx_session.commit()
+
+    client = DictionaryClient(fx_dictionary_server.url, 'test', max_retries=0)
+    pipeline = ScrappingPipeline(fx_session, client, fx_parser_pool)
+    pipeline.run(iter_pending_pronunciations(fx_session, 1))
+    client.close()
+
+    word = fx_session.query(Word).one()
+    assert word.part == WordPart.noun
+    assert word.pronunciation.scrapped_at is not None
+    assert sorted(word.related_include_pronunciations) == ['넓은', '물']
+    assert fx_session.query(Sentence).one().sentence == '바다가 넓다.'
+    # 요청이 실패한 단어와 이미 지나친 새 발음은 다음 실행에서 스크래핑합니다.
+    pending = fx_session.query(Pronunciation).filter(
+        Pronunciation.scrapped_at.is_(None),
+    )
+    assert {p.pronunciation for p in pending} == {'넓은', '물', '하늘'}
+
+
+def test_examples_fetched_after_commit(
+    app, fx_session, fx_dictionary_server, fx_parser_pool, monkeypatch,
+):
+    fx_dictionary_server.words['바다'] = [('바다', [(1, '명사', '넓은 물')])]
+    fx_dictionary_server.examples[1] = ['바다가 넓다.']
+    client = DictionaryClient(fx_dictionary_server.url, 'test')
+    committed = []
+
+    def examples(target_code):
+        # 예문을 가져오는 동안 단어는 이미 커밋되어 있어야 합니다.
+        other = create_session(app.config['APP_CONFIG'])
+        committed.append(other.query(Word).filter_by(
+            target_code=target_code,
+        ).count())
+        other.close()
+        return DictionaryClient.examples(client, target_code)
+
+    monkeypatch.setattr(client, 'examples', examples)
+    ScrappingPipeline(fx_session, client, fx_parser_pool).save_batch(['바다'])
+    client.close()
+    assert committed == [1]
+    assert fx_session.query(Sentence).one().sentence == '바다가 넓다.'
+
+
+def test_scrapping_pipeline_retries_unfinished_words(
+    fx_session, fx_dictionary_server, fx_parser_pool, monkeypatch,
+):
+    fx_dictionary_server.words['바다'] = [('바다', [(1, '명사', '넓은 물')])]
+    fx_dictionary_server.examples[1] = ['바다가 넓다.']
+    fx_session.add(Pronunciation(pronunciation='바다'))
+    fx_session.commit()
+    client = DictionaryClient(fx_dictionary_server.url, 'test', max_retries=0)
+    pipeline = ScrappingPipeline(fx_session, client, fx_parser_pool)
+
+    def pending():
+        return [p for batch in iter_pending_pronunciations(fx_session, 10)
+                for p in batch]
+
+    def fail(contents_list):
+        raise RuntimeError('parser crashed')
+
+    # 단어를 커밋한 뒤 형태소 분석이 실패하면 발음은 다시 처리할 대상입니다.
+    monkeypatch.setattr(fx_parser_pool, 'submit', fail)
+    try:
+        pipeline.save_batch(['바다'])
+    except RuntimeError:
+        fx_session.rollback()
+    monkeypatch.undo()
+    assert fx_session.query(Word).count() == 1
+    assert pending() == ['바다']
+
+    # 예문 요청이 실패하면 포함어 관계는 저장하지만 발음은 남겨둡니다.
+    fx_dictionary_server.failures = [200, 404]
+    pipeline.save_batch(['바다'])
+    word = fx_session.query(Word).one()
+    assert sorted(word.related_include_pronunciations) == ['넓은', '물']
+    assert fx_session.query(Sentence).count() == 0
+    assert '바다' in pending()
+
+    pipeline.save_batch(['바다'])
+    pipeline.save_batch(['바다'])
+    client.close()
+    assert fx_session.query(Sentence).one().sentence == '바다가 넓다.'
+    assert '바다' not in pending()
+
+
+def test_save_word(app, fx_session, fx_dictionary_server):
+    config = app.config['APP_CONFIG']
+    config['WORD_API']['URL'] = fx_dictionary_server.url
+    fx_dictionary_server.words['바다'] = [
+        ('바다', [(1, '명사', '넓은 물')]),
+        ('바닷-물', [(2, '명사', '바다의 물')]),
+    ]
+    fx_dictionary_server.examples[2] = ['바닷물이 짜다.']
+    with app.app_context():
+        pronunciation_id = save_word('바다', fx_session)
+    sea = fx_session.query(Pronunciation).get(pronunciation_id)
+    assert sea.pronunciation == '바다'
+    assert fx_session.query(Word).count() == 2
+    assert fx_session.query(Sentence).one().sentence == '바닷물이 짜다.'
+
+
+def test_scrapping_tasks(
+    app, fx_session, fx_dictionary_server, monkeypatch, tmp_path,
+):
+    # 작업 안에서는 LocalProxy 인 word_way.context.session 을 사용합니다.
+    monkeypatch.setattr(celery.conf, 'task_always_eager', True)
+    config = app.config['APP_CONFIG']
+    config['WORD_API']['URL'] = fx_dictionary_server.url
+    config['SCRAPPING']['TOKENIZER'] = 'vocabulary'
+    path = str(tmp_path / 'relation-graph.bin')
+    config['SEARCH_GRAPH'] = {'PATH': path}
+    fx_dictionary_server.words['바다'] = [('바다', [(1, '명사', '하늘 아래')])]
+    fx_dictionary_server.words['하늘'] = [('하늘', [(2, '명사', '높은 곳')])]
+    fx_session.add(Pronunciation(pronunciation='하늘'))
+    fx_session.commit()
+    with app.app_context():
+        save_word_task.apply(args=['바다']).get()
+        # 단어 하나를 저장해도 관계 그래프를 갱신합니다.
+        assert RelationGraph.load(path).find('바다') is not None
+        save_words_task.apply().get()
+    assert {word.target_code for word in fx_session.query(Word)} == {1, 2}
+
+
+def test_schedule_relation_graph_update(
+    app, fx_session, tmp_path, monkeypatch,
+):
+    scheduled = []
+    monkeypatch.setattr(
+        update_relation_graph_task, 'apply_async',
+        lambda **kwargs: scheduled.append(kwargs),
+    )
+    config = app.config['APP_CONFIG']
+    with app.app_context():
+        assert not schedule_relation_graph_update()
+        config['SEARCH_GRAPH'] = {
+            'PATH': str(tmp_path / 'graph.bin'), 'UPDATE_DELAY': '30',
+        }
+        # 예약한 테스크가 시작하기 전에는 단어를 더 저장해도 다시 예약하지
+        # 않습니다.
+        assert schedule_relation_graph_update()
+        assert not schedule_relation_graph_update()
+        assert scheduled == [{'countdown': 30.0}]
+        update_relation_graph_task.apply().get()
+        assert schedule_relation_graph_update()
+        assert len(scheduled) == 2
@@ -0,0 +1,88 @@
+import concurrent.futures
+
+from pytest import raises
+
+from word_way.search.cache import (MemorySearchCache, SearchCache,
+                                   create_search_cache, make_cache_key)
+
+
+def test_make_cache_key_ignores_keyword_order():
+    assert make_cache_key(['a', 'b'], limit=1) == \
+        make_cache_key(['b', 'a', 'a'], limit=1)
+    assert make_cache_key(['a'], limit=1) != make_cache_key(['a'], limit=2)
+
+
+def test_memory_search_cache_lru_and_ttl():
+    cache = MemorySearchCache(max_size=2, ttl=60)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.set('c', b'3')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    cache.bump_version()
+    assert cache.get('c') is None
+    assert cache.stats()['hits'] == 2
+
+    expired = MemorySearchCache(max_size=2, ttl=-1)
+    expired.set('a', b'1')
+    assert expired.get('a') is None
+
+
+def test_memory_search_cache_replica_lag():
+    cache = MemorySearchCache(max_size=2, ttl=60)
+    cache.set('a', b'1', lag=60)
+    assert cache.get('a') == b'1'
+    # 무효화한 직후에는 늦은 복제본에서 읽은 응답을 캐시하지 않습니다.
+    cache.bump_version()
+    cache.set('a', b'2', lag=60)
+    assert cache.get('a') is None
+    cache.set('a', b'3')
+    assert cache.get('a') == b'3'
+    cache.invalidated_at -= 60
+    cache.set('b', b'4', lag=60)
+    assert cache.get('b') == b'4'
+
+
+def test_search_cache_invalidate_interval():
+    cache = MemorySearchCache(max_size=2, ttl=60, invalidate_interval=60)
+    assert cache.invalidate()
+    cache.set('a', b'1')
+    # 마지막으로 무효화한 지 ``invalidate_interval`` 이 지나지 않았으면 캐시를
+    # 그대로 둡니다.
+    assert not cache.invalidate()
+    assert cache.get('a') == b'1'
+    cache.bumped_at -= 60
+    assert cache.invalidate()
+    assert cache.get('a') is None
+
+
+def test_search_cache_counts_concurrent_gets():
+    cache = MemorySearchCache(max_size=2, ttl=60)
+    cache.set('a', b'1')
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        list(executor.map(cache.get, ['a', 'b'] * 2000))
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2000, 2000)
+    assert stats['hit_ratio'] == 0.5
+
+
+def test_search_cache_is_abstract():
+    with raises(TypeError):
+        SearchCache()
+
+
+def test_create_search_cache_defaults_to_none():
+    config = {'DATABASE': {'URL': 'sqlite://'}}
+    cache = create_search_cache(config)
+    cache.set('a', b'1')
+    assert cache.get('a') is None
+    assert cache.invalidate_interval == 10
+
+
+def test_create_search_cache_invalidate_interval():
+    config = {
+        'DATABASE': {'URL': 'sqlite://'},
+        'SEARCH_CACHE': {'BACKEND': 'memory', 'INVALIDATE_INTERVAL': '2.5'},
+    }
+    assert create_search_cache(config).invalidate_interval == 2.5
@@ -0,0 +1,64 @@
+import uuid
+
+from flask import jsonify
+from pytest import mark, raises
+
+from word_way.api.serializer import json_response, serialize
+from word_way.enum import WordPart
+from word_way.models import Pronunciation, Word
+
+
+def create_response():
+    pronunciation = Pronunciation(id=uuid.uuid4(), pronunciation='바다')
+    word = Word(
+        id=uuid.uuid4(), target_code=1, part=WordPart.noun,
+        contents='지구 표면의 약 70%를 차지하는 "짠물"', pronunciation_id=uuid.uuid4(),
+    )
+    return {
+        'data': [
+            {
+                'id': uuid.uuid4(),
+                'pronunciation': '바다',
+                'words': [{
+                    'id': uuid.uuid4(),
+                    'part': WordPart.verb,
+                    'related_pronunciations': ['물', '해양'],
+                }],
+                'priority': 0,
+                'score': 1150,
+                'ratio': 0.5,
+                'truncated': False,
+                'parent': None,
+                'tags': {'바다'},
+            },
+            pronunciation,
+            word,
+        ],
+        'next_cursor': 'WzEsICIwMDAwIl0=',
+    }
+
+
+@mark.parametrize('config', [
+    {},
+    {'JSON_AS_ASCII': False},
+    {'JSON_SORT_KEYS': False},
+    {'JSONIFY_PRETTYPRINT_REGULAR': True},
+])
+def test_json_response(app, config):
+    app.config.update(config)
+    response = create_response()
+    with app.test_request_context():
+        expected = jsonify(**serialize(response))
+        actual = json_response(**response)
+        assert actual.get_data() == expected.get_data()
+        assert actual.mimetype == expected.mimetype
+        assert json_response(response['data']).get_data() == \
+            jsonify(serialize(response['data'])).get_data()
+
+
+def test_json_response_unknown_type(app):
+    with app.test_request_context():
+        with raises(TypeError):
+            json_response(data=object())
+        with raises(TypeError):
+            json_response({}, data=1)
@@ -0,0 +1,131 @@
+import re
+
+from sqlalchemy import Unicode
+from sqlalchemy.dialects import postgresql
+
+from word_way.models import Pronunciation, SynonymsWordRelation
+from word_way.scrapping.bulk import ensure_pronunciations, insert_relations
+from word_way.search import query, statement
+from word_way.search.query import candidate_rows, iter_search, search
+
+
+def test_candidate_rows_is_stable_for_postgresql():
+    assert candidate_rows('postgresql') is candidate_rows('postgresql')
+    compiled = candidate_rows('postgresql').compile(
+        dialect=postgresql.dialect(),
+    )
+    # 검색어 수와 관계없이 배열 하나로 넘기므로 문장이 바뀌지 않습니다.
+    for name in 'keywords', 'patterns':
+        bind = compiled.binds[name]
+        assert isinstance(bind.type, postgresql.ARRAY)
+        assert isinstance(bind.type.item_type, Unicode)
+    # SQLAlchemy 버전에 따라 ``::VARCHAR[]`` 캐스트를 붙이기도 합니다.
+    sql = str(compiled)
+    cast = r'(::\w+\[\])?'
+    assert re.search(rf'LIKE ANY \(%\(patterns\)s{cast}\)', sql)
+    assert len(re.findall(rf'= ANY \(%\(keywords\)s{cast}\)', sql)) == 2
+
+
+def test_search_reuses_compiled_statements(fx_session):
+    fx_session.add_all([
+        Pronunciation(pronunciation=p) for p in ['바다', '바다새', '하늘']
+    ])
+    fx_session.commit()
+    hits = search(fx_session, ['바다'])
+    assert {p.pronunciation for p, _ in hits} == {'바다', '바다새'}
+    compiled = len(statement._compiled_cache)
+    # 검색어 수가 달라도 같은 문장을 다시 컴파일하지 않습니다.
+    hits = search(fx_session, ['하늘', '바다새', '없음'])
+    assert {p.pronunciation for p, _ in hits} == {'바다새', '하늘'}
+    hits = search(fx_session, ['없음'])
+    assert hits == []
+    assert len(statement._compiled_cache) == compiled
+
+
+def test_search_pages_contains_candidates(fx_session, monkeypatch):
+    ids = ensure_pronunciations(
+        fx_session, ['바다', '바다새', '바다거북이', '앞바다거북', '해양'],
+    )
+    insert_relations(
+        fx_session, SynonymsWordRelation, [(ids['해양'], ids['바다'])],
+    )
+    fx_session.commit()
+    expected = ['바다', '바다새', '바다거북이', '앞바다거북', '해양']
+    monkeypatch.setattr(query, 'CANDIDATE_WINDOW', 1)
+    windows = []
+    sqlite_contains_windows = query.sqlite_contains_windows
+
+    def counting_windows(*args):
+        for rows in sqlite_contains_windows(*args):
+            windows.append(rows)
+            yield rows
+
+    monkeypatch.setattr(query, 'sqlite_contains_windows', counting_windows)
+    hits = search(fx_session, ['바다'])
+    assert [p.pronunciation for p, _ in hits] == expected
+    assert [r for _, r in hits] == sorted(
+        (r for _, r in hits), key=lambda r: -r.score,
+    )
+    # 첫 페이지는 앞선 발음 검색 결과만 가져옵니다.
+    windows.clear()
+    hits = search(fx_session, ['바다'], 1)
+    assert [p.pronunciation for p, _ in hits] == ['바다']
+    assert len(windows) == 2
+    # 앞 페이지에 가져오지 않은 발음도 다음 페이지에서 찾습니다.
+    pages = []
+    after = None
+    while True:
+        hits = search(fx_session, ['바다'], 2, after)
+        if not hits:
+            break
+        pages.extend(p.pronunciation for p, _ in hits)
+        last, rank = hits[-1]
+        after = rank.score, last.id
+    assert pages == expected
+
+
+def test_iter_search_ranks_lazily(fx_session, monkeypatch):
+    ensure_pronunciations(
+        fx_session, ['바다', '바다새', '바다거북이', '앞바다거북'],
+    )
+    fx_session.commit()
+    monkeypatch.setattr(query, 'CANDIDATE_WINDOW', 1)
+    windows = []
+    sqlite_contains_windows = query.sqlite_contains_windows
+
+    def counting_windows(*args):
+        for rows in sqlite_contains_windows(*args):
+            windows.append(rows)
+            yield rows
+
+    monkeypatch.setattr(query, 'sqlite_contains_windows', counting_windows)
+    chunks = iter_search(fx_session, ['바다'], chunk_size=1)
+    # 첫 묶음을 내보내기 전에 모든 후보를 읽지 않습니다.
+    assert [p.pronunciation for p, _ in next(chunks)] == ['바다']
+    assert len(windows) == 2
+    assert [p.pronunciation for chunk in chunks for p, _ in chunk] == \
+        ['바다새', '바다거북이', '앞바다거북']
+
+
+def test_search_chunks_contains_ids(fx_session, monkeypatch):
+    ids = ensure_pronunciations(
+        fx_session, ['바다', '바다새', '앞바다거북', '바닷가', '해양'],
+    )
+    insert_relations(
+        fx_session, SynonymsWordRelation, [(ids['해양'], ids['바다'])],
+    )
+    fx_session.commit()
+    monkeypatch.setattr(query, 'MAX_PARAMETERS', 1)
+    assert len(query.contains_params(fx_session, ['바다', '바닷'])) == 4
+    monkeypatch.setattr(query, 'CANDIDATE_WINDOW', 2)
+    # 점수가 높은 발음부터 고른 뒤에 나눕니다.
+    windows = query.contains_windows(
+        fx_session, ['바다'], query.FIRST_WINDOW,
+    )
+    assert [row[0] for row in next(windows)] == [ids['바다'], ids['바다새']]
+    hits = search(fx_session, ['바다', '바닷'])
+    assert {p.pronunciation for p, _ in hits} == {
+        '바다', '바다새', '앞바다거북', '바닷가', '해양',
+    }
+    hits = search(fx_session, ['바다', '새'], op='and')
+    assert [p.pronunciation for p, _ in hits] == ['바다새']
@@ -0,0 +1,126 @@
+import datetime
+import uuid
+
+from pytest import mark
+
+from word_way.models import Pronunciation, SynonymsWordRelation
+from word_way.search.suggest import (REBUILD_INTERVAL, Suggestion,
+                                     SuggestIndex, decompose,
+                                     get_suggest_index)
+from word_way.utils import utc_now
+
+
+@mark.parametrize('text, jamo', [
+    ('바다', 'ㅂㅏㄷㅏ'),
+    ('닭', 'ㄷㅏㄹㄱ'),
+    ('과일', 'ㄱㅗㅏㅇㅣㄹ'),
+    ('ㅘ', 'ㅗㅏ'),
+    ('a바', 'aㅂㅏ'),
+])
+def test_decompose(text, jamo):
+    assert decompose(text) == jamo
+
+
+def test_suggest_index(monkeypatch):
+    monkeypatch.setattr('word_way.search.suggest.TOP_SIZE', 3)
+    index = SuggestIndex()
+    suggestions = {
+        text: Suggestion(uuid.uuid4(), text, popularity)
+        for text, popularity in [
+            ('바다', 5), ('바닥', 3), ('바닷가', 1), ('받침', 4), ('발', 9),
+            ('닭', 2), ('달', 0),
+        ]
+    }
+    index.add(suggestions.values())
+    index.add([suggestions['바다']])
+    assert len(index) == 7
+
+    def suggest(prefix, limit=10):
+        return [s.pronunciation for s in index.suggest(prefix, limit)]
+
+    assert suggest('바') == ['발', '바다', '받침', '바닥', '바닷가']
+    assert suggest('바', 3) == ['발', '바다', '받침']
+    assert suggest('받') == ['바다', '받침', '바닥', '바닷가']
+    assert suggest('바닷') == ['바닷가']
+    assert suggest('달') == ['닭', '달']
+    assert suggest('ㄷ') == ['닭', '달']
+    assert suggest('하') == []
+    assert suggest('') == []
+
+
+def test_get_suggest_index(fx_session):
+    sea, floor, unscrapped = [
+        Pronunciation(pronunciation=p, scrapped_at=utc_now())
+        for p in ['바다', '바닥', '바닷물']
+    ]
+    unscrapped.scrapped_at = None
+    fx_session.add_all([sea, floor, unscrapped])
+    fx_session.flush()
+    fx_session.add(
+        SynonymsWordRelation(criteria_id=floor.id, relation_id=sea.id),
+    )
+    fx_session.commit()
+    index = get_suggest_index(fx_session)
+    assert index.suggest('받') == [
+        Suggestion(sea.id, '바다', 1), Suggestion(floor.id, '바닥', 0),
+    ]
+
+    unscrapped.scrapped_at = utc_now()
+    fx_session.commit()
+    index.refreshed_at = 0.0
+    assert get_suggest_index(fx_session) is index
+    assert [s.pronunciation for s in index.suggest('바')] == \
+        ['바다', '바닥', '바닷물']
+
+
+def test_suggest_index_rebuild(fx_session):
+    sea, floor = [
+        Pronunciation(pronunciation=p, scrapped_at=utc_now())
+        for p in ['바다', '바닥']
+    ]
+    fx_session.add_all([sea, floor])
+    fx_session.commit()
+    index = get_suggest_index(fx_session)
+    assert index.suggest('바')[0].popularity == 0
+
+    # 먼저 기록했지만 늦게 커밋된 발음도 반영합니다.
+    fx_session.add(Pronunciation(
+        pronunciation='바닷물',
+        scrapped_at=index.last_scrapped_at - datetime.timedelta(minutes=1),
+    ))
+    fx_session.add(
+        SynonymsWordRelation(criteria_id=floor.id, relation_id=sea.id),
+    )
+    fx_session.commit()
+    index.refreshed_at = 0.0
+    assert get_suggest_index(fx_session) is index
+    assert len(index) == 3
+
+    # 새 색인을 만들어 바꿔 끼우고, 이전 색인은 그대로 둡니다.
+    index.built_at -= REBUILD_INTERVAL
+    rebuilt = get_suggest_index(fx_session)
+    assert rebuilt is not index
+    assert get_suggest_index(fx_session) is rebuilt
+    assert rebuilt.suggest('바')[0] == Suggestion(sea.id, '바다', 1)
+    assert index.suggest('바')[0].popularity == 0
+    assert len(index) == len(rebuilt) == 3
+    assert not index.rebuilding
+
+
+def test_suggest_api(client, fx_session):
+    fx_session.add_all([
+        Pronunciation(pronunciation=p, scrapped_at=utc_now())
+        for p in ['바다', '바닥', '하늘']
+    ])
+    fx_session.commit()
+    res = client.get('/api/words/suggest/', query_string={'prefix': '받'})
+    assert res.status_code == 200
+    assert [d['pronunciation'] for d in res.get_json()['data']] == \
+        ['바다', '바닥']
+    assert res.get_json()['data'][0]['popularity'] == 0
+    res = client.get('/api/words/suggest/', query_string={'prefix': ' '})
+    assert res.get_json()['data'] == []
+    res = client.get('/api/words/suggest/', query_string={
+        'prefix': '바', 'limit': 21,
+    })
+    assert res.status_code == 400
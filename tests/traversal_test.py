@@ -0,0 +1,181 @@
+import time
+import types
+
+from pytest import fixture, mark, raises
+
+from word_way.enum import WordPart
+from word_way.models import IncludeWordRelation, SynonymsWordRelation
+from word_way.scrapping.bulk import (ensure_pronunciations, insert_relations,
+                                     insert_words)
+from word_way.search.graph import RelationGraph, update_relation_graph
+from word_way.search import traversal
+from word_way.search.traversal import (DatabaseNeighbors, GraphNeighbors,
+                                       Neighbors, explore, find_path)
+
+
+@fixture
+def fx_relations(fx_session):
+    """바다 -유의어-> 해양 -포함어-> 물 -유의어-> 강 -포함어-> 산
+    그리고 바다 -유의어-> 대양, 바다 -유의어-> 해
+
+    """
+    ids = ensure_pronunciations(
+        fx_session, ['바다', '해양', '물', '강', '산', '대양', '해', '불'],
+    )
+    words = {
+        row['pronunciation_id']: row['id']
+        for row in insert_words(fx_session, [
+            {
+                'target_code': i, 'part': WordPart.noun, 'contents': text,
+                'pronunciation_id': ids[text],
+            }
+            for i, text in enumerate(['해양', '강'])
+        ])
+    }
+    insert_relations(fx_session, SynonymsWordRelation, [
+        (ids['바다'], ids['해양']),
+        (ids['바다'], ids['대양']),
+        (ids['바다'], ids['해']),
+        (ids['물'], ids['강']),
+    ])
+    insert_relations(fx_session, IncludeWordRelation, [
+        (words[ids['해양']], ids['물']),
+        (words[ids['강']], ids['산']),
+    ])
+    fx_session.commit()
+    return ids
+
+
+@fixture(params=['database', 'graph'])
+def fx_neighbors(request, fx_session, fx_relations, tmp_path):
+    if request.param == 'database':
+        return DatabaseNeighbors(fx_session)
+    path = str(tmp_path / 'graph.bin')
+    update_relation_graph(fx_session, path)
+    return GraphNeighbors(RelationGraph.load(path))
+
+
+def texts(neighbors, keys):
+    described = neighbors.describe(keys)
+    return [described[key][1] for key in keys]
+
+
+def test_explore(fx_neighbors):
+    source = fx_neighbors.find('바다')
+    visits, truncated = explore(
+        fx_neighbors, source, 2, 10, time.monotonic() + 10,
+    )
+    assert not truncated
+    assert texts(fx_neighbors, [visit.key for visit in visits]) == \
+        ['바다', '대양', '해', '해양', '물']
+    assert [visit.depth for visit in visits] == [0, 1, 1, 1, 2]
+    assert visits[-1].relation == 'includes'
+    assert visits[-1].parent == visits[3].key
+
+    visits, truncated = explore(
+        fx_neighbors, source, 2, 1, time.monotonic() + 10,
+    )
+    assert texts(fx_neighbors, [visit.key for visit in visits]) == \
+        ['바다', '대양']
+
+    visits, truncated = explore(
+        fx_neighbors, source, 2, 10, time.monotonic() + 10, max_nodes=2,
+    )
+    assert truncated
+    assert len(visits) == 2
+
+
+def test_explore_deadline(fx_neighbors):
+    visits, truncated = explore(
+        fx_neighbors, fx_neighbors.find('바다'), 2, 10, time.monotonic() - 1,
+    )
+    assert truncated
+    assert len(visits) == 1
+
+
+def test_database_neighbors_deadline(monkeypatch, fx_session, fx_relations):
+    with raises(TypeError):
+        Neighbors()
+    neighbors = DatabaseNeighbors(fx_session)
+    keys = [fx_relations['바다'], fx_relations['물']]
+    monkeypatch.setattr(traversal, 'MAX_PARAMETERS', 1)
+    # 첫 번째 쿼리를 보낸 뒤에 시각이 지나면 나머지 쿼리는 보내지 않습니다.
+    clock = iter([0.0, 2.0])
+    monkeypatch.setattr(
+        traversal, 'time', types.SimpleNamespace(monotonic=clock.__next__),
+    )
+    assert neighbors.expand(keys, deadline=1.0) is None
+    expanded = neighbors.expand(keys)
+    assert [len(expanded[key]) for key in keys] == [3, 1]
+
+
+def test_find_path(fx_neighbors):
+    find = fx_neighbors.find
+    path, truncated = find_path(
+        fx_neighbors, find('바다'), find('산'), 6, 10, time.monotonic() + 10,
+    )
+    assert not truncated
+    assert texts(fx_neighbors, [step.key for step in path]) == \
+        ['바다', '해양', '물', '강', '산']
+    assert [step.relation for step in path] == \
+        [None, 'synonyms', 'includes', 'synonyms', 'includes']
+
+    # 관계는 방향이 있으므로 거꾸로는 갈 수 없습니다.
+    assert find_path(
+        fx_neighbors, find('산'), find('바다'), 6, 10, time.monotonic() + 10,
+    ) == (None, False)
+    assert find_path(
+        fx_neighbors, find('바다'), find('산'), 3, 10, time.monotonic() + 10,
+    ) == (None, False)
+    assert find_path(
+        fx_neighbors, find('해'), find('대양'), 6, 10, time.monotonic() + 10,
+    ) == (None, False)
+    assert find_path(
+        fx_neighbors, find('바다'), find('산'), 6, 10, time.monotonic() - 1,
+    ) == (None, True)
+
+
+@mark.parametrize('use_graph', [False, True])
+def test_word_way_api(app, client, fx_session, fx_relations, tmp_path,
+                      use_graph):
+    if use_graph:
+        path = str(tmp_path / 'graph.bin')
+        update_relation_graph(fx_session, path)
+        app.config['APP_CONFIG']['SEARCH_GRAPH'] = {'PATH': path}
+    res = client.get('/api/words/way/', query_string={
+        'source': '바다', 'depth': 1,
+    })
+    assert res.status_code == 200
+    data = res.get_json()['data']
+    assert [node['pronunciation'] for node in data['nodes']] == \
+        ['바다', '대양', '해', '해양']
+    assert data['nodes'][1]['parent'] == str(fx_relations['바다'])
+    assert not data['truncated']
+
+    res = client.get('/api/words/way/', query_string={
+        'source': '바다', 'target': '산', 'depth': 4,
+    })
+    path = res.get_json()['data']['path']
+    assert [node['pronunciation'] for node in path] == \
+        ['바다', '해양', '물', '강', '산']
+    assert [node['depth'] for node in path] == [0, 1, 2, 3, 4]
+    assert path[0]['parent'] is None
+    assert path[-1]['parent'] == str(fx_relations['강'])
+
+
+@mark.parametrize('query_string, status_code', [
+    ({}, 400),
+    ({'source': '바다', 'depth': 0}, 400),
+    ({'source': '바다', 'depth': 7}, 400),
+    ({'source': '바다', 'fan_out': 0}, 400),
+    ({'source': '없음'}, 404),
+    ({'source': '바다', 'target': '없음'}, 404),
+    ({'source': '불', 'target': '바다'}, 200),
+])
+def test_word_way_api_bad_arguments(app, client, fx_session, fx_relations,
+                                    tmp_path, query_string, status_code):
+    path = str(tmp_path / 'graph.bin')
+    update_relation_graph(fx_session, path)
+    app.config['APP_CONFIG']['SEARCH_GRAPH'] = {'PATH': path}
+    res = client.get('/api/words/way/', query_string=query_string)
+    assert res.status_code == status_code
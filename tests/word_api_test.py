@@ -0,0 +1,342 @@
+import uuid
+
+from pytest import mark
+from sqlalchemy import event
+from sqlalchemy.engine import create_engine as create_engine_
+
+from word_way.api.constant import MAX_PAGE_LIMIT
+from word_way.enum import WordPart
+from word_way.models import (
+    IncludeWordRelation, Pronunciation, SynonymsWordRelation, Word,
+)
+from word_way.orm import DEFAULT_REPLICA_MAX_LAG, Base
+from word_way.search.cache import get_search_cache
+from word_way.search.graph import update_relation_graph
+from word_way.search.ngram import get_ngram_index
+
+
+def test_word_api_search(client, fx_session):
+    water, fish, fire, meat = [
+        Pronunciation(pronunciation=p) for p in ['물', '물고기', '불', '고기']
+    ]
+    fx_session.add_all([water, fish, fire, meat])
+    fx_session.flush()
+    grill = Word(
+        target_code=1, part=WordPart.noun, contents='불에 구운 고기',
+        pronunciation_id=fire.id,
+    )
+    fx_session.add(grill)
+    fx_session.flush()
+    fx_session.add_all([
+        SynonymsWordRelation(criteria_id=fire.id, relation_id=water.id),
+        IncludeWordRelation(criteria_id=grill.id, relation_id=meat.id),
+    ])
+    fx_session.commit()
+
+    res = client.get('/api/words/', query_string={'keywords': ['물', ' ']})
+    assert res.status_code == 200
+    data = res.get_json()['data']
+    assert [d['priority'] for d in data] == [0, 0, 1]
+    assert {d['pronunciation'] for d in data[:2]} == {'물', '물고기'}
+    assert data[-1]['pronunciation'] == '불'
+    assert data[-1]['related_words'] == ['물']
+
+    res = client.get('/api/words/', query_string={'keywords': '고기'})
+    data = res.get_json()['data']
+    assert {d['pronunciation']: d['priority'] for d in data} == {
+        '물고기': 0, '고기': 0, '불': 2,
+    }
+    assert data[-1]['words'][0]['related_pronunciations'] == ['고기']
+
+
+def create_intersection_dataset(session):
+    ids = {}
+    for p in ['물', '고기', '물고기', '불', '해', '구이', '하늘']:
+        pronunciation = Pronunciation(pronunciation=p)
+        session.add(pronunciation)
+        session.flush()
+        ids[p] = pronunciation.id
+    grill, sun = [
+        Word(
+            target_code=1000 + i, part=WordPart.noun, contents=contents,
+            pronunciation_id=ids[p],
+        )
+        for i, (p, contents) in enumerate([
+            ('구이', '불에 구운 고기'), ('해', '하늘에 뜬 불'),
+        ])
+    ]
+    session.add_all([grill, sun])
+    session.flush()
+    session.add_all([
+        SynonymsWordRelation(criteria_id=ids['구이'], relation_id=ids['불']),
+        IncludeWordRelation(criteria_id=grill.id, relation_id=ids['고기']),
+        IncludeWordRelation(criteria_id=grill.id, relation_id=ids['불']),
+        IncludeWordRelation(criteria_id=sun.id, relation_id=ids['불']),
+        IncludeWordRelation(criteria_id=sun.id, relation_id=ids['하늘']),
+    ])
+    session.commit()
+
+
+@mark.parametrize('use_graph', [False, True])
+def test_word_api_intersection(app, client, fx_session, tmp_path, use_graph):
+    create_intersection_dataset(fx_session)
+    if use_graph:
+        use_relation_graph(app, fx_session, tmp_path)
+
+    def search_and(*keywords):
+        res = client.get('/api/words/', query_string={
+            'keywords': keywords, 'op': 'and',
+        })
+        assert res.status_code == 200
+        return [d['pronunciation'] for d in res.get_json()['data']]
+
+    assert search_and('물', '고기') == ['물고기']
+    assert search_and('고기', '불') == ['구이']
+    assert search_and('불', '하늘') == ['해']
+    # 모든 검색어에 걸린 발음이 없으면 가능한 많은 검색어에 걸린 발음을 찾습니다.
+    assert search_and('불', '고기', '하늘') == ['해']
+    assert search_and('물고기', '하늘') == ['물고기']
+    # 아무 발음에도 걸리지 않는 검색어는 건너뜁니다.
+    assert search_and('불', '없어') == search_and('불')
+    assert set(search_and('불')) == {'불', '구이', '해'}
+    assert search_and('물고기', '없는말') == ['물고기']
+    assert search_and('없는말') == []
+    res = client.get('/api/words/', query_string={
+        'keywords': ['물', '고기'], 'op': 'xor',
+    })
+    assert res.status_code == 400
+
+
+def test_word_api_escapes_like_wildcards(client, fx_session):
+    fx_session.add(Pronunciation(pronunciation='물'))
+    fx_session.commit()
+    res = client.get('/api/words/', query_string={'keywords': '%'})
+    assert res.get_json()['data'] == []
+
+
+def create_dataset(session, size: int):
+    keyword = Pronunciation(pronunciation='바다')
+    session.add(keyword)
+    session.flush()
+    for i in range(size):
+        pronunciations = [
+            Pronunciation(pronunciation=f'{prefix}{i}')
+            for prefix in ['바다', '동의어', '포함어']
+        ]
+        session.add_all(pronunciations)
+        session.flush()
+        infix, synonym, include = pronunciations
+        words = [
+            Word(
+                target_code=i * 10 + j, part=WordPart.noun,
+                contents=f'{p.pronunciation} 뜻', pronunciation_id=p.id,
+            )
+            for j, p in enumerate(pronunciations)
+        ]
+        session.add_all(words)
+        session.flush()
+        session.add_all([
+            SynonymsWordRelation(criteria_id=infix.id, relation_id=synonym.id),
+            SynonymsWordRelation(
+                criteria_id=synonym.id, relation_id=keyword.id,
+            ),
+            IncludeWordRelation(
+                criteria_id=words[0].id, relation_id=include.id,
+            ),
+            IncludeWordRelation(
+                criteria_id=words[2].id, relation_id=keyword.id,
+            ),
+        ])
+    session.commit()
+
+
+def count_search_queries(client, session, size: int) -> int:
+    create_dataset(session, size)
+    return count_queries(client, session, size)
+
+
+def count_queries(client, session, size: int) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.bind
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        res = client.get('/api/words/', query_string={
+            'keywords': '바다', 'limit': MAX_PAGE_LIMIT,
+        })
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert len(res.get_json()['data']) == size * 3 + 1
+    return len(statements)
+
+
+@mark.parametrize('size', [3, 30])
+def test_word_api_query_count(client, fx_session, size):
+    # SQLite 는 발음 검색과 관계 검색을 따로 실행합니다.
+    assert count_search_queries(client, fx_session, size) == 8
+
+
+def use_relation_graph(app, session, tmp_path):
+    path = str(tmp_path / 'relation-graph.bin')
+    update_relation_graph(session, path)
+    app.config['APP_CONFIG']['SEARCH_GRAPH'] = {'PATH': path}
+
+
+def search_pages(client, limit: int, **query_string):
+    pages = []
+    cursor = None
+    while True:
+        query_string.update(limit=limit)
+        if cursor:
+            query_string['cursor'] = cursor
+        res = client.get('/api/words/', query_string=query_string).get_json()
+        pages.append(res['data'])
+        cursor = res['next_cursor']
+        if not cursor:
+            return pages
+
+
+def test_word_api_search_with_relation_graph(
+    app, client, fx_session, tmp_path,
+):
+    create_dataset(fx_session, 10)
+    expected = search_pages(client, MAX_PAGE_LIMIT, keywords=['바다', '동의어3'])
+    use_relation_graph(app, fx_session, tmp_path)
+    get_search_cache(app.config['APP_CONFIG']).bump_version()
+    pages = search_pages(client, 4, keywords=['바다', '동의어3'])
+    assert [item for page in pages for item in page] == expected[0]
+    assert count_queries(client, fx_session, 10) == 6
+
+
+def test_word_api_pagination(client, fx_session):
+    create_dataset(fx_session, 10)
+    pages = []
+    cursor = None
+    while True:
+        query_string = {'keywords': '바다', 'limit': 7}
+        if cursor:
+            query_string['cursor'] = cursor
+        res = client.get('/api/words/', query_string=query_string).get_json()
+        pages.append(res['data'])
+        cursor = res['next_cursor']
+        if not cursor:
+            break
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 3]
+    items = [item for page in pages for item in page]
+    res = client.get('/api/words/', query_string={
+        'keywords': '바다', 'limit': MAX_PAGE_LIMIT,
+    }).get_json()
+    assert res['next_cursor'] is None
+    assert items == res['data']
+    scores = [item['score'] for item in items]
+    assert scores == sorted(scores, reverse=True)
+    assert items[0]['pronunciation'] == '바다'
+
+
+@mark.parametrize('query_string', [
+    {'limit': 0},
+    {'limit': MAX_PAGE_LIMIT + 1},
+    {'cursor': 'not-a-cursor'},
+])
+def test_word_api_bad_page_arguments(client, query_string):
+    res = client.get(
+        '/api/words/', query_string=dict(keywords='바다', **query_string),
+    )
+    assert res.status_code == 400
+
+
+def test_word_api_cache(app, client, fx_session):
+    fx_session.add(Pronunciation(pronunciation='바다'))
+    fx_session.commit()
+    cache = get_search_cache(app.config['APP_CONFIG'])
+    first = client.get('/api/words/', query_string={'keywords': ['바다', '강']})
+    assert (cache.hits, cache.misses) == (0, 1)
+    second = client.get('/api/words/', query_string={'keywords': ['강', '바다']})
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first.get_data() == second.get_data()
+
+    # 새 발음이 커밋되면 캐시가 무효화됩니다.
+    fx_session.add(Pronunciation(pronunciation='바다새'))
+    fx_session.commit()
+    get_ngram_index(fx_session).refreshed_at = 0.0
+    res = client.get('/api/words/', query_string={'keywords': ['바다', '강']})
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(res.get_json()['data']) == 2
+
+
+def test_word_api_cache_invalidate_interval(app, client, fx_session):
+    cache = get_search_cache(app.config['APP_CONFIG'])
+    cache.invalidate_interval = 60
+    fx_session.add(Pronunciation(pronunciation='바다'))
+    fx_session.commit()
+    client.get('/api/words/', query_string={'keywords': '바다'})
+    # 스크래핑하는 동안 잦은 커밋마다 캐시를 무효화하지 않습니다.
+    fx_session.add(Pronunciation(pronunciation='바다새'))
+    fx_session.commit()
+    client.get('/api/words/', query_string={'keywords': '바다'})
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.bumped_at -= 60
+    fx_session.add(Pronunciation(pronunciation='앞바다'))
+    fx_session.commit()
+    get_ngram_index(fx_session).refreshed_at = 0.0
+    res = client.get('/api/words/', query_string={'keywords': '바다'})
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(res.get_json()['data']) == 3
+
+
+def test_word_api_reads_replica(app, client, fx_session, tmp_path):
+    config = app.config['APP_CONFIG']
+    config['DATABASE']['REPLICA_URLS'] = repr([f'sqlite:///{tmp_path}/r.db'])
+    replica = create_engine_(f'sqlite:///{tmp_path}/r.db')
+    Base.metadata.create_all(replica)
+    with replica.connect() as conn:
+        conn.execute(Pronunciation.__table__.insert(), {
+            'id': uuid.uuid4(), 'pronunciation': '바다새',
+        })
+    fx_session.add(Pronunciation(pronunciation='바다'))
+    fx_session.commit()
+
+    res = client.get('/api/words/', query_string={'keywords': '바다'})
+    assert [d['pronunciation'] for d in res.get_json()['data']] == ['바다새']
+    res = client.get('/stats/')
+    assert [r['healthy'] for r in res.get_json()['replicas']] == [True]
+
+    # 캐시를 무효화한 직후 복제본에서 읽은 응답은 캐시하지 않습니다.
+    cache = get_search_cache(config)
+    cache.bump_version()
+    for _ in range(2):
+        client.get('/api/words/', query_string={'keywords': '바다'})
+    assert (cache.hits, cache.misses) == (0, 3)
+    cache.invalidated_at -= DEFAULT_REPLICA_MAX_LAG
+    for _ in range(2):
+        client.get('/api/words/', query_string={'keywords': '바다'})
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_word_api_stream(app, client, fx_session, monkeypatch):
+    monkeypatch.setattr('word_way.api.word.STREAM_CHUNK_SIZE', 4)
+    create_dataset(fx_session, 10)
+    create_intersection_dataset(fx_session)
+    for debug in [True, False]:
+        app.debug = debug
+        get_search_cache(app.config['APP_CONFIG']).bump_version()
+        for keywords in ['바다', '고기', '없음']:
+            expected = client.get('/api/words/', query_string={
+                'keywords': keywords, 'limit': MAX_PAGE_LIMIT,
+            })
+            res = client.get('/api/words/', query_string={
+                'keywords': keywords, 'stream': 'true',
+            })
+            assert res.status_code == 200
+            assert res.is_streamed
+            assert res.get_json() == expected.get_json()
+            if not debug:
+                assert res.get_data() == expected.get_data()
+
+    res = client.get('/api/words/', query_string={
+        'keywords': '바다', 'stream': 'maybe',
+    })
+    assert res.status_code == 400
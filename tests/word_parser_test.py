@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+
+from pytest import fixture, raises
+
+from word_way.models import Pronunciation
+from word_way.scrapping import tokenizer
+from word_way.scrapping.tokenizer import (OktTokenizer, Tokenizer,
+                                          VocabularyTokenizer, load_vocabulary)
+from word_way.scrapping.word_parser import (ParserPool, WordParser,
+                                            get_parser_pool)
+
+
+class FakeOkt:
+
+    created = 0
+
+    def __init__(self):
+        FakeOkt.created += 1
+        self.calls = []
+
+    def pos(self, phrase, norm=False, stem=False):
+        self.calls.append(phrase)
+        return [(token, 'Noun') for token in phrase.split()]
+
+
+@fixture
+def fx_okt(monkeypatch):
+    monkeypatch.setattr(tokenizer, 'Okt', FakeOkt)
+    FakeOkt.created = 0
+
+
+def test_parse_many(fx_okt):
+    parser = WordParser(OktTokenizer())
+    assert parser.parse('넓은 물') == (('넓은', 'Noun'), ('물', 'Noun'))
+    assert parser.parse_many(['넓은 물', '푸른 하늘', '넓은 물']) == [
+        (('넓은', 'Noun'), ('물', 'Noun')),
+        (('푸른', 'Noun'), ('하늘', 'Noun')),
+        (('넓은', 'Noun'), ('물', 'Noun')),
+    ]
+    assert parser.tokenizer.okt.calls == ['넓은 물', '푸른 하늘']
+
+
+def test_tokenizer_is_abstract():
+    with raises(TypeError):
+        Tokenizer()
+
+
+class PidTokenizer(Tokenizer):
+    """분석한 프로세스의 pid 를 품사로 돌려줍니다."""
+
+    def parse(self, contents):
+        return [(token, str(os.getpid())) for token in contents.split()]
+
+
+def test_parser_pool():
+    contents_list = [f'단어 {i}' for i in range(10)]
+    pool = ParserPool(2, PidTokenizer)
+    try:
+        parsed = pool.submit(contents_list).result()
+        assert [[token for token, _ in tokens] for tokens in parsed] == [
+            ['단어', str(i)] for i in range(10)
+        ]
+        # 분석기는 분석 프로세스에서만 만듭니다.
+        pids = {part for tokens in parsed for _, part in tokens}
+        assert len(pids) == 2 and str(os.getpid()) not in pids
+        assert pool.submit([]).result() == []
+        # 분석 프로세스가 죽으면 실패를 알리고 다음 요청에서 다시 띄웁니다.
+        for _ in range(2):
+            pool.processes.queue[0].process.kill()
+            with raises(RuntimeError):
+                pool.submit(['바다']).result()
+        assert pool.submit(['바다']).result()[0][0][0] == '바다'
+    finally:
+        pool.close()
+
+
+def parse_in_daemon(results):
+    pool = ParserPool(1, PidTokenizer)
+    try:
+        results.put(pool.submit(['바다']).result())
+    finally:
+        pool.close()
+
+
+def test_parser_pool_in_daemon_process():
+    # celery prefork 워커처럼 데몬 프로세스 안에서도 분석 프로세스를 띄웁니다.
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=parse_in_daemon, args=(results,), daemon=True,
+    )
+    process.start()
+    [((token, pid),)] = results.get(timeout=30)
+    process.join()
+    assert token == '바다'
+    assert pid not in (str(os.getpid()), str(process.pid))
+
+
+def test_vocabulary_tokenizer():
+    parser = VocabularyTokenizer(['바다', '바닷물', '물', '가', '넓다', '짜다'])
+    assert parser.parse('바닷물이 짜다. 물가의 바다가 넓은') == [
+        ('바닷물', 'Vocabulary'),
+        ('짜다', 'Vocabulary'),
+        ('물', 'Vocabulary'),
+        ('바다', 'Vocabulary'),
+    ]
+    assert VocabularyTokenizer([]).parse('바다') == []
+
+
+def test_get_parser_pool(app, fx_session):
+    fx_session.add_all([
+        Pronunciation(pronunciation='바다'),
+        Pronunciation(pronunciation='넓은 바다'),
+    ])
+    fx_session.commit()
+    assert load_vocabulary(fx_session) == ['바다']
+    pool = get_parser_pool(app.config['APP_CONFIG'])
+    assert get_parser_pool(app.config['APP_CONFIG']) is pool
+    assert pool.submit(['바다는 넓다']).result() == [
+        (('바다', 'Vocabulary'),),
+    ]
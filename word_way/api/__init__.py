@@ -4,6 +4,10 @@
 from flask import Blueprint
 from flask_restx import Api, Resource
 
+from word_way.config import current_config
+from word_way.orm import engine_stats, get_replica_set
+from word_way.search.cache import get_search_cache
+
 __all__ = 'blueprint',
 
 
@@ -15,3 +19,15 @@ api = Api(blueprint, doc='/doc/')
 class HealthCheckApi(Resource):
     def get(self):
         return 'pong'
+
+
+@api.route('/stats/')
+class StatsApi(Resource):
+    def get(self):
+        """프로세스의 커넥션 풀, 복제본 상태와 검색 캐시 통계"""
+        replica_set = get_replica_set(current_config)
+        return {
+            'pools': engine_stats(),
+            'replicas': replica_set.stats() if replica_set is not None else [],
+            'search_cache': get_search_cache(current_config).stats(),
+        }
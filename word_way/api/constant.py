@@ -1 +1,34 @@
 API_PRE_PATH = '/api'
+
+#: (:class:`int`) 검색 결과 한 페이지의 기본 크기
+DEFAULT_PAGE_LIMIT = 50
+
+#: (:class:`int`) 검색 결과 한 페이지의 최대 크기
+MAX_PAGE_LIMIT = 200
+
+#: (:class:`int`) 단어 길 탐색의 기본 단계 수
+DEFAULT_WAY_DEPTH = 2
+
+#: (:class:`int`) 단어 길 탐색의 최대 단계 수
+MAX_WAY_DEPTH = 6
+
+#: (:class:`int`) 단어 길 탐색에서 발음마다 따라갈 기본 이웃 수
+DEFAULT_WAY_FAN_OUT = 20
+
+#: (:class:`int`) 단어 길 탐색에서 발음마다 따라갈 최대 이웃 수
+MAX_WAY_FAN_OUT = 100
+
+#: (:class:`int`) 단어 길 탐색 한 번에 찾을 최대 발음 수
+MAX_WAY_NODES = 1000
+
+#: (:class:`float`) 단어 길 탐색 한 번에 쓸 시간(초)
+WAY_TIME_BUDGET = 0.05
+
+#: (:class:`int`) 자동 완성 결과의 기본 개수
+DEFAULT_SUGGEST_LIMIT = 10
+
+#: (:class:`int`) 자동 완성 결과의 최대 개수
+MAX_SUGGEST_LIMIT = 20
+
+#: (:class:`int`) 스트리밍 검색에서 한 번에 불러올 결과 수
+STREAM_CHUNK_SIZE = 100
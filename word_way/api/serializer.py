@@ -1,10 +1,29 @@
 import enum
 import functools
+import json
+import operator
 import typing
 import uuid
 
+from flask import Response, current_app
+
 from word_way.models import Pronunciation, Sentence, Word, WordRelation
 
+__all__ = (
+    'MODEL_FIELDS', 'dumps', 'json_default', 'json_response', 'serialize',
+)
+
+#: 모델마다 직렬화할 필드
+MODEL_FIELDS = {
+    Pronunciation: ('id', 'pronunciation'),
+    Word: ('id', 'target_code', 'part', 'contents', 'pronunciation_id'),
+    Sentence: ('id', 'sentence'),
+    WordRelation: (
+        'id', 'word_id', 'relation_word_id', 'relation_pronunciation_id',
+        'type',
+    ),
+}
+
 
 @functools.singledispatch
 def serialize(d, **options) -> dict:
@@ -41,51 +60,84 @@ def serialize_enum(v: enum.Enum, **options):
     return serialize(v.value, **options)
 
 
-@serialize.register(Pronunciation)
-def serialize_pronunciation(v: Pronunciation, **options):
-    return serialize(
-        {
-            'id': v.id,
-            'pronunciation': v.pronunciation,
-        },
-        **options,
-    )
-
-
-@serialize.register(Word)
-def serialize_word(v: Word, **options):
-    return serialize(
-        {
-            'id': v.id,
-            'target_code': v.target_code,
-            'part': v.part,
-            'contents': v.contents,
-            'pronunciation_id': v.pronunciation_id,
-        },
-        **options,
-    )
-
-
-@serialize.register(Sentence)
-def serialize_sentence(v: Sentence, **options):
-    return serialize(
-        {
-            'id': v.id,
-            'sentence': v.sentence,
-        },
-        **options,
+def model_to_dict(model: type) -> typing.Callable[[object], dict]:
+    """``model`` 의 :data:`MODEL_FIELDS` 를 한 번에 꺼내는 함수를 만듭니다."""
+    fields = MODEL_FIELDS[model]
+    get = operator.attrgetter(*fields)
+    return lambda v: dict(zip(fields, get(v)))
+
+
+@functools.lru_cache()
+def find_model_to_dict(
+    cls: type,
+) -> typing.Optional[typing.Callable[[object], dict]]:
+    for base in cls.__mro__:
+        if base in MODEL_FIELDS:
+            return model_to_dict(base)
+    return None
+
+
+def serialize_model(v, **options) -> dict:
+    return serialize(find_model_to_dict(type(v))(v), **options)
+
+
+for _model in MODEL_FIELDS:
+    serialize.register(_model, serialize_model)
+
+
+def json_default(v):
+    """:func:`json.dumps` 가 직접 인코딩하지 못하는 값을 바꿉니다.
+
+    :func:`serialize` 로 응답 전체를 한 번 더 훑지 않도록 JSON 인코더가 만난
+    값만 바꿉니다.
+
+    """
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, enum.Enum):
+        return v.value
+    if isinstance(v, set):
+        return list(v)
+    to_dict = find_model_to_dict(type(v))
+    if to_dict is None:
+        raise TypeError(
+            f'Object of type {type(v).__name__} is not JSON serializable'
+        )
+    return to_dict(v)
+
+
+def dumps(data, pretty: typing.Optional[bool] = None) -> str:
+    """``jsonify(serialize(data))`` 와 같은 JSON 을 만듭니다.
+
+    :param pretty: 들여쓰기 여부. :const:`None` 이면 :func:`flask.jsonify`
+                   처럼 설정과 디버그 모드를 따릅니다
+
+    """
+    config = current_app.config
+    if pretty is None:
+        pretty = config['JSONIFY_PRETTYPRINT_REGULAR'] or current_app.debug
+    if pretty:
+        indent, separators = 2, (', ', ': ')
+    else:
+        indent, separators = None, (',', ':')
+    return json.dumps(
+        data,
+        default=json_default,
+        ensure_ascii=config['JSON_AS_ASCII'],
+        sort_keys=config['JSON_SORT_KEYS'],
+        indent=indent,
+        separators=separators,
     )
 
 
-@serialize.register(WordRelation)
-def serialize_word_relation(v: WordRelation, **options):
-    return serialize(
-        {
-            'id': v.id,
-            'word_id': v.word_id,
-            'relation_word_id': v.relation_word_id,
-            'relation_pronunciation_id': v.relation_pronunciation_id,
-            'type': v.type,
-        },
-        **options,
+def json_response(*args, **kwargs) -> Response:
+    """:func:`flask.jsonify` 와 같은 응답을 :func:`serialize` 없이 만듭니다."""
+    if args and kwargs:
+        raise TypeError(
+            'json_response() behavior undefined when passed both args and '
+            'kwargs'
+        )
+    data = args[0] if len(args) == 1 else args or kwargs
+    return current_app.response_class(
+        dumps(data) + '\n', mimetype=current_app.config['JSONIFY_MIMETYPE'],
     )
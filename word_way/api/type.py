@@ -3,7 +3,10 @@ from flask_restx import fields
 from word_way.api.word import api as word_api
 from word_way.enum import WordPart
 
-__all__ = 'wordModel', 'pronunciationWithWordModel', 'pronunciationList',
+__all__ = (
+    'pronunciationList', 'pronunciationWithWordModel', 'suggestionList',
+    'suggestionModel', 'wayModel', 'wayNodeModel', 'wordModel',
+)
 
 
 wordModel = word_api.model('Word', {
@@ -36,9 +39,65 @@ pronunciationWithWordModel = word_api.model('PronunciationWithWord', {
         description='발음',
         example='떼다'
     ),
-    'words': fields.List(fields.Nested(wordModel))
+    'words': fields.List(fields.Nested(wordModel)),
+    'priority': fields.Integer(
+        description='검색 대상. 0: 발음, 1: 유의어, 2: 포함어',
+        example=0,
+        enum=[0, 1, 2],
+    ),
+    'score': fields.Integer(description='검색 점수. 높을수록 앞에 옵니다', example=1150),
 })
 
 pronunciationList = word_api.model('PronunciationList', {
-    'data': fields.List(fields.Nested(pronunciationWithWordModel))
+    'data': fields.List(fields.Nested(pronunciationWithWordModel)),
+    'next_cursor': fields.String(
+        description='다음 페이지를 가져올 때 사용할 커서. 마지막 페이지라면 null',
+        example='WzEsICIwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMCJd',
+    ),
+})
+
+wayNodeModel = word_api.model('WayNode', {
+    'id': fields.String(
+        description='발음 id',
+        example='00000000-0000-0000-0000-000000000000',
+    ),
+    'pronunciation': fields.String(description='발음', example='바다'),
+    'depth': fields.Integer(description='시작 발음에서 건너온 단계 수', example=1),
+    'parent': fields.String(
+        description='직전 발음 id. 시작 발음이면 null',
+        example='00000000-0000-0000-0000-000000000000',
+    ),
+    'relation': fields.String(
+        description='직전 발음에서 건너온 관계. 시작 발음이면 null',
+        example='synonyms',
+        enum=['synonyms', 'includes'],
+    ),
+})
+
+wayModel = word_api.model('Way', {
+    'data': fields.Nested(word_api.model('WayData', {
+        'nodes': fields.List(fields.Nested(wayNodeModel)),
+        'path': fields.List(
+            fields.Nested(wayNodeModel),
+            description='target 이 주어졌을 때 찾은 길. 길이 없으면 null',
+        ),
+        'truncated': fields.Boolean(
+            description='시간이나 개수 제한 때문에 탐색을 끝내지 못했는지',
+        ),
+    })),
+})
+
+suggestionModel = word_api.model('Suggestion', {
+    'id': fields.String(
+        description='발음 id',
+        example='00000000-0000-0000-0000-000000000000',
+    ),
+    'pronunciation': fields.String(description='발음', example='바다'),
+    'popularity': fields.Integer(
+        description='다른 단어가 유의어나 포함어로 가리키는 수', example=12,
+    ),
+})
+
+suggestionList = word_api.model('SuggestionList', {
+    'data': fields.List(fields.Nested(suggestionModel)),
 })
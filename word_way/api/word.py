@@ -1,20 +1,35 @@
 """:mod:`word_way.api.word` --- Word API
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
-from typing import List, Optional, Tuple
+import base64
+import binascii
+import json
+import time
+import uuid
+from typing import List, Mapping, Optional, Tuple
 
-from flask import Blueprint, jsonify, request
-from flask_restx import Api, Resource, fields
-from sqlalchemy import or_, literal
+from flask import Blueprint, current_app, request, stream_with_context
+from flask_restx import Api, Resource, fields, inputs
 
-from word_way.api.constant import API_PRE_PATH
-from word_way.api.serializer import serialize
+from word_way.api.constant import (
+    API_PRE_PATH, DEFAULT_PAGE_LIMIT, DEFAULT_SUGGEST_LIMIT, DEFAULT_WAY_DEPTH,
+    DEFAULT_WAY_FAN_OUT, MAX_PAGE_LIMIT, MAX_SUGGEST_LIMIT, MAX_WAY_DEPTH,
+    MAX_WAY_FAN_OUT, MAX_WAY_NODES, STREAM_CHUNK_SIZE, WAY_TIME_BUDGET,
+)
+from word_way.api.serializer import dumps, json_response
+from word_way.config import current_config
 from word_way.context import session
-from word_way.models import (
-    IncludeWordRelation,
-    Pronunciation,
-    SynonymsWordRelation,
-    Word,
+from word_way.search.cache import get_search_cache, make_cache_key
+from word_way.search.graph import get_relation_graph
+from word_way.search.query import (
+    PRIORITY_INCLUDE, SEARCH_OPERATORS, include_matched_words, iter_search,
+    normalize_keywords, search,
+)
+from word_way.search.rows import PronunciationRow, WordRow
+from word_way.search.score import Rank
+from word_way.search.suggest import get_suggest_index
+from word_way.search.traversal import (
+    DatabaseNeighbors, GraphNeighbors, Neighbors, explore, find_path,
 )
 
 __all__ = 'blueprint',
@@ -28,6 +43,92 @@ parser.add_argument(
     type=fields.List(fields.String, description='사용자가 입력한 검색 키워드 리스트'),
     location='query',
 )
+parser.add_argument(
+    'limit',
+    type=int,
+    default=DEFAULT_PAGE_LIMIT,
+    help=f'한 번에 가져올 검색 결과 수 (최대 {MAX_PAGE_LIMIT})',
+    location='query',
+)
+parser.add_argument(
+    'op',
+    type=str,
+    default='or',
+    choices=SEARCH_OPERATORS,
+    help='or: 검색어 중 하나라도 걸린 단어, and: 모든 검색어에 걸린 단어',
+    location='query',
+)
+parser.add_argument(
+    'stream',
+    type=inputs.boolean,
+    default=False,
+    help='true 이면 모든 결과를 찾는 대로 나눠서 보냅니다',
+    location='query',
+)
+parser.add_argument(
+    'cursor',
+    type=str,
+    help='이전 응답의 next_cursor. 주어지면 다음 페이지를 가져옵니다',
+    location='query',
+)
+
+way_parser = api.parser()
+way_parser.add_argument(
+    'source', type=str, required=True, help='시작 발음', location='query',
+)
+way_parser.add_argument(
+    'target',
+    type=str,
+    help='도착 발음. 주어지면 source 에서 target 까지 가장 짧은 길을 찾습니다',
+    location='query',
+)
+way_parser.add_argument(
+    'depth',
+    type=int,
+    default=DEFAULT_WAY_DEPTH,
+    help=f'건너갈 최대 단계 수 (최대 {MAX_WAY_DEPTH})',
+    location='query',
+)
+way_parser.add_argument(
+    'fan_out',
+    type=int,
+    default=DEFAULT_WAY_FAN_OUT,
+    help=f'발음마다 따라갈 최대 이웃 수 (최대 {MAX_WAY_FAN_OUT})',
+    location='query',
+)
+
+suggest_parser = api.parser()
+suggest_parser.add_argument(
+    'prefix', type=str, required=True, help='입력 중인 검색어', location='query',
+)
+suggest_parser.add_argument(
+    'limit',
+    type=int,
+    default=DEFAULT_SUGGEST_LIMIT,
+    help=f'가져올 자동 완성 결과 수 (최대 {MAX_SUGGEST_LIMIT})',
+    location='query',
+)
+
+
+def encode_cursor(score: int, pronunciation_id: uuid.UUID) -> str:
+    """페이지의 마지막 결과를 가리키는 커서를 만듭니다."""
+    payload = json.dumps([score, pronunciation_id.hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, uuid.UUID]:
+    """:func:`encode_cursor` 로 만든 커서를 풉니다.
+
+    :raise ValueError: 올바른 커서가 아닐 때
+
+    """
+    try:
+        score, pronunciation_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return int(score), uuid.UUID(hex=pronunciation_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f'invalid cursor: {cursor!r}') from e
 
 
 @api.route('/')
@@ -36,9 +137,9 @@ class WordApi(Resource):
 
     @staticmethod
     def serialize_response(
-        pronunciation: Pronunciation,
-        words: List[Word],
-        priority: int,
+        pronunciation: PronunciationRow,
+        words: List[WordRow],
+        rank: Rank,
     ) -> dict:
         p = pronunciation
 
@@ -50,44 +151,38 @@ class WordApi(Resource):
                     'id': word.id,
                     'contents': word.contents,
                     'part': word.part,
-                    'related_pronunciations':
-                        word.related_include_pronunciations,
+                    'related_pronunciations': word.related_pronunciations,
                 } for word in words
             ],
-            'related_words': p.related_synonyms_pronunciations,
-            'priority': priority,
+            'related_words': p.related_words,
+            'priority': rank.priority,
+            'score': rank.score,
         }
 
-    @staticmethod
-    def distinct_pronunciation(serialized_response: List[dict]):
-        pronunciation_ids = set()
-        distinct_items = []
-        for res in serialized_response:
-            pronunciation_id = res['id']
-            if pronunciation_id in pronunciation_ids:
-                continue
-            distinct_items.append(res)
-            pronunciation_ids.add(pronunciation_id)
-        return distinct_items
+    def serialize_pronunciations(
+        self,
+        pronunciations: List[Tuple[PronunciationRow, Rank]],
+        words: Optional[Mapping[uuid.UUID, List[WordRow]]] = None,
+    ) -> List[dict]:
+        words = words or {}
+        return [
+            self.serialize_response(
+                p,
+                words.get(p.id, p.words)
+                if rank.priority == PRIORITY_INCLUDE else p.words,
+                rank,
+            )
+            for p, rank in pronunciations
+        ]
 
     def make_response(
         self,
-        pronunciations: List[Tuple[Pronunciation, int]],
-        words: Optional[List[Tuple[Word, int]]] = None,
+        pronunciations: List[Tuple[PronunciationRow, Rank]],
+        words: Optional[Mapping[uuid.UUID, List[WordRow]]] = None,
+        next_cursor: Optional[str] = None,
     ):
-        response = [
-            self.serialize_response(p, p.words, priority)
-            for p, priority in pronunciations
-        ]
-        if words:
-            response += [
-                self.serialize_response(word.pronunciation, [word], priority)
-                for word, priority in words
-            ]
-
-        return jsonify(
-            data=serialize(self.distinct_pronunciation(response))
-        )
+        response = self.serialize_pronunciations(pronunciations, words)
+        return json_response(data=response, next_cursor=next_cursor)
 
     @api.expect(parser)
     @api.response(200, '성공. 단어 검색 결과', model=pronunciationList)
@@ -100,51 +195,253 @@ class WordApi(Resource):
             NOTE 3: words length가 2 이상일 경우 동음이의어
             NOTE 4: words length가 1 미만일 경우 조회 X
 
+            ** 검색 대상 (priority)
+            - 0: 검색어가 발음에 포함된 단어 (:class:`Word`)
+            - 1: 검색어가 유의어에 포함된 단어 (:class:`SynonymsWordRelation`)
+            - 2: 검색어가 의미에 포함된 단어 (:class:`IncludeWordRelation`)
+
             ** 검색 결과 순서
-            - 검색어와 동일한 발음을 가진 단어 (:class:`Word`)
-            - 검색어가 유의어에 포함된 단어 (:class:`SynonymsWordRelation`)
-            - 검색어가 의미에 포함된 단어 (:class:`IncludeWordRelation`)
+            - score 가 높은 순서로 반환합니다
+            - 발음과 검색어가 같거나 검색어로 시작할수록, 편집 거리가
+              가까울수록, 관계가 많을수록, 함께 걸린 검색어가 많을수록
+              score 가 높습니다
+
+            ** 검색어 합치기 (op)
+            - or: 검색어 중 하나라도 걸린 단어를 찾습니다
+            - and: 모든 검색어에 걸린 단어를 찾습니다. 그런 단어가 없으면
+              가능한 많은 검색어에 걸린 단어를 찾습니다
+
+            ** 스트리밍 (stream)
+            - true 이면 limit 와 상관없이 cursor 이후의 모든 결과를 찾는 대로
+              나눠서 보냅니다. next_cursor 는 항상 null 입니다
+
+            ** 페이지
+            - 한 번에 최대 limit 개의 결과를 반환합니다
+            - 다음 페이지는 응답의 next_cursor 를 cursor 로 넘겨서 가져옵니다
+
+        """
+        keywords = normalize_keywords(request.args.getlist('keywords'))
+        limit = request.args.get('limit', DEFAULT_PAGE_LIMIT, type=int)
+        if not 0 < limit <= MAX_PAGE_LIMIT:
+            api.abort(400, f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+        op = request.args.get('op', 'or')
+        if op not in SEARCH_OPERATORS:
+            api.abort(400, f'op must be one of {", ".join(SEARCH_OPERATORS)}')
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            stream = inputs.boolean(request.args.get('stream', False))
+        except ValueError as e:
+            api.abort(400, str(e))
+        if not keywords:
+            return self.make_response([])
+        if stream:
+            return self.stream_response(keywords, after, op)
+        cache = get_search_cache(current_config)
+        cache_key = make_cache_key(
+            keywords, limit=limit, cursor=cursor, op=op,
+        )
+        body = cache.get(cache_key)
+        if body is not None:
+            return current_app.response_class(
+                body, mimetype=current_app.config['JSONIFY_MIMETYPE'],
+            )
+        response = self.search_response(keywords, limit, after, op)
+        # 무효화한 직후에는 늦은 복제본에서 읽은 응답을 캐시하지 않습니다.
+        cache.set(cache_key, response.get_data(), session.replica_lag)
+        return response
+
+    def search_response(
+        self,
+        keywords: List[str],
+        limit: int,
+        after: Optional[Tuple[int, uuid.UUID]],
+        op: str = 'or',
+    ):
+        # 다음 페이지가 있는지 알기 위해 하나 더 가져옵니다.
+        pronunciations = search(
+            session, keywords, limit + 1, after,
+            get_relation_graph(current_config), op,
+        )
+        next_cursor = None
+        if len(pronunciations) > limit:
+            pronunciations = pronunciations[:limit]
+            last, rank = pronunciations[-1]
+            next_cursor = encode_cursor(rank.score, last.id)
+        words = include_matched_words(session, keywords, {
+            p.id for p, rank in pronunciations
+            if rank.priority == PRIORITY_INCLUDE
+        })
+        return self.make_response(pronunciations, words, next_cursor)
+
+    def stream_response(
+        self,
+        keywords: List[str],
+        after: Optional[Tuple[int, uuid.UUID]],
+        op: str,
+    ):
+        """:meth:`make_response` 와 같은 JSON 을 결과 묶음마다 인코딩해서
+        보냅니다.  결과 전체를 메모리에 모으지 않으며, 디버그 모드에서도
+        들여쓰지 않습니다.
 
         """
-        keywords = request.args.getlist('keywords')
-        query = session.query(Pronunciation)
-        words = None
-
-        if keywords:
-            base_query = query
-            order_column = 'priority'
-
-            # 검색어와 동일한 발음을 가진 단어
-            word_query = base_query.filter(
-                or_(*[
-                    Pronunciation.pronunciation.like(f'%{keyword.strip()}%')
-                    for keyword in keywords
-                ]),
-            ).add_column(literal(0).label(order_column))
-
-            # 검색어가 유의어에 포함된 단어
-            synonyms_query = base_query.filter(
-                Pronunciation.id.in_(
-                    session.query(SynonymsWordRelation.criteria_id).filter(
-                        SynonymsWordRelation.related_pronunciations.any(
-                            Pronunciation.pronunciation.in_(keywords)
-                        ),
-                    ).subquery()
-                ),
-            ).add_column(literal(1).label(order_column))
-
-            query = word_query.union(synonyms_query).order_by(order_column)
-
-            # 검색어가 의미에 포함된 단어
-            words = session.query(Word, literal(2).label(order_column)).filter(
-                Word.id.in_(
-                    session.query(IncludeWordRelation.criteria_id).filter(
-                        IncludeWordRelation.related_pronunciations.any(
-                            Pronunciation.pronunciation.in_(keywords)
-                        ),
-                    ).subquery()
+        chunks = iter_search(
+            session, keywords, after, get_relation_graph(current_config), op,
+            STREAM_CHUNK_SIZE,
+        )
+
+        def generate():
+            separator = ''
+            yield '{"data":['
+            for pronunciations in chunks:
+                words = include_matched_words(session, keywords, {
+                    p.id for p, rank in pronunciations
+                    if rank.priority == PRIORITY_INCLUDE
+                })
+                for item in self.serialize_pronunciations(
+                    pronunciations, words,
+                ):
+                    yield separator + dumps(item, pretty=False)
+                    separator = ','
+            yield '],"next_cursor":null}\n'
+
+        return current_app.response_class(
+            stream_with_context(generate()),
+            mimetype=current_app.config['JSONIFY_MIMETYPE'],
+        )
+
+
+@api.route('/suggest/')
+class SuggestApi(Resource):
+    from word_way.api.type import suggestionList
+
+    @api.expect(suggest_parser)
+    @api.response(200, '성공. 자동 완성 결과', model=suggestionList)
+    def get(self):
+        """
+        자동 완성 API
+
+            prefix 로 시작하는 스크래핑한 발음을 인기도(다른 단어가 유의어나
+            포함어로 가리키는 수) 순서로 반환합니다.
+
+            - 자모 단위로 비교하므로 입력 중인 글자도 일치합니다
+              (e.g. 받 → 바다, ㅂ → 바다)
+
+        """
+        prefix = request.args.get('prefix', '').strip()
+        limit = request.args.get('limit', DEFAULT_SUGGEST_LIMIT, type=int)
+        if not 0 < limit <= MAX_SUGGEST_LIMIT:
+            api.abort(
+                400, f'limit must be between 1 and {MAX_SUGGEST_LIMIT}',
+            )
+        suggestions = get_suggest_index(session).suggest(prefix, limit) \
+            if prefix else []
+        return json_response(data=[
+            suggestion._asdict() for suggestion in suggestions
+        ])
+
+
+@api.route('/way/')
+class WordWayApi(Resource):
+    from word_way.api.type import wayModel
+
+    @api.expect(way_parser)
+    @api.response(200, '성공. 단어 길 탐색 결과', model=wayModel)
+    @api.response(404, 'source 나 target 발음이 없음')
+    def get(self):
+        """
+        단어 길 탐색 API
+
+            유의어(synonyms) 와 포함어(includes) 관계를 따라 source 에서
+            depth 단계까지 건너갈 수 있는 발음을 찾습니다.  target 이 주어지면
+            source 에서 target 까지 가장 짧은 길을 찾습니다.
+
+            - 발음마다 fan_out 개의 이웃만 따라갑니다
+            - 정해진 시간 안에 끝내지 못하면 찾은 데까지 반환하고
+              truncated 가 true 가 됩니다
+
+        """
+        source = request.args.get('source', '').strip()
+        target = request.args.get('target', '').strip()
+        depth = request.args.get('depth', DEFAULT_WAY_DEPTH, type=int)
+        fan_out = request.args.get('fan_out', DEFAULT_WAY_FAN_OUT, type=int)
+        if not source:
+            api.abort(400, 'source is required')
+        if not 0 < depth <= MAX_WAY_DEPTH:
+            api.abort(400, f'depth must be between 1 and {MAX_WAY_DEPTH}')
+        if not 0 < fan_out <= MAX_WAY_FAN_OUT:
+            api.abort(
+                400, f'fan_out must be between 1 and {MAX_WAY_FAN_OUT}',
+            )
+        deadline = time.monotonic() + WAY_TIME_BUDGET
+        neighbors = self.neighbors(source, target)
+        source_key = self.find(neighbors, source)
+        if not target:
+            visits, truncated = explore(
+                neighbors, source_key, depth, fan_out, deadline,
+                MAX_WAY_NODES,
+            )
+            nodes = neighbors.describe({visit.key for visit in visits})
+            return json_response(data={
+                'nodes': [
+                    self.serialize_node(
+                        nodes, visit.key, visit.depth, visit.parent,
+                        visit.relation,
+                    )
+                    for visit in visits
+                ],
+                'truncated': truncated,
+            })
+        target_key = self.find(neighbors, target)
+        steps, truncated = find_path(
+            neighbors, source_key, target_key, depth, fan_out, deadline,
+        )
+        path = None
+        if steps is not None:
+            nodes = neighbors.describe({step.key for step in steps})
+            path = [
+                self.serialize_node(
+                    nodes, step.key, i, steps[i - 1].key if i else None,
+                    step.relation,
                 )
-            ).all()
+                for i, step in enumerate(steps)
+            ]
+        return json_response(data={
+            'path': path,
+            'truncated': truncated,
+        })
+
+    @staticmethod
+    def neighbors(*pronunciations: str) -> Neighbors:
+        # 관계가 없거나 그래프를 만든 뒤에 저장된 발음은 그래프에 없으므로
+        # DB 에서 찾습니다.
+        graph = get_relation_graph(current_config)
+        if graph is not None and all(
+            graph.find(p) is not None for p in pronunciations if p
+        ):
+            return GraphNeighbors(graph)
+        return DatabaseNeighbors(session)
+
+    @staticmethod
+    def find(neighbors: Neighbors, pronunciation: str):
+        key = neighbors.find(pronunciation)
+        if key is None:
+            api.abort(404, f'pronunciation not found: {pronunciation!r}')
+        return key
 
-        pronunciations = query.all()
-        return self.make_response(pronunciations, words)
+    @staticmethod
+    def serialize_node(
+        nodes: Mapping[object, Tuple[uuid.UUID, str]],
+        key,
+        depth: int,
+        parent,
+        relation: Optional[str],
+    ) -> dict:
+        id_, pronunciation = nodes[key]
+        return {
+            'id': id_,
+            'pronunciation': pronunciation,
+            'depth': depth,
+            'parent': None if parent is None else nodes[parent][0],
+            'relation': relation,
+        }
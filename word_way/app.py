@@ -1,13 +1,14 @@
 """:mod:`word_way.app` --- web app
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from typeguard import typechecked
 
 from word_way.api import blueprint as basic_api
 from word_way.api.word import blueprint as word_api
 from word_way.config import load_config
+from word_way.context import close_session
 
 __all__ = 'create_app',
 
@@ -22,4 +23,8 @@ def create_app(config_name: str) -> Flask:
     app.config['APP_CONFIG'] = config
     CORS(app, origins=config['WEB']['CROSS_ORIGIN_URLS'])
 
+    @app.teardown_request
+    def teardown_session(exc):
+        close_session(request._get_current_object())
+
     return app
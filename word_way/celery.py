@@ -4,9 +4,11 @@ import warnings
 
 from celery import Celery
 from celery.loaders.base import BaseLoader
+from celery.signals import task_postrun
 from flask import has_app_context
 
 from word_way.config import current_config, load_config
+from word_way.context import close_session
 
 
 __all__ = 'Loader', 'celery',
@@ -43,3 +45,8 @@ class Loader(BaseLoader):
         celery_config['APP_CONFIG'] = config
 
         return celery_config
+
+
+@task_postrun.connect
+def close_task_session(task=None, **kwargs):
+    close_session(task)
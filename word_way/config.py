@@ -5,11 +5,14 @@ import os
 
 from celery import current_task
 from configparser import ConfigParser
-from flask import current_app, has_request_context
+from flask import current_app, has_app_context
 from typeguard import typechecked
 from werkzeug.local import LocalProxy
 
-__all__ = 'current_config', 'load_config', 'get_word_api_config',
+__all__ = (
+    'current_config', 'load_config', 'get_scrapping_config',
+    'get_word_api_config',
+)
 
 
 @typechecked
@@ -29,9 +32,22 @@ def get_word_api_config() -> dict:
     return dict(url=url, token=token)
 
 
+def get_scrapping_config() -> dict:
+    scrapping_config = current_config['SCRAPPING'] \
+        if 'SCRAPPING' in current_config else {}
+    concurrency = int(scrapping_config.get('CONCURRENCY', 8))
+    batch_size = int(scrapping_config.get('BATCH_SIZE', 100))
+    parser_workers = int(scrapping_config.get('PARSER_WORKERS', 0))
+    return dict(
+        concurrency=concurrency,
+        batch_size=batch_size,
+        parser_workers=parser_workers,
+    )
+
+
 @LocalProxy
 def current_config() -> ConfigParser:
-    if has_request_context():
+    if has_app_context():
         return current_app.config['APP_CONFIG']
     else:
         return current_task.app.conf['APP_CONFIG']
@@ -5,7 +5,8 @@ from flask import request, has_request_context
 from werkzeug.local import LocalProxy
 
 from word_way.config import current_config
-from word_way.orm import Session, create_engine
+from word_way.orm import Session, create_engine, get_replica_set
+from word_way.search.cache import track_search_changes
 
 
 def current_context():
@@ -17,14 +18,42 @@ def current_context():
 
 @LocalProxy
 def session() -> Session:
+    """현재 컨텍스트의 세션.
+
+    웹 요청은 설정된 복제본에서 읽고, Celery 작업은 주 데이터베이스만
+    사용합니다.  방금 쓴 내용을 읽어야 하면 :func:`word_way.orm.use_primary`
+    로 감쌉니다.
+
+    """
     ctx = current_context()
     try:
         session = ctx._current_session
     except AttributeError:
-        ctx._current_session = session = create_session(current_config)
+        ctx._current_session = session = create_session(
+            current_config, replica=has_request_context(),
+        )
     finally:
         return session
 
 
-def create_session(config: typing.Mapping) -> Session:
-    return Session(bind=create_engine(config))
+def create_session(config: typing.Mapping, replica: bool = False) -> Session:
+    """``config`` 의 주 데이터베이스에 연결된 세션을 만듭니다.
+
+    :param replica: 읽기를 ``[DATABASE] REPLICA_URLS`` 의 복제본으로
+                    보낼지 여부. 복제본이 설정되지 않았으면 무시합니다
+
+    """
+    session = Session(bind=create_engine(config))
+    if replica:
+        replica_set = get_replica_set(config)
+        if replica_set is not None:
+            session.info['replicas'] = replica_set
+    track_search_changes(session, config)
+    return session
+
+
+def close_session(ctx) -> None:
+    """컨텍스트에서 사용한 세션을 닫고 커넥션을 풀에 돌려줍니다."""
+    session = ctx.__dict__.pop('_current_session', None)
+    if session is not None:
+        session.close()
@@ -0,0 +1,34 @@
+"""Add created_at to WordRelation
+
+Revision ID: 3f1c2b7d9e40
+Revises: 779698ece918
+Create Date: 2026-10-18 15:12:08.503911
+
+"""
+from alembic import op
+from sqlalchemy import Column, DateTime, func
+
+revision = '3f1c2b7d9e40'
+down_revision = '779698ece918'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'word_relation',
+        Column(
+            'created_at',
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+        ),
+    )
+    op.create_index(
+        'ix_word_relation_created_at', 'word_relation', ['created_at'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_word_relation_created_at', 'word_relation')
+    op.drop_column('word_relation', 'created_at')
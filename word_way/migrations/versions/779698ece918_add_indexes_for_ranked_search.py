@@ -0,0 +1,41 @@
+"""Add indexes for ranked search
+
+Revision ID: 779698ece918
+Revises: ab2bd4ab5987
+Create Date: 2026-10-18 11:03:47.215386
+
+"""
+from alembic import op
+
+revision = '779698ece918'
+down_revision = 'ab2bd4ab5987'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_word_pronunciation_id', 'word', ['pronunciation_id'],
+    )
+    op.create_index(
+        'ix_synonyms_word_relation_related_pronunciation_id',
+        'synonyms_word_relation',
+        ['related_pronunciation_id'],
+    )
+    op.create_index(
+        'ix_include_word_relation_related_pronunciation_id',
+        'include_word_relation',
+        ['related_pronunciation_id'],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_include_word_relation_related_pronunciation_id',
+        'include_word_relation',
+    )
+    op.drop_index(
+        'ix_synonyms_word_relation_related_pronunciation_id',
+        'synonyms_word_relation',
+    )
+    op.drop_index('ix_word_pronunciation_id', 'word')
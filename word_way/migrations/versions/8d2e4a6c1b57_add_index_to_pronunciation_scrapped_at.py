@@ -0,0 +1,23 @@
+"""Add index to Pronunciation.scrapped_at
+
+Revision ID: 8d2e4a6c1b57
+Revises: 3f1c2b7d9e40
+Create Date: 2026-10-18 17:40:21.118204
+
+"""
+from alembic import op
+
+revision = '8d2e4a6c1b57'
+down_revision = '3f1c2b7d9e40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_pronunciation_scrapped_at', 'pronunciation', ['scrapped_at'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pronunciation_scrapped_at', 'pronunciation')
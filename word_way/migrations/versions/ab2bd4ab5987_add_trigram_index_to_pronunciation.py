@@ -0,0 +1,28 @@
+"""Add trigram index to pronunciation
+
+Revision ID: ab2bd4ab5987
+Revises: 6013d366a3a0
+Create Date: 2026-10-18 10:12:31.482917
+
+"""
+from alembic import op
+
+revision = 'ab2bd4ab5987'
+down_revision = '6013d366a3a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_pronunciation_pronunciation_trgm',
+        'pronunciation',
+        ['pronunciation'],
+        postgresql_using='gin',
+        postgresql_ops={'pronunciation': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pronunciation_pronunciation_trgm', 'pronunciation')
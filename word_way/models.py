@@ -2,7 +2,8 @@ import typing
 import uuid
 
 from sqlalchemy import (
-    Column, DateTime, ForeignKey, Integer, Unicode, UniqueConstraint
+    Column, DateTime, ForeignKey, Index, Integer, Unicode, UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy_enum34 import EnumType
@@ -10,6 +11,7 @@ from sqlalchemy_utils.types.uuid import UUIDType
 
 from word_way.enum import WordPart, WordRelationType
 from word_way.orm import Base
+from word_way.utils import utc_now
 
 
 __all__ = (
@@ -37,7 +39,7 @@ class Pronunciation(Base):
     pronunciation = Column(Unicode, unique=True, nullable=False)
 
     #: (:class:`datetime.datetime`) 발음에 해당하는 단어들을 스크래핑한 시각
-    scrapped_at = Column(DateTime(timezone=True))
+    scrapped_at = Column(DateTime(timezone=True), index=True)
 
     words = relationship('Word', uselist=True, back_populates='pronunciation')
 
@@ -57,6 +59,16 @@ class Pronunciation(Base):
             ]
         return pronunciation
 
+    __table_args__ = (
+        # 중간 일치 검색(``LIKE '%검색어%'``)을 위한 trigram 인덱스
+        Index(
+            'ix_pronunciation_pronunciation_trgm',
+            'pronunciation',
+            postgresql_using='gin',
+            postgresql_ops={'pronunciation': 'gin_trgm_ops'},
+        ),
+    )
+
     __tablename__ = 'pronunciation'
 
 
@@ -77,7 +89,7 @@ class Word(Base):
 
     #: (:class:`uuid.UUID`) 발음에 대한 고유 식별자.
     pronunciation_id = Column(
-        UUIDType, ForeignKey(Pronunciation.id), nullable=False,
+        UUIDType, ForeignKey(Pronunciation.id), nullable=False, index=True,
     )
 
     #: (:class:`Pronunciation`) 발음
@@ -156,6 +168,16 @@ class WordRelation(Base):
         nullable=False,
     )
 
+    #: (:class:`datetime.datetime`) 관계를 저장한 시각.
+    #: :mod:`word_way.search.graph` 가 새로 저장된 관계만 읽는 데 사용합니다.
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utc_now,
+        server_default=func.now(),
+        index=True,
+    )
+
     __mapper_args__ = {'polymorphic_on': type}
 
     __tablename__ = 'word_relation'
@@ -177,6 +199,7 @@ class SynonymsWordRelation(WordRelation):
         'related_pronunciation_id',
         UUIDType,
         ForeignKey(Pronunciation.id),
+        index=True,
     )
 
     criteria_words = relationship(
@@ -217,6 +240,7 @@ class IncludeWordRelation(WordRelation):
         'related_pronunciation_id',
         UUIDType,
         ForeignKey(Pronunciation.id),
+        index=True,
     )
 
     criteria_words = relationship(
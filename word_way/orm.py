@@ -1,16 +1,355 @@
+import ast
+import contextlib
+import logging
+import os
+import threading
+import time
 import typing
 
 from sqlalchemy.engine import Engine, create_engine as create_engine_
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.declarative.api import DeclarativeMeta
 from sqlalchemy.orm.session import Session as _Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+__all__ = (
+    'Base', 'InstrumentedQueuePool', 'PoolStats', 'ReplicaSet',
+    'RoutingSession', 'Session', 'create_engine', 'engine_stats',
+    'get_replica_set', 'use_primary',
+)
+
+#: (:class:`float`) 복제본의 상태를 다시 확인하는 기본 간격 (초)
+DEFAULT_HEALTH_CHECK_INTERVAL = 5.0
+
+#: (:class:`float`) 복제본이 주 데이터베이스보다 늦을 수 있는 기본 시간 (초)
+DEFAULT_REPLICA_MAX_LAG = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingSession(_Session):
+    """읽기는 복제본으로, 쓰기는 주 데이터베이스로 보내는 세션.
+
+    ``info['replicas']`` 에 :class:`ReplicaSet` 이 있을 때만 복제본을
+    사용합니다.  세션이 처음 읽을 때 복제본 하나를 골라 세션이 끝날 때까지
+    사용하고, 한 번이라도 쓰면 그 뒤로는 자신이 쓴 내용을 읽을 수 있도록
+    주 데이터베이스만 사용합니다.
+
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        info = self.info
+        replicas = info.get('replicas')
+        if replicas is None:
+            return super().get_bind(mapper, clause)
+        if self._flushing or isinstance(clause, UpdateBase):
+            info['written'] = True
+        if info.get('written') or info.get('use_primary'):
+            return super().get_bind(mapper, clause)
+        replica = info.get('replica')
+        if replica is None:
+            replica = info['replica'] = replicas.choose() or \
+                super().get_bind(mapper, clause)
+        return replica
+
+    @property
+    def replica_lag(self) -> float:
+        """세션이 읽은 복제본이 주 데이터베이스보다 늦을 수 있는 시간 (초).
+
+        복제본에서 읽지 않았으면 0 입니다.
+
+        """
+        replica = self.info.get('replica')
+        if replica is None or replica is self.bind:
+            return 0.0
+        return self.info['replicas'].max_lag
 
-__all__ = 'Base', 'Session', 'create_engine'
 
 Base: DeclarativeMeta = declarative_base()
-Session: _Session = sessionmaker()
+Session: _Session = sessionmaker(class_=RoutingSession)
+
+#: (:class:`dict`) 프로세스별로 한 번만 생성한 엔진. ``(pid, url)`` 을 키로 합니다.
+_engines: typing.Dict[typing.Tuple[int, str], Engine] = {}
+_engines_lock = threading.Lock()
+
+#: (:class:`dict`) 프로세스별로 한 번만 생성한 복제본 목록.
+#: ``(pid, 주 데이터베이스 url)`` 을 키로 합니다.
+_replica_sets: typing.Dict[typing.Tuple[int, str], 'ReplicaSet'] = {}
+_replica_sets_lock = threading.Lock()
+
+
+class PoolStats:
+    """커넥션 풀의 체크아웃 횟수와 대기 시간을 기록합니다."""
+
+    __slots__ = ('checkouts', 'checkins', 'wait_time', 'max_wait_time',
+                 '_lock')
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        #: (:class:`float`) 커넥션을 얻기까지 기다린 시간의 합 (초)
+        self.wait_time = 0.0
+        #: (:class:`float`) 가장 오래 기다린 시간 (초)
+        self.max_wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_time: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time += wait_time
+            if wait_time > self.max_wait_time:
+                self.max_wait_time = wait_time
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def as_dict(self) -> dict:
+        return {
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'wait_time': self.wait_time,
+            'max_wait_time': self.max_wait_time,
+            'avg_wait_time': (
+                self.wait_time / self.checkouts if self.checkouts else 0.0
+            ),
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """:class:`PoolStats` 를 기록하는 :class:`QueuePool`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started_at = time.monotonic()
+        conn = super()._do_get()
+        self.stats.record_checkout(time.monotonic() - started_at)
+        return conn
+
+    def _do_return_conn(self, conn):
+        super()._do_return_conn(conn)
+        self.stats.record_checkin()
 
 
 def create_engine(config: typing.Mapping) -> Engine:
-    assert config['DATABASE']['URL'], "config['DATABASE']['URL'] required."
-    return create_engine_(config['DATABASE']['URL'])
+    """``config['DATABASE']`` 설정으로 엔진을 가져옵니다.
+
+    엔진과 커넥션 풀은 프로세스마다 URL 당 한 번만 만들어지고 재사용됩니다.
+    키에 pid 가 포함되어 있으므로 fork 된 Celery 워커는 부모의 커넥션을
+    공유하지 않고 새 엔진을 만듭니다.
+
+    """
+    database_config = config['DATABASE']
+    url = database_config['URL']
+    assert url, "config['DATABASE']['URL'] required."
+    return get_engine(url, database_config)
+
+
+def get_engine(url: str, database_config: typing.Mapping) -> Engine:
+    key = os.getpid(), url
+    try:
+        return _engines[key]
+    except KeyError:
+        pass
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = create_engine_(
+                url, **get_pool_options(url, database_config)
+            )
+    return engine
+
+
+def get_pool_options(url: str, database_config: typing.Mapping) -> dict:
+    # SQLite 는 SQLAlchemy 가 고른 기본 풀(SingletonThreadPool/NullPool)을
+    # 그대로 사용합니다.
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+    get = database_config.get
+    options = {}
+    if backend == 'postgresql':
+        # 응답하지 않는 복제본에 연결하느라 요청이 오래 멈추지 않도록 연결
+        # 시간을 제한합니다.
+        options['connect_args'] = {
+            'connect_timeout': int(get('CONNECT_TIMEOUT', 5)),
+        }
+    return {
+        **options,
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(get('POOL_SIZE', 5)),
+        'max_overflow': int(get('POOL_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(get('POOL_RECYCLE', 3600)),
+        'pool_timeout': int(get('POOL_TIMEOUT', 30)),
+        'pool_pre_ping': str(get('POOL_PRE_PING', 'true')).lower() in (
+            '1', 'yes', 'true', 'on',
+        ),
+    }
+
+
+class Replica:
+
+    __slots__ = 'engine', 'healthy', 'checked_at', 'lock',
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+class ReplicaSet:
+    """읽기 전용 복제본을 라운드 로빈으로 고릅니다.
+
+    복제본마다 ``interval`` 초가 지나면 ``SELECT 1`` 로 상태를 다시 확인하고,
+    응답하지 않는 복제본은 다음 확인 때까지 건너뜁니다.  상태 확인은 한 번에
+    한 스레드만 하고, 확인하는 동안 다른 스레드는 응답하지 않을 수도 있는 그
+    복제본을 건너뜁니다.
+
+    :param engines: 복제본 엔진
+    :param interval: 상태를 다시 확인하는 간격 (초)
+    :param max_lag: 복제본이 주 데이터베이스보다 늦을 수 있는 시간 (초)
+
+    """
+
+    def __init__(
+        self,
+        engines: typing.Sequence[Engine],
+        interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        max_lag: float = DEFAULT_REPLICA_MAX_LAG,
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.interval = interval
+        self.max_lag = max_lag
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def check(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at < self.interval:
+            return replica.healthy
+        if not replica.lock.acquire(blocking=False):
+            # 다른 스레드가 확인하는 중입니다.
+            return False
+        try:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.scalar('SELECT 1')
+            except DBAPIError:
+                if replica.healthy:
+                    logger.warning(
+                        'Replica %r is unavailable', replica.engine.url,
+                        exc_info=True,
+                    )
+                replica.healthy = False
+            else:
+                replica.healthy = True
+            replica.checked_at = time.monotonic()
+        finally:
+            replica.lock.release()
+        return replica.healthy
+
+    def choose(self) -> typing.Optional[Engine]:
+        """다음 차례의 정상 복제본을 고릅니다. 없으면 :const:`None` 입니다."""
+        with self.lock:
+            start = self.counter
+            self.counter += 1
+        size = len(self.replicas)
+        for i in range(size):
+            replica = self.replicas[(start + i) % size]
+            if self.check(replica):
+                return replica.engine
+        return None
+
+    def stats(self) -> typing.Sequence[dict]:
+        return [
+            {'url': repr(replica.engine.url), 'healthy': replica.healthy}
+            for replica in self.replicas
+        ]
+
+
+def get_replica_set(config: typing.Mapping) -> typing.Optional[ReplicaSet]:
+    """``config['DATABASE']['REPLICA_URLS']`` 의 복제본 목록을 가져옵니다.
+
+    복제본이 설정되지 않았으면 :const:`None` 을 반환합니다.
+
+    """
+    database_config = config['DATABASE']
+    urls = database_config.get('REPLICA_URLS')
+    if not urls:
+        return None
+    key = os.getpid(), database_config['URL']
+    replica_set = _replica_sets.get(key)
+    if replica_set is None:
+        with _replica_sets_lock:
+            replica_set = _replica_sets.get(key)
+            if replica_set is None:
+                replica_set = _replica_sets[key] = ReplicaSet(
+                    [
+                        get_engine(url, database_config)
+                        for url in ast.literal_eval(urls)
+                    ],
+                    float(database_config.get(
+                        'REPLICA_HEALTH_CHECK_INTERVAL',
+                        DEFAULT_HEALTH_CHECK_INTERVAL,
+                    )),
+                    float(database_config.get(
+                        'REPLICA_MAX_LAG', DEFAULT_REPLICA_MAX_LAG,
+                    )),
+                )
+    return replica_set
+
+
+@contextlib.contextmanager
+def use_primary(session: _Session) -> typing.Iterator[_Session]:
+    """블록 안에서 ``session`` 이 복제본 대신 주 데이터베이스를 읽게 합니다.
+
+    다른 세션이나 Celery 작업이 방금 쓴 내용을 복제 지연 없이 읽어야 할 때
+    사용합니다.  세션이 직접 쓴 내용은 감싸지 않아도 주 데이터베이스에서
+    읽습니다.
+
+    """
+    info = session.info
+    previous = info.get('use_primary', False)
+    info['use_primary'] = True
+    try:
+        yield session
+    finally:
+        info['use_primary'] = previous
+
+
+def engine_stats() -> typing.Sequence[dict]:
+    """현재 프로세스의 엔진별 커넥션 풀 상태를 반환합니다."""
+    pid = os.getpid()
+    stats = []
+    for (engine_pid, _), engine in list(_engines.items()):
+        if engine_pid != pid:
+            continue
+        pool = engine.pool
+        stat = {
+            'url': repr(engine.url),
+            'pool': pool.status(),
+        }
+        if isinstance(pool, InstrumentedQueuePool):
+            stat.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                **pool.stats.as_dict(),
+            )
+        stats.append(stat)
+    return stats
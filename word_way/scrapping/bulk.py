@@ -0,0 +1,399 @@
+""":mod:`word_way.scrapping.bulk` --- 스크래핑한 데이터를 한꺼번에 저장하는 함수
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+행마다 ``flush()`` 하는 대신 이미 저장된 행을 쿼리 한 번으로 걸러내고 나머지를
+여러 행짜리 ``INSERT ... ON CONFLICT DO NOTHING`` 으로 저장합니다.
+ORM 을 거치지 않으므로 저장한 뒤에는 :func:`mark_search_changed` 로 검색 캐시를
+무효화합니다.
+
+:class:`LookupCache` 를 넘기면 이미 알고 있는 발음 id 와 ``target_code`` 는
+쿼리하지 않고, 모르는 것만 DB 에서 찾습니다.
+"""
+import typing
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.schema import Table
+from werkzeug.local import LocalProxy
+
+from word_way.models import (Pronunciation, Sentence, Word, WordRelation,
+                             WordSentenceAssoc)
+from word_way.search.cache import mark_search_changed
+from word_way.utils import chunked, utc_now
+
+__all__ = (
+    'LookupCache', 'ensure_pronunciations', 'find_pronunciations',
+    'find_unscrapped_words', 'find_words_with_sentences', 'get_lookup_cache',
+    'insert_ignore', 'insert_relations', 'insert_sentences', 'insert_words',
+    'mark_scrapped',
+)
+
+#: (:class:`int`) 문장 하나에 넣을 최대 바인드 파라미터 수.
+#: 오래된 SQLite 의 기본 제한(999)보다 작게 잡습니다.
+MAX_PARAMETERS = 900
+
+
+class LookupCache:
+    """스크래핑 작업 동안 발음 id 와 저장된 ``target_code`` 를 기억합니다.
+
+    세션에서 저장한 값은 커밋되면 반영하고, 롤백되면 버립니다.
+    세션마다 하나씩 :func:`get_lookup_cache` 로 가져와서 사용합니다.
+
+    :param session: 값을 저장할 세션
+    :type session: :class:`sqlalchemy.orm.session.Session`
+
+    """
+
+    def __init__(self, session: Session):
+        self.preloaded = False
+        self.pronunciation_ids: typing.Dict[str, uuid.UUID] = {}
+        self.target_codes: typing.Set[int] = set()
+        self.pending_pronunciation_ids: typing.Dict[str, uuid.UUID] = {}
+        self.pending_target_codes: typing.Set[int] = set()
+        event.listen(session, 'after_commit', self.commit)
+        event.listen(session, 'after_rollback', self.rollback)
+
+    def preload(self, session: Session, yield_per: int = 10000) -> None:
+        """저장된 발음 id 와 ``target_code`` 를 모두 읽어둡니다."""
+        if self.preloaded:
+            return
+        self.preloaded = True
+        self.pronunciation_ids.update(
+            session.query(Pronunciation.pronunciation, Pronunciation.id)
+            .yield_per(yield_per)
+        )
+        self.target_codes.update(
+            target_code for target_code, in
+            session.query(Word.target_code).yield_per(yield_per)
+        )
+
+    def get_pronunciation_id(
+        self, pronunciation: str,
+    ) -> typing.Optional[uuid.UUID]:
+        return self.pronunciation_ids.get(pronunciation) or \
+            self.pending_pronunciation_ids.get(pronunciation)
+
+    def has_target_code(self, target_code: int) -> bool:
+        return target_code in self.target_codes or \
+            target_code in self.pending_target_codes
+
+    def commit(self, session: Session = None) -> None:
+        self.pronunciation_ids.update(self.pending_pronunciation_ids)
+        self.target_codes.update(self.pending_target_codes)
+        self.pending_pronunciation_ids.clear()
+        self.pending_target_codes.clear()
+
+    def rollback(self, session: Session = None) -> None:
+        self.pending_pronunciation_ids.clear()
+        self.pending_target_codes.clear()
+
+
+def get_lookup_cache(session: Session) -> LookupCache:
+    """세션이 닫힐 때까지 사용할 :class:`LookupCache` 를 반환합니다.
+
+    :data:`word_way.context.session` 처럼 :class:`~werkzeug.local.LocalProxy`
+    로 받은 세션에는 이벤트를 등록할 수 없으므로 실제 세션을 꺼내서
+    사용합니다.
+
+    """
+    if isinstance(session, LocalProxy):
+        session = session._get_current_object()
+    lookup = session.info.get('lookup_cache')
+    if lookup is None:
+        lookup = session.info['lookup_cache'] = LookupCache(session)
+    return lookup
+
+
+def insert_ignore(
+    session: Session, table: Table, rows: typing.Sequence[dict],
+) -> int:
+    """``rows`` 를 저장하고, 유니크 제약을 어기는 행은 건너뜁니다.
+
+    :return: 저장된 행 수
+    :rtype: :class:`int`
+
+    """
+    if not rows:
+        return 0
+    dialect = session.bind.dialect.name
+    if dialect == 'postgresql':
+        statement = postgresql.insert(table).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        statement = table.insert().prefix_with('OR IGNORE')
+    else:
+        statement = table.insert()
+    inserted = 0
+    for chunk in chunked(rows, max(1, MAX_PARAMETERS // len(rows[0]))):
+        inserted += session.execute(statement.values(chunk)).rowcount
+    return inserted
+
+
+def select_in(
+    session: Session,
+    columns: typing.Sequence,
+    key,
+    values: typing.Iterable,
+) -> typing.List[tuple]:
+    """``key IN values`` 인 행의 ``columns`` 를 나눠서 가져옵니다."""
+    rows = []
+    for chunk in chunked(values, MAX_PARAMETERS):
+        rows.extend(session.query(*columns).filter(key.in_(chunk)))
+    return rows
+
+
+def find_pronunciations(
+    session: Session,
+    pronunciations: typing.Iterable[str],
+    lookup: typing.Optional[LookupCache] = None,
+) -> typing.Dict[str, uuid.UUID]:
+    """저장되어 있는 발음의 ``{발음: 발음 id}`` 를 반환합니다."""
+    ids = {}
+    if lookup is not None:
+        misses = []
+        for pronunciation in set(pronunciations):
+            id_ = lookup.get_pronunciation_id(pronunciation)
+            if id_ is None:
+                misses.append(pronunciation)
+            else:
+                ids[pronunciation] = id_
+        pronunciations = misses
+    found = select_in(
+        session,
+        (Pronunciation.pronunciation, Pronunciation.id),
+        Pronunciation.pronunciation,
+        pronunciations,
+    )
+    ids.update(found)
+    if lookup is not None:
+        lookup.pending_pronunciation_ids.update(found)
+    return ids
+
+
+def ensure_pronunciations(
+    session: Session,
+    pronunciations: typing.Iterable[str],
+    lookup: typing.Optional[LookupCache] = None,
+) -> typing.Dict[str, uuid.UUID]:
+    """발음을 저장하고 ``{발음: 발음 id}`` 를 반환합니다.
+
+    이미 저장된 발음은 기존 id 를 그대로 사용합니다.
+
+    """
+    pronunciations = set(pronunciations)
+    ids = find_pronunciations(session, pronunciations, lookup)
+    missing = [
+        {'id': uuid.uuid4(), 'pronunciation': p}
+        for p in pronunciations if p not in ids
+    ]
+    inserted = insert_ignore(session, Pronunciation.__table__, missing)
+    if inserted == len(missing):
+        ids.update((row['pronunciation'], row['id']) for row in missing)
+    else:
+        # 다른 작업이 같은 발음을 먼저 저장했으므로 실제 id 를 다시 읽습니다.
+        ids.update(find_pronunciations(
+            session, [row['pronunciation'] for row in missing],
+        ))
+    if missing:
+        mark_search_changed(session)
+        if lookup is not None:
+            lookup.pending_pronunciation_ids.update(
+                (row['pronunciation'], ids[row['pronunciation']])
+                for row in missing
+            )
+    return ids
+
+
+def insert_words(
+    session: Session,
+    words: typing.Iterable[dict],
+    lookup: typing.Optional[LookupCache] = None,
+) -> typing.List[dict]:
+    """아직 저장되지 않은 ``target_code`` 의 단어만 저장합니다.
+
+    :param words: ``target_code``, ``part``, ``contents``, ``pronunciation_id``
+                  를 가진 딕셔너리
+    :return: 새로 저장한 단어. ``id`` 가 채워져 있습니다
+    :rtype: typing.List[dict]
+
+    """
+    words = {word['target_code']: word for word in words}
+    unknown = {
+        target_code for target_code in words
+        if lookup is None or not lookup.has_target_code(target_code)
+    }
+    existing = {
+        target_code for target_code, in select_in(
+            session, (Word.target_code,), Word.target_code, unknown,
+        )
+    }
+    new_words = [
+        dict(word, id=uuid.uuid4())
+        for target_code, word in words.items()
+        if target_code in unknown and target_code not in existing
+    ]
+    inserted = insert_ignore(session, Word.__table__, new_words)
+    if inserted != len(new_words):
+        # 다른 작업이 같은 ``target_code`` 를 먼저 저장해서 건너뛴 단어는
+        # 저장한 적 없는 id 를 가지므로 실제로 저장된 단어만 남깁니다.
+        saved = {
+            id_ for id_, in select_in(
+                session,
+                (Word.id,),
+                Word.id,
+                [word['id'] for word in new_words],
+            )
+        }
+        new_words = [word for word in new_words if word['id'] in saved]
+    if new_words:
+        mark_search_changed(session)
+    if lookup is not None:
+        lookup.pending_target_codes.update(unknown)
+    return new_words
+
+
+def find_unscrapped_words(
+    session: Session, target_codes: typing.Iterable[int],
+) -> typing.List[dict]:
+    """``target_code`` 의 단어 중 발음을 아직 스크래핑하지 않은 단어.
+
+    단어를 저장한 뒤 포함어 관계와 예문을 저장하기 전에 실패한 단어입니다.
+    :func:`insert_words` 가 반환하는 딕셔너리와 같은 키를 가집니다.
+
+    """
+    words = []
+    for chunk in chunked(set(target_codes), MAX_PARAMETERS):
+        words.extend(
+            {
+                'id': id_,
+                'target_code': target_code,
+                'contents': contents,
+                'pronunciation_id': pronunciation_id,
+            }
+            for id_, target_code, contents, pronunciation_id in session.query(
+                Word.id,
+                Word.target_code,
+                Word.contents,
+                Word.pronunciation_id,
+            ).join(Word.pronunciation).filter(
+                Word.target_code.in_(chunk),
+                Pronunciation.scrapped_at.is_(None),
+            )
+        )
+    return words
+
+
+def find_words_with_sentences(
+    session: Session, word_ids: typing.Iterable[uuid.UUID],
+) -> typing.Set[uuid.UUID]:
+    """``word_ids`` 중 예문이 저장된 단어 id."""
+    return {
+        word_id for word_id, in select_in(
+            session,
+            (WordSentenceAssoc.word_id,),
+            WordSentenceAssoc.word_id,
+            set(word_ids),
+        )
+    }
+
+
+def insert_relations(
+    session: Session,
+    relation_cls: typing.Type[WordRelation],
+    pairs: typing.Iterable[typing.Tuple[uuid.UUID, uuid.UUID]],
+) -> typing.Set[typing.Tuple[uuid.UUID, uuid.UUID]]:
+    """``(criteria_id, relation_id)`` 쌍으로 단어 관계를 저장합니다.
+
+    이미 있는 쌍은 쿼리 한 번으로 걸러내고, 나머지는 상속 관계에 있는
+    ``word_relation`` 과 하위 테이블에 각각 여러 행짜리 ``INSERT`` 로 저장합니다.
+
+    :param relation_cls: :class:`WordRelation` 의 하위 클래스
+    :return: 새로 저장한 쌍
+    :rtype: typing.Set[typing.Tuple[uuid.UUID, uuid.UUID]]
+
+    """
+    pairs = {
+        (criteria_id, relation_id) for criteria_id, relation_id in pairs
+    }
+    criteria = relation_cls.criteria_id
+    related = relation_cls.relation_id
+    existing = set(select_in(
+        session,
+        (criteria, related),
+        criteria,
+        {criteria_id for criteria_id, _ in pairs},
+    ))
+    new_pairs = pairs - existing
+    if not new_pairs:
+        return new_pairs
+    relation_type = relation_cls.__mapper__.polymorphic_identity
+    criteria_column = criteria.property.columns[0].name
+    related_column = related.property.columns[0].name
+    relations = [
+        (uuid.uuid4(), criteria_id, relation_id)
+        for criteria_id, relation_id in new_pairs
+    ]
+    insert_ignore(session, WordRelation.__table__, [
+        {'id': id_, 'type': relation_type} for id_, _, _ in relations
+    ])
+    inserted = insert_ignore(session, relation_cls.__table__, [
+        {'id': id_, criteria_column: criteria_id, related_column: relation_id}
+        for id_, criteria_id, relation_id in relations
+    ])
+    if inserted != len(relations):
+        # 다른 작업이 같은 쌍을 먼저 저장했으면 하위 테이블 행 없이 남은
+        # ``word_relation`` 행을 지우고 실제로 저장한 쌍만 반환합니다.
+        saved = set(select_in(
+            session,
+            (relation_cls.id,),
+            relation_cls.id,
+            [id_ for id_, _, _ in relations],
+        ))
+        orphans = [id_ for id_, _, _ in relations if (id_,) not in saved]
+        for chunk in chunked(orphans, MAX_PARAMETERS):
+            session.execute(WordRelation.__table__.delete().where(
+                WordRelation.__table__.c.id.in_(chunk),
+            ))
+        new_pairs = {
+            (criteria_id, relation_id)
+            for id_, criteria_id, relation_id in relations
+            if (id_,) in saved
+        }
+    if new_pairs:
+        mark_search_changed(session)
+    return new_pairs
+
+
+def insert_sentences(
+    session: Session,
+    examples: typing.Iterable[typing.Tuple[uuid.UUID, str]],
+) -> int:
+    """``(단어 id, 예문)`` 쌍으로 예문과 단어-예문 관계를 저장합니다.
+
+    :return: 저장한 예문 수
+    :rtype: :class:`int`
+
+    """
+    sentences = []
+    assocs = []
+    for word_id, example in examples:
+        sentence_id = uuid.uuid4()
+        sentences.append({'id': sentence_id, 'sentence': example})
+        assocs.append({'word_id': word_id, 'sentence_id': sentence_id})
+    insert_ignore(session, Sentence.__table__, sentences)
+    insert_ignore(session, WordSentenceAssoc.__table__, assocs)
+    return len(sentences)
+
+
+def mark_scrapped(
+    session: Session, pronunciation_ids: typing.Iterable[uuid.UUID],
+) -> None:
+    """발음의 ``scrapped_at`` 을 지금으로 기록합니다."""
+    now = utc_now()
+    for chunk in chunked(set(pronunciation_ids), MAX_PARAMETERS):
+        session.query(Pronunciation).filter(
+            Pronunciation.id.in_(chunk),
+        ).update(
+            {Pronunciation.scrapped_at: now}, synchronize_session=False,
+        )
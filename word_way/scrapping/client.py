@@ -0,0 +1,324 @@
+""":mod:`word_way.scrapping.client` --- 우리말샘 API 클라이언트
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+keep-alive 커넥션 풀을 재사용하고, 타임아웃과 재시도(5xx, 429), 호스트별 동시 요청
+수 제한과 초당 요청 수 제한을 적용합니다.  재시도도 처음 요청과 똑같이 호스트별
+제한을 거칩니다.  여러 요청은 :meth:`DictionaryClient.map`
+으로 스레드 풀에서 동시에 보냅니다.  ``run.py`` 처럼 gevent 로 패치된 환경에서는
+스레드 대신 greenlet 으로 동작합니다.
+"""
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+import typing
+import xml.etree.ElementTree as elemTree
+
+from requests import ConnectionError, RequestException, Session, Timeout
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlsplit
+
+__all__ = (
+    'ClientStats', 'DictionaryClient', 'RateLimiter', 'SearchItem', 'Sense',
+    'get_dictionary_client',
+)
+
+#: 다시 요청할 응답 상태 코드
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
+
+_clients: typing.Dict[typing.Tuple[int, str], 'DictionaryClient'] = {}
+_clients_lock = threading.Lock()
+
+
+class Sense(typing.NamedTuple):
+    #: (:class:`int`) 우리말샘 API 에서 사용되는 고유 식별자.
+    target_code: int
+
+    #: (:class:`str`) 품사
+    part: str
+
+    #: (:class:`str`) 뜻풀이
+    definition: str
+
+
+class SearchItem(typing.NamedTuple):
+    #: (:class:`str`) 발음
+    pronunciation: str
+
+    #: (:class:`typing.List[Sense]`) 발음에 해당하는 단어의 뜻
+    senses: typing.List[Sense]
+
+
+class RateLimiter:
+    """요청 사이의 간격을 일정하게 유지해서 초당 요청 수를 제한합니다.
+
+    :param rate: 초당 최대 요청 수. 0 이면 제한하지 않습니다
+    :type rate: :class:`float`
+
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+class ClientStats:
+    """API 요청 수와 지연 시간을 기록합니다."""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        #: (:class:`float`) 응답을 받기까지 걸린 시간의 합 (초). 재시도 포함
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.started_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            if not ok:
+                self.failures += 1
+            self.latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def as_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'avg_latency': (
+                self.latency / self.requests if self.requests else 0.0
+            ),
+            'max_latency': self.max_latency,
+            'requests_per_second': self.requests / elapsed if elapsed else 0.0,
+        }
+
+
+class DictionaryClient:
+    """우리말샘 API 클라이언트.
+
+    :param url: API 기본 주소
+    :type url: :class:`str`
+    :param token: API 키
+    :type token: :class:`str`
+    :param concurrency: 호스트별 최대 동시 요청 수
+    :type concurrency: :class:`int`
+    :param timeout: 연결과 응답 읽기 타임아웃 (초)
+    :type timeout: :class:`float`
+    :param max_retries: 연결 실패, 5xx, 429 응답을 다시 요청할 횟수
+    :type max_retries: :class:`int`
+    :param backoff: 재시도 간격의 기준 (초). 재시도마다 두 배씩 늘어납니다
+    :type backoff: :class:`float`
+    :param rate_limit: 호스트별 초당 최대 요청 수. 0 이면 제한하지 않습니다
+    :type rate_limit: :class:`float`
+
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: typing.Optional[str],
+        concurrency: int = 8,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        rate_limit: float = 0.0,
+    ):
+        self.url = url
+        self.token = token
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limit = rate_limit
+        self.session = Session()
+        # urllib3 가 재시도하면 호스트별 제한을 거치지 않으므로 :meth:`get` 에서
+        # 직접 재시도합니다.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = ClientStats()
+        self.semaphores: typing.Dict[str, threading.BoundedSemaphore] = {}
+        self.rate_limiters: typing.Dict[str, RateLimiter] = {}
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def host_limits(
+        self, url: str,
+    ) -> typing.Tuple[threading.BoundedSemaphore, RateLimiter]:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(
+                    self.concurrency,
+                )
+                self.rate_limiters[host] = RateLimiter(self.rate_limit)
+            return self.semaphores[host], self.rate_limiters[host]
+
+    def get(self, path: str, params: dict) -> typing.Optional[str]:
+        """API 를 호출하고 본문을 반환합니다. 실패하면 None 을 반환합니다.
+
+        연결 실패, 타임아웃, :data:`RETRY_STATUSES` 응답은 ``max_retries`` 번까지
+        다시 요청합니다.  재시도마다 동시 요청 수와 초당 요청 수 제한을 다시
+        거치고, 재시도를 기다리는 동안에는 동시 요청 자리를 비워 둡니다.
+
+        """
+        log = logger.getChild('get')
+        url = urljoin(self.url, path)
+        semaphore, rate_limiter = self.host_limits(url)
+        started_at = time.monotonic()
+        res = error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay(attempt, res))
+            with semaphore:
+                rate_limiter.wait()
+                try:
+                    res = self.session.get(
+                        url, params=dict(params, key=self.token),
+                        timeout=self.timeout,
+                    )
+                except (ConnectionError, Timeout) as e:
+                    res, error = None, e
+                    continue
+                except RequestException as e:
+                    res, error = None, e
+                    break
+            if res.status_code not in RETRY_STATUSES:
+                break
+        self.stats.record(
+            time.monotonic() - started_at, res is not None and res.ok,
+        )
+        if res is None:
+            log.warning(f'Failed to request {path} ({params}): {error}')
+            return None
+        if not res.ok:
+            log.warning(f'{path} ({params}) responded {res.status_code}')
+            return None
+        return res.text
+
+    def retry_delay(self, attempt: int, res) -> float:
+        """``attempt`` 번째 재시도 전에 기다릴 시간 (초).
+
+        ``backoff`` 에서 시작해서 재시도마다 두 배씩 늘리고, 응답에
+        ``Retry-After`` 가 있으면 적어도 그만큼 기다립니다.
+
+        """
+        delay = self.backoff * 2 ** (attempt - 1)
+        retry_after = res.headers.get('Retry-After') if res is not None \
+            else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def search(self, word: str) -> typing.Optional[typing.List[SearchItem]]:
+        """단어를 검색합니다. 요청이 실패하면 None 을 반환합니다."""
+        text = self.get('search', {
+            'q': word,
+            'target_type': 'search',
+            'part': 'word',
+            'sort': 'dict',
+        })
+        if text is None:
+            return None
+        items = []
+        for item in elemTree.fromstring(text).findall('item'):
+            pronunciation = item.findtext('word')
+            if not pronunciation:
+                continue
+            items.append(SearchItem(
+                pronunciation.replace('-', '').replace('^', ' '),
+                [
+                    Sense(
+                        int(sense.findtext('target_code')),
+                        sense.findtext('pos'),
+                        sense.findtext('definition'),
+                    )
+                    for sense in item.findall('sense')
+                ],
+            ))
+        return items
+
+    def examples(self, target_code: int) -> typing.Optional[typing.List[str]]:
+        """단어의 예문을 가져옵니다. 요청이 실패하면 None 을 반환합니다."""
+        text = self.get('view', {
+            'q': target_code,
+            'target_type': 'view',
+            'method': 'target_code',
+        })
+        if text is None:
+            return None
+        item = elemTree.fromstring(text).find('item')
+        sense_info = item.find('senseInfo') if item is not None else None
+        if sense_info is None:
+            return []
+        return [
+            example_info.findtext('example')
+            for example_info in sense_info.findall('example_info')
+            if example_info.findtext('example')
+        ]
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        with self.lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.concurrency,
+                )
+            return self._executor
+
+    def map(
+        self, fn: typing.Callable, iterable: typing.Iterable,
+    ) -> typing.List:
+        """``fn`` 을 ``iterable`` 의 각 항목에 동시에 적용한 결과를 순서대로 반환합니다.
+
+        e.g. ``client.map(client.search, ['사랑', '애정'])``
+
+        """
+        return list(self.executor.map(fn, iterable))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.session.close()
+
+
+def get_dictionary_client(config: typing.Mapping) -> DictionaryClient:
+    """설정에 맞는 클라이언트를 프로세스마다 한 번만 만들어서 반환합니다."""
+    word_api_config = config['WORD_API']
+    key = os.getpid(), word_api_config['URL']
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                get = word_api_config.get
+                scrapping_config = config['SCRAPPING'] \
+                    if 'SCRAPPING' in config else {}
+                client = _clients[key] = DictionaryClient(
+                    word_api_config['URL'],
+                    word_api_config.get('TOKEN'),
+                    concurrency=int(scrapping_config.get('CONCURRENCY', 8)),
+                    timeout=float(get('TIMEOUT', 10)),
+                    max_retries=int(get('MAX_RETRIES', 3)),
+                    backoff=float(get('BACKOFF', 0.5)),
+                    rate_limit=float(get('RATE_LIMIT', 0)),
+                )
+    return client
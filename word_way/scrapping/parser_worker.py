@@ -0,0 +1,42 @@
+""":mod:`word_way.scrapping.parser_worker` --- 형태소 분석 자식 프로세스
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:class:`~word_way.scrapping.word_parser.ParserPool` 이 ``python -m`` 으로
+띄우는 프로세스입니다.  표준 입력으로 형태소 분석기를 만들 함수를 받은 뒤,
+뜻풀이 목록을 받을 때마다 분석 결과를 돌려줍니다.  주고받는 값은 모두
+:mod:`pickle` 입니다.
+
+분석기(JVM) 가 표준 출력에 쓰는 내용이 응답과 섞이지 않도록 응답은 원래
+표준 출력으로 보내고, 표준 출력은 표준 에러로 돌립니다.
+"""
+import os
+import pickle
+import sys
+
+from word_way.scrapping.word_parser import WordParser
+
+__all__ = 'main',
+
+
+def main():
+    requests = sys.stdin.buffer
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    word_parser = WordParser(pickle.load(requests)())
+    word_parser.warm_up()
+    while True:
+        try:
+            contents_list = pickle.load(requests)
+        except EOFError:
+            # 부모 프로세스가 풀을 닫거나 종료했습니다.
+            return
+        try:
+            response = True, word_parser.parse_many(contents_list)
+        except Exception as e:
+            response = False, repr(e)
+        pickle.dump(response, responses)
+        responses.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+""":mod:`word_way.scrapping.pipeline` --- 단어를 묶음 단위로 스크래핑하는 파이프라인
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+단어 묶음마다 아래 순서로 처리합니다.
+
+1. 우리말샘 API 검색 요청을 동시에 보냅니다. (트랜잭션 밖)
+2. 발음과 단어를 여러 행짜리 ``INSERT`` 로 저장하고 커밋합니다.
+3. 새 단어의 뜻풀이를 형태소 분석 프로세스 풀에 보내고, 분석하는 동안 예문을
+   동시에 가져옵니다. (트랜잭션 밖)
+4. 포함어 관계와 예문을 여러 행짜리 ``INSERT`` 로 저장하고, 발음의
+   ``scrapped_at`` 을 기록한 뒤 커밋합니다.
+
+3, 4 단계에서 실패하면 발음이 스크래핑하지 않은 상태로 남으므로 다음
+실행에서 이미 저장한 단어까지 다시 처리합니다.
+
+네트워크 요청을 기다리는 동안에는 트랜잭션을 열어두지 않으므로 DB 잠금을 오래
+잡지 않습니다.
+"""
+import logging
+import typing
+import uuid
+
+from sqlalchemy.orm.session import Session
+
+from word_way.models import IncludeWordRelation, Pronunciation
+from word_way.scrapping.bulk import (ensure_pronunciations,
+                                     find_pronunciations,
+                                     find_unscrapped_words,
+                                     find_words_with_sentences,
+                                     get_lookup_cache, insert_relations,
+                                     insert_sentences, insert_words,
+                                     mark_scrapped)
+from word_way.scrapping.client import DictionaryClient
+from word_way.scrapping.word_parser import ParserPool, WordParser
+from word_way.utils import convert_word_part
+
+__all__ = 'ScrappingPipeline', 'iter_pending_pronunciations',
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pending_pronunciations(
+    session: Session, batch_size: int,
+) -> typing.Iterator[typing.List[str]]:
+    """스크래핑을 마치지 않은 발음을 ``batch_size`` 개씩 반환합니다.
+
+    ``scrapped_at`` 은 단어의 포함어 관계와 예문까지 저장한 뒤에 기록하므로,
+    단어만 저장하고 실패한 발음도 다시 처리합니다.
+
+    발음 순서대로 키셋 페이지를 나눠 읽으므로 묶음마다 커밋해도 안전하며,
+    스크래핑하면서 새로 저장된 발음도 아직 지나치지 않았다면 함께 처리됩니다.
+
+    """
+    query = session.query(Pronunciation.pronunciation).filter(
+        Pronunciation.scrapped_at.is_(None),
+    ).order_by(Pronunciation.pronunciation)
+    last = None
+    while True:
+        page = query
+        if last is not None:
+            page = page.filter(Pronunciation.pronunciation > last)
+        batch = [p for p, in page.limit(batch_size)]
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+class ScrappingPipeline:
+    """단어 묶음을 동시에 가져와서 한꺼번에 저장합니다.
+
+    :param session: 사용할 세션
+    :type session: :class:`sqlalchemy.orm.session.Session`
+    :param client: 사용할 우리말샘 API 클라이언트
+    :type client: :class:`word_way.scrapping.client.DictionaryClient`
+    :param parser_pool: 뜻풀이를 분석할 형태소 분석 풀
+    :type parser_pool: :class:`word_way.scrapping.word_parser.ParserPool`
+    :param preload: 저장된 발음 id 와 ``target_code`` 를 미리 모두 읽어둘지.
+                    많은 단어를 스크래핑할 때 읽기 쿼리를 줄입니다
+    :type preload: :class:`bool`
+
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        client: DictionaryClient,
+        parser_pool: ParserPool,
+        preload: bool = False,
+    ):
+        self.session = session
+        self.client = client
+        self.parser_pool = parser_pool
+        self.lookup = get_lookup_cache(session)
+        if preload:
+            self.lookup.preload(session)
+
+    def run(self, batches: typing.Iterable[typing.Sequence[str]]) -> None:
+        for batch in batches:
+            self.save_batch(batch)
+
+    def save_batch(
+        self, target_words: typing.Sequence[str],
+    ) -> typing.Dict[str, typing.Optional[uuid.UUID]]:
+        """단어 묶음을 스크래핑해서 저장하고 커밋합니다.
+
+        :return: 검색한 단어와 발음이 정확히 일치하는 발음 id.
+                 없다면 None 입니다
+        :rtype: typing.Dict[str, typing.Optional[uuid.UUID]]
+
+        """
+        log = logger.getChild('save_batch')
+        # 검색 요청을 보내는 동안 트랜잭션을 잡고 있지 않도록 먼저 끝냅니다.
+        self.session.commit()
+        results = dict(zip(
+            target_words, self.client.map(self.client.search, target_words),
+        ))
+        found = {
+            word: items for word, items in results.items() if items is not None
+        }
+        log.info(f'Fetched {len(found)}/{len(target_words)} words')
+
+        pronunciation_ids = ensure_pronunciations(self.session, [
+            item.pronunciation for items in found.values() for item in items
+        ], self.lookup)
+        senses = [
+            (item, sense)
+            for items in found.values()
+            for item in items
+            for sense in item.senses
+        ]
+        new_words = insert_words(self.session, [
+            {
+                'target_code': sense.target_code,
+                'part': convert_word_part(sense.part),
+                'contents': sense.definition,
+                'pronunciation_id': pronunciation_ids[item.pronunciation],
+            }
+            for item, sense in senses
+        ], self.lookup)
+        # 이전 실행에서 포함어 관계나 예문을 저장하기 전에 실패한 단어도 다시
+        # 처리합니다.  발음은 모두 저장한 뒤에만 스크래핑했다고 기록합니다.
+        words = {
+            word['id']: word
+            for word in find_unscrapped_words(
+                self.session, [sense.target_code for _, sense in senses],
+            )
+        }
+        words.update((word['id'], word) for word in new_words)
+        words = list(words.values())
+        self.session.commit()
+        log.info(f'Saved {len(new_words)} words')
+
+        parsed = self.parser_pool.submit(word['contents'] for word in words)
+        examples = self.client.map(
+            self.client.examples, [word['target_code'] for word in words],
+        )
+        self.save_include_words(words, parsed.result())
+        with_sentences = find_words_with_sentences(
+            self.session, [word['id'] for word in words],
+        )
+        sentences = insert_sentences(self.session, [
+            (word['id'], example)
+            for word, word_examples in zip(words, examples)
+            if word['id'] not in with_sentences
+            for example in word_examples or ()
+        ])
+        # 예문 요청이 실패한 발음은 다음 실행에서 다시 스크래핑합니다.
+        failed = {
+            word['pronunciation_id']
+            for word, word_examples in zip(words, examples)
+            if word_examples is None
+        }
+        if failed:
+            log.warning(
+                f'Failed to fetch examples of {len(failed)} pronunciations'
+            )
+        # 검색 결과가 없던 단어도 다시 검색하지 않도록 함께 기록합니다.
+        mark_scrapped(self.session, {
+            *pronunciation_ids.values(),
+            *find_pronunciations(self.session, found, self.lookup).values(),
+        } - failed)
+        self.session.commit()
+        log.info(f'Saved {sentences} sentences')
+        return {word: pronunciation_ids.get(word) for word in found}
+
+    def save_include_words(
+        self,
+        words: typing.Sequence[dict],
+        parsed: typing.Sequence[typing.Sequence[typing.Tuple]],
+    ) -> None:
+        """단어 뜻풀이에 포함된 단어를 포함어 관계로 저장합니다.
+
+        :param words: 포함어 관계를 저장할 단어
+        :param parsed: 단어마다 뜻풀이를 형태소 분석한 결과
+
+        """
+        include_words = {}
+        for word, tokens in zip(words, parsed):
+            include_words[word['id']] = {
+                include_word
+                for include_word, part in tokens
+                if part not in WordParser.unused_parts
+            }
+        pronunciation_ids = ensure_pronunciations(
+            self.session, set().union(*include_words.values()), self.lookup,
+        )
+        insert_relations(self.session, IncludeWordRelation, [
+            (word_id, pronunciation_ids[include_word])
+            for word_id, pronunciations in include_words.items()
+            for include_word in pronunciations
+        ])
@@ -0,0 +1,94 @@
+""":mod:`word_way.scrapping.tokenizer` --- 뜻풀이 형태소 분석기
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+``[SCRAPPING]`` 설정의 ``TOKENIZER`` 로 분석기를 고릅니다.
+
+- ``okt``: :class:`konlpy.tag.Okt` 로 형태소를 분석합니다.  JVM 이 필요합니다.
+- ``vocabulary``: 저장된 발음을 사전으로 삼아 가장 긴 단어부터 찾습니다.
+  JVM 없이 파이썬만으로 동작하며, 활용형(e.g. ``넓은`` → ``넓다``) 은 원형으로
+  바꾸지 않습니다.
+"""
+import abc
+import typing
+
+from konlpy.tag import Okt
+from sqlalchemy.orm.session import Session
+
+from word_way.models import Pronunciation
+
+__all__ = (
+    'OktTokenizer', 'Tokenizer', 'VocabularyTokenizer', 'create_tokenizer',
+    'load_vocabulary',
+)
+
+
+class Tokenizer(abc.ABC):
+    """형태소 분석기의 공통 인터페이스."""
+
+    @abc.abstractmethod
+    def parse(self, contents: str) -> typing.Sequence[typing.Tuple[str, str]]:
+        """``(형태소, 품사)`` 목록을 반환합니다."""
+
+
+class OktTokenizer(Tokenizer):
+
+    def __init__(self):
+        self.okt = Okt()
+
+    def parse(self, contents: str) -> typing.Sequence[typing.Tuple[str, str]]:
+        return self.okt.pos(contents, norm=True, stem=True)
+
+
+class VocabularyTokenizer(Tokenizer):
+    """어절마다 왼쪽부터 사전에 있는 가장 긴 단어를 찾습니다.
+
+    한 글자 단어는 조사(e.g. ``가``, ``의``) 와 구별할 수 없으므로 어절의 첫
+    글자일 때만 인정합니다.
+
+    :param vocabulary: 단어 사전
+    :type vocabulary: typing.Iterable[str]
+
+    """
+
+    #: 찾은 단어의 품사. 사전에는 품사가 없으므로 하나로 표시합니다.
+    part = 'Vocabulary'
+
+    def __init__(self, vocabulary: typing.Iterable[str]):
+        self.vocabulary = frozenset(word for word in vocabulary if word)
+        self.max_length = max(map(len, self.vocabulary), default=0)
+
+    def parse(self, contents: str) -> typing.Sequence[typing.Tuple[str, str]]:
+        vocabulary = self.vocabulary
+        tokens = []
+        for eojeol in contents.split():
+            start = 0
+            while start < len(eojeol):
+                end = min(len(eojeol), start + self.max_length)
+                shortest = start + 1 if start == 0 else start + 2
+                while end >= shortest and eojeol[start:end] not in vocabulary:
+                    end -= 1
+                if end >= shortest:
+                    tokens.append((eojeol[start:end], self.part))
+                    start = end
+                else:
+                    start += 1
+        return tokens
+
+
+def load_vocabulary(session: Session) -> typing.List[str]:
+    """저장된 발음 중 공백이 없는 것을 사전으로 가져옵니다."""
+    return [
+        pronunciation
+        for pronunciation, in session.query(Pronunciation.pronunciation)
+        if ' ' not in pronunciation
+    ]
+
+
+def create_tokenizer(
+    name: str, vocabulary: typing.Iterable[str] = (),
+) -> Tokenizer:
+    if name == 'okt':
+        return OktTokenizer()
+    elif name == 'vocabulary':
+        return VocabularyTokenizer(vocabulary)
+    raise ValueError(f'Unknown tokenizer: {name}')
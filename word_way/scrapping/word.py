@@ -1,47 +1,84 @@
 """:mod:`word_way.scrapping.word` --- 단어 정보 저장(DB)과 관련된 함수
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
-import logging
 import typing
 import uuid
-import xml.etree.ElementTree as elemTree
 
-from requests import get as requests_get
-from sqlalchemy import literal
 from sqlalchemy.orm.session import Session
-from urllib.parse import urljoin
 
 from word_way.celery import celery
 from word_way.context import session
-from word_way.config import get_word_api_config
-from word_way.models import (IncludeWordRelation, Pronunciation, Sentence,
-                             Word, WordSentenceAssoc)
-from word_way.scrapping.word_parser import WordParser
-from word_way.utils import convert_word_part, utc_now
+from word_way.config import current_config, get_scrapping_config
+from word_way.scrapping.client import get_dictionary_client
+from word_way.scrapping.pipeline import (ScrappingPipeline,
+                                         iter_pending_pronunciations)
+from word_way.scrapping.word_parser import get_parser_pool
+from word_way.search.graph import (clear_update_pending, mark_update_pending,
+                                   relation_graph_delay, relation_graph_path,
+                                   update_relation_graph)
 
-__all__ = ('save_word', 'save_word_task', 'save_words_task',)
-
-logger = logging.getLogger(__name__)
+__all__ = (
+    'save_word', 'save_word_task', 'save_words_task',
+    'schedule_relation_graph_update', 'update_relation_graph_task',
+)
 
 
 @celery.task
 def save_word_task(target_word: str):
     save_word(target_word, session)
+    schedule_relation_graph_update()
 
 
 @celery.task
 def save_words_task():
-    """단어가 없는 발음을 가져와서 단어를 저장하는 테스크"""
-    subquery = session.query(Word).filter(
-        Word.pronunciation_id == Pronunciation.id
+    """단어가 없는 발음을 가져와서 단어를 저장하는 테스크
+
+    ``[SCRAPPING]`` 설정의 ``BATCH_SIZE`` 개씩 묶어서 ``CONCURRENCY`` 개의
+    요청을 동시에 보내고, 묶음마다 한꺼번에 저장한 뒤 커밋합니다.
+    뜻풀이는 ``PARSER_WORKERS`` 개의 프로세스에서 형태소 분석합니다.
+
+    """
+    config = get_scrapping_config()
+    pipeline = ScrappingPipeline(
+        session,
+        get_dictionary_client(current_config),
+        get_parser_pool(current_config),
+        preload=True,
     )
-    pronunciations = session.query(Pronunciation).filter(
-        ~subquery.exists(),
-        Pronunciation.scrapped_at.is_(None),
-    ).all()
-    for pronunciation in pronunciations:
-        save_word(pronunciation.pronunciation, session)
-    session.commit()
+    pipeline.run(iter_pending_pronunciations(session, config['batch_size']))
+    schedule_relation_graph_update()
+
+
+@celery.task
+def update_relation_graph_task():
+    """스크래핑한 관계를 검색에 사용하는 관계 그래프에 반영하는 테스크"""
+    path = relation_graph_path(current_config)
+    if path is not None:
+        clear_update_pending(path)
+        update_relation_graph(session, path)
+
+
+def schedule_relation_graph_update() -> bool:
+    """관계 그래프를 다시 만드는 테스크를 예약합니다.
+
+    ``[SEARCH_GRAPH]`` 설정의 ``UPDATE_DELAY`` 뒤에 실행하고, 그 전에 다시
+    호출하면 이미 예약한 테스크가 함께 반영하므로 예약하지 않습니다.
+
+    :return: 테스크를 예약했는지
+    :rtype: :class:`bool`
+
+    """
+    path = relation_graph_path(current_config)
+    if path is None or not mark_update_pending(path):
+        return False
+    try:
+        update_relation_graph_task.apply_async(
+            countdown=relation_graph_delay(current_config),
+        )
+    except Exception:
+        clear_update_pending(path)
+        raise
+    return True
 
 
 def save_word(
@@ -57,134 +94,9 @@ def save_word(
     :rtype: typing.Optional[uuid.UUID]
 
     """
-    log = logger.getChild('save_word')
-    # 단어 기본 정보 요청
-    config = get_word_api_config()
-    params = {
-        'key': config.get('token'),
-        'q': target_word,
-        'target_type': 'search',
-        'part': 'word',
-        'sort': 'dict',
-    }
-    url = urljoin(config.get('url'), 'search')
-    res = requests_get(url, params=params)
-    if not res.ok:
-        return
-
-    pronunciation_id = None
-    tree = elemTree.fromstring(res.text)
-    for item in tree.findall('item'):
-        pronunciation_word = item.findtext('word')
-        if not pronunciation_word:
-            continue
-        pronunciation_word = \
-            pronunciation_word.replace('-', '').replace('^', ' ')
-        log.info(f'Start saving the word ({pronunciation_word})')
-        pronunciation = session.query(Pronunciation).filter(
-            Pronunciation.pronunciation == pronunciation_word
-        ).one_or_none()
-        if not pronunciation:
-            pronunciation = Pronunciation(pronunciation=pronunciation_word)
-            session.add(pronunciation)
-            session.flush()
-        if pronunciation_word == target_word:
-            pronunciation_id = pronunciation.id
-        for sense in item.findall('sense'):
-            target_code = sense.findtext('target_code')
-            q = session.query(Word).filter(Word.target_code == target_code)
-            word_exists = session.query(literal(True)).filter(
-                q.exists()
-            ).scalar()
-            if word_exists:
-                continue
-            word = Word(
-                target_code=int(target_code),
-                part=convert_word_part(sense.findtext('pos')),
-                contents=sense.findtext('definition'),
-                pronunciation_id=pronunciation.id,
-            )
-            session.add(word)
-            session.flush()
-            save_include_word(word, session)
-            save_example_sentence(word, session)
-        pronunciation.scrapped_at = utc_now()
-        log.info(f'Done saving the word ({pronunciation_word})')
-    session.commit()
-    return pronunciation_id
-
-
-def save_example_sentence(word: Word, session: Session) -> None:
-    """단어의 예문을 가져와 저장합니다.
-
-    :param word: 추가 정보를 저장할 단어
-    :type word: :class:`Word`
-    :param session: 사용할 세션
-    :type session: :class:`sqlalchemy.orm.session.Session
-
-    """
-    log = logger.getChild('save_example_sentence')
-    # 단어 추가 정보 요청
-    config = get_word_api_config()
-    params = {
-        'key': config.get('token'),
-        'q': word.target_code,
-        'target_type': 'view',
-        'method': 'target_code',
-    }
-    url = urljoin(config.get('url'), 'view')
-    res = requests_get(url, params=params)
-    if not res.ok:
-        session.expunge(word)
-
-    tree = elemTree.fromstring(res.text)
-    sense_info = tree.find('item').find('senseInfo')
-
-    for example_info in sense_info.findall('example_info'):
-        example = example_info.findtext('example')
-        log.info(f'Start saving the sentence({example}) about {word.id}')
-        sentence = Sentence(sentence=example)
-        session.add(sentence)
-        session.flush()
-        assoc = WordSentenceAssoc(word_id=word.id, sentence_id=sentence.id)
-        session.add(assoc)
-        session.flush()
-        log.info(f'Done saving the sentence({example}) about {word.id}')
-
-
-def save_include_word(word: Word, session: Session) -> None:
-    """단어의 포함어를 저장합니다.
-
-    :param word: 포함어를 저장할 대상 단어
-    :type word: :class:`Word`
-    :param session: 사용할 세션
-    :type session: :class:`sqlalchemy.orm.session.Session
-
-    """
-    log = logger.getChild('save_include_word')
-    word_parser = WordParser()
-    for include_word, part in word_parser.parse(word.contents):
-        log.info(f'Start saving the word ({include_word}) in {word.id}')
-        if part in word_parser.unused_parts:
-            log.info(f'The word ({include_word}, {part}) is in unused_parts')
-            continue
-        pronunciation = session.query(Pronunciation).filter(
-            Pronunciation.pronunciation == include_word
-        ).one_or_none()
-        relation = None
-        if not pronunciation:
-            pronunciation = Pronunciation(pronunciation=include_word)
-            session.add(pronunciation)
-            session.flush()
-        else:
-            relation = session.query(IncludeWordRelation).filter(
-                IncludeWordRelation.criteria_id == word.id,
-                IncludeWordRelation.relation_id == pronunciation.id,
-            ).one_or_none()
-        if not relation:
-            relation = IncludeWordRelation(
-                criteria_id=word.id, relation_id=pronunciation.id,
-            )
-            session.add(relation)
-            session.flush()
-        log.info(f'Done saving the word ({include_word}) in {word.id}')
+    pipeline = ScrappingPipeline(
+        session,
+        get_dictionary_client(current_config),
+        get_parser_pool(current_config),
+    )
+    return pipeline.save_batch([target_word]).get(target_word)
@@ -1,23 +1,243 @@
+import concurrent.futures
+import functools
+import logging
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
 import typing
 
-from konlpy.tag import Okt
+from celery.signals import worker_process_init
 
+from word_way.celery import celery
+from word_way.context import create_session
+from word_way.scrapping.tokenizer import (OktTokenizer, Tokenizer,
+                                          create_tokenizer, load_vocabulary)
+from word_way.utils import chunked
 
-__all__ = 'WordParser',
+
+__all__ = (
+    'ParseResult', 'ParserPool', 'ParserProcess', 'WordParser',
+    'get_parser_pool',
+)
+
+logger = logging.getLogger(__name__)
+
+_pools: typing.Dict[tuple, 'ParserPool'] = {}
+_pools_lock = threading.Lock()
 
 
 class WordParser:
+    """뜻풀이를 형태소 분석하고 결과를 캐시합니다.
+
+    :param tokenizer: 사용할 형태소 분석기
+    :type tokenizer: :class:`word_way.scrapping.tokenizer.Tokenizer`
+
+    """
+
     unused_parts = ['Punctuation']
 
-    def __new__(cls, *args, **kwargs):
-        # Okt class 로딩 속도를 줄이기 위해 한 번만 생성합니다.
-        if not hasattr(cls, 'instance'):
-            cls.instance = super().__new__(cls, *args, **kwargs)
-        return cls.instance
+    #: (:class:`int`) 형태소 분석 결과를 캐시할 최대 뜻풀이 수
+    cache_size = 4096
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.parser = Okt()
+    def __init__(self, tokenizer: Tokenizer):
+        self.tokenizer = tokenizer
+        self.parse = functools.lru_cache(self.cache_size)(self.parse)
 
     def parse(self, contents: str) -> typing.Sequence[typing.Tuple]:
-        return self.parser.pos(contents, norm=True, stem=True)
+        return tuple(self.tokenizer.parse(contents))
+
+    def parse_many(
+        self, contents_list: typing.Iterable[str],
+    ) -> typing.List[typing.Sequence[typing.Tuple]]:
+        """여러 뜻풀이를 분석합니다. 같은 뜻풀이는 한 번만 분석합니다."""
+        contents_list = list(contents_list)
+        parsed = {
+            contents: self.parse(contents)
+            for contents in dict.fromkeys(contents_list)
+        }
+        return [parsed[contents] for contents in contents_list]
+
+    def warm_up(self) -> None:
+        # 첫 작업이 분석기(JVM) 를 띄우는 시간을 기다리지 않도록 미리 분석합니다.
+        self.parse('단어')
+
+
+class ParserProcess:
+    """:mod:`word_way.scrapping.parser_worker` 를 실행하는 자식 프로세스.
+
+    :mod:`multiprocessing` 대신 :mod:`subprocess` 로 띄우므로 데몬
+    프로세스(celery prefork 워커) 안에서도 만들 수 있습니다.  자식 프로세스는
+    부모와 같은 :data:`sys.path` 에서 모듈을 찾습니다.
+
+    """
+
+    def __init__(self, tokenizer_factory: typing.Callable[[], Tokenizer]):
+        path = os.pathsep.join(path for path in sys.path if path)
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'word_way.scrapping.parser_worker'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=dict(os.environ, PYTHONPATH=path),
+        )
+        self.send(tokenizer_factory)
+
+    def send(self, value) -> None:
+        pickle.dump(value, self.process.stdin)
+        self.process.stdin.flush()
+
+    def parse_many(
+        self, contents_list: typing.Sequence[str],
+    ) -> typing.List[typing.Sequence[typing.Tuple]]:
+        try:
+            self.send(list(contents_list))
+            ok, result = pickle.load(self.process.stdout)
+        except (BrokenPipeError, EOFError):
+            raise RuntimeError(
+                f'Parser process exited with {self.process.wait()}'
+            )
+        if not ok:
+            raise RuntimeError(f'Parser process failed: {result}')
+        return result
+
+    def close(self) -> None:
+        # 표준 입력이 닫히면 자식 프로세스가 끝납니다.
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            # 이미 끝난 프로세스에 보내지 못한 내용은 버립니다.
+            pass
+        self.process.wait()
+        self.process.stdout.close()
+
+
+class ParseResult:
+    """:meth:`ParserPool.submit` 으로 나눠서 보낸 분석 작업의 결과."""
+
+    def __init__(self, futures: typing.Sequence[concurrent.futures.Future]):
+        self.futures = futures
+
+    def result(self) -> typing.List[typing.Sequence[typing.Tuple]]:
+        """모든 분석이 끝날 때까지 기다리고 뜻풀이 순서대로 반환합니다."""
+        return [
+            tokens for future in self.futures for tokens in future.result()
+        ]
+
+
+class ParserPool:
+    """형태소 분석을 별도의 프로세스(:class:`ParserProcess`) 에서 처리합니다.
+
+    CPU 를 쓰는 형태소 분석이 도는 동안 스크래핑은 API 요청을 계속 보낼 수
+    있습니다.  ``workers`` 가 0 이면 현재 프로세스에서 바로 분석합니다.
+    분석 프로세스가 죽으면 다음 요청에서 새로 띄웁니다.
+
+    :param workers: 형태소 분석 프로세스 수
+    :type workers: :class:`int`
+    :param tokenizer_factory: 분석 프로세스마다 형태소 분석기를 만들 함수.
+                              프로세스에 넘길 수 있도록 피클할 수 있어야 합니다
+    :type tokenizer_factory: typing.Callable[[], Tokenizer]
+
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        tokenizer_factory: typing.Callable[[], Tokenizer] = OktTokenizer,
+    ):
+        self.workers = workers
+        self.tokenizer_factory = tokenizer_factory
+        if workers:
+            self.word_parser = None
+            # 분석 프로세스는 미리 띄워서 분석기를 준비시켜 둡니다.
+            self.processes = queue.Queue()
+            for _ in range(workers):
+                self.processes.put(ParserProcess(tokenizer_factory))
+            self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+        else:
+            self.word_parser = WordParser(tokenizer_factory())
+            self.word_parser.warm_up()
+            self.executor = None
+
+    def parse_many(
+        self, contents_list: typing.Sequence[str],
+    ) -> typing.List[typing.Sequence[typing.Tuple]]:
+        process = self.processes.get()
+        try:
+            if process is None:
+                process = ParserProcess(self.tokenizer_factory)
+            return process.parse_many(contents_list)
+        except Exception:
+            if process is not None:
+                logger.warning('Restarting the parser process', exc_info=True)
+                process.process.kill()
+                process.close()
+                process = None
+            raise
+        finally:
+            self.processes.put(process)
+
+    def submit(self, contents_list: typing.Iterable[str]) -> ParseResult:
+        """뜻풀이를 프로세스 수만큼 나눠서 분석을 요청합니다."""
+        contents_list = list(contents_list)
+        if self.executor is None:
+            future = concurrent.futures.Future()
+            future.set_result(self.word_parser.parse_many(contents_list))
+            return ParseResult([future])
+        size = max(1, -(-len(contents_list) // self.workers))
+        return ParseResult([
+            self.executor.submit(self.parse_many, chunk)
+            for chunk in chunked(contents_list, size)
+        ])
+
+    def close(self) -> None:
+        if self.executor is None:
+            return
+        self.executor.shutdown()
+        while not self.processes.empty():
+            process = self.processes.get()
+            if process is not None:
+                process.close()
+
+
+def get_parser_pool(config: typing.Mapping) -> ParserPool:
+    """설정에 맞는 풀을 프로세스마다 한 번만 만들어서 반환합니다.
+
+    ``[SCRAPPING]`` 설정의 ``PARSER_WORKERS`` 로 프로세스 수를,
+    ``TOKENIZER`` 로 형태소 분석기를 고릅니다.
+
+    """
+    scrapping_config = config['SCRAPPING'] if 'SCRAPPING' in config else {}
+    workers = int(scrapping_config.get('PARSER_WORKERS', 0))
+    name = scrapping_config.get('TOKENIZER', 'okt')
+    key = os.getpid(), config['DATABASE']['URL'], workers, name
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ParserPool(
+                    workers, tokenizer_factory(config, name),
+                )
+    return pool
+
+
+def tokenizer_factory(
+    config: typing.Mapping, name: str,
+) -> typing.Callable[[], Tokenizer]:
+    vocabulary = ()
+    if name == 'vocabulary':
+        session = create_session(config)
+        try:
+            vocabulary = load_vocabulary(session)
+        finally:
+            session.close()
+    return functools.partial(create_tokenizer, name, vocabulary)
+
+
+@worker_process_init.connect
+def warm_up_parser_pool(**kwargs):
+    config = celery.conf.get('APP_CONFIG')
+    if config is not None:
+        get_parser_pool(config)
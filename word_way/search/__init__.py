@@ -0,0 +1,3 @@
+""":mod:`word_way.search` --- 단어 검색을 위한 자료구조와 쿼리
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+"""
@@ -0,0 +1,342 @@
+""":mod:`word_way.search.cache` --- 단어 검색 응답 캐시
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+같은 검색어 조합에 대한 응답 본문을 캐시합니다.  ``[SEARCH_CACHE]`` 설정의
+``BACKEND`` 로 저장소를 고릅니다.
+
+- ``memory``: 프로세스 안의 LRU 캐시. ``MAX_SIZE`` 개까지, ``TTL`` 초 동안 보관합니다.
+  무효화가 다른 프로세스에 전달되지 않으므로 개발과 테스트에서만 사용합니다.
+- ``redis``: ``REDIS_URL`` (없으면 ``[WORKER]`` 의 ``BROKER_URL``) 의 Redis.
+  웹 서버 프로세스끼리 캐시를 나눠 쓰고 스크래핑 워커의 무효화를 바로 반영합니다.
+- ``none``: 캐시하지 않습니다. ``BACKEND`` 를 설정하지 않았을 때의 기본값입니다.
+
+캐시 키에는 버전이 들어가며, 발음/단어/단어 관계를 추가하거나 바꾼 세션이
+커밋되면 버전을 올려서 이전 응답을 모두 무효화합니다.  스크래핑하는 동안에는
+커밋마다 무효화하면 캐시가 적중하지 않으므로 ``INVALIDATE_INTERVAL`` 초에 한
+번만 무효화하고, 그 사이에 커밋한 내용은 다음 무효화나 ``TTL`` 이 지난 뒤에
+반영됩니다.  ``memory`` 저장소의 버전은 프로세스 안에서만 공유되므로 다른
+프로세스에서 스크래핑한 결과는 ``TTL`` 이 지난 뒤에 반영됩니다.
+
+복제본은 주 데이터베이스보다 늦을 수 있으므로, 무효화한 직후 복제본에서 읽은
+응답은 커밋하기 전 내용일 수 있습니다.  그래서 무효화한 뒤 복제 지연
+(``[DATABASE]`` 의 ``REPLICA_MAX_LAG``) 동안은 복제본에서 읽은 응답을 캐시하지
+않습니다.  ``redis`` 저장소는 무효화한 시각을 버전으로 사용합니다.
+"""
+import abc
+import collections
+import hashlib
+import logging
+import os
+import threading
+import time
+import typing
+
+from redis import Redis, RedisError
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+
+from word_way.models import Pronunciation, Word, WordRelation
+from word_way.orm import Session as SessionFactory
+
+__all__ = (
+    'MemorySearchCache', 'NullSearchCache', 'RedisSearchCache',
+    'SearchCache', 'get_search_cache', 'make_cache_key',
+    'mark_search_changed', 'track_search_changes',
+)
+
+logger = logging.getLogger(__name__)
+
+_caches: typing.Dict[typing.Tuple[int, str], 'SearchCache'] = {}
+_caches_lock = threading.Lock()
+
+#: 검색 결과에 영향을 주는 모델
+SEARCH_MODELS = Pronunciation, Word, WordRelation
+
+
+class SearchCache(abc.ABC):
+    """검색 응답 캐시의 공통 인터페이스.
+
+    :param invalidate_interval: :meth:`invalidate` 가 무효화하는 최소 간격 (초)
+    :type invalidate_interval: :class:`float`
+
+    """
+
+    def __init__(self, invalidate_interval: float = 0.0):
+        self.hits = 0
+        self.misses = 0
+        self.invalidate_interval = invalidate_interval
+        #: (:class:`float`) :meth:`invalidate` 가 마지막으로 무효화한
+        #: :func:`time.monotonic` 시각
+        self.bumped_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def invalidate(self) -> bool:
+        """검색 대상을 바꾼 세션이 커밋되었을 때 호출합니다.
+
+        마지막으로 무효화한 지 ``invalidate_interval`` 초가 지났을 때만
+        :meth:`bump_version` 을 호출합니다.
+
+        :return: 무효화했는지
+        :rtype: :class:`bool`
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self.bumped_at < self.invalidate_interval:
+                return False
+            self.bumped_at = now
+        self.bump_version()
+        return True
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, lag: float = 0.0) -> None:
+        """``value`` 를 캐시합니다.
+
+        :param lag: ``value`` 를 읽은 복제본이 늦을 수 있는 시간 (초).
+                    무효화한 지 이만큼 지나지 않았으면 캐시하지 않습니다
+
+        """
+
+    @abc.abstractmethod
+    def bump_version(self) -> None:
+        """저장된 응답을 모두 무효화합니다."""
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> typing.Optional[bytes]:
+        """캐시한 값을 반환합니다. 없으면 :const:`None` 입니다."""
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': type(self).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+
+class NullSearchCache(SearchCache):
+
+    def _get(self, key: str) -> typing.Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, lag: float = 0.0) -> None:
+        pass
+
+    def bump_version(self) -> None:
+        pass
+
+
+class MemorySearchCache(SearchCache):
+    """프로세스 안의 LRU 캐시.
+
+    다른 프로세스(e.g. 스크래핑 워커) 에서 커밋한 내용은 ``ttl`` 이 지난
+    뒤에야 반영되므로 개발과 테스트에서만 사용합니다.
+
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float, invalidate_interval: float = 0.0,
+    ):
+        super().__init__(invalidate_interval)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: typing.MutableMapping[
+            str, typing.Tuple[float, bytes]
+        ] = collections.OrderedDict()
+        #: (:class:`float`) 마지막으로 무효화한 :func:`time.monotonic` 시각
+        self.invalidated_at = float('-inf')
+        self.lock = threading.Lock()
+
+    def _get(self, key: str) -> typing.Optional[bytes]:
+        with self.lock:
+            try:
+                expires_at, value = self.entries[key]
+            except KeyError:
+                return None
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, lag: float = 0.0) -> None:
+        with self.lock:
+            now = time.monotonic()
+            if now - self.invalidated_at < lag:
+                return
+            self.entries[key] = now + self.ttl, value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def bump_version(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.invalidated_at = time.monotonic()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats['size'] = len(self.entries)
+        return stats
+
+
+class RedisSearchCache(SearchCache):
+    """버전은 마지막으로 무효화한 밀리초 단위 유닉스 시간입니다.
+
+    버전을 읽고 그 버전의 키를 읽거나 쓰는 일을 Lua 스크립트 하나로 처리하므로
+    요청마다 Redis 와 한 번만 주고받습니다.  스크립트가 ``KEYS`` 로 넘기지 않은
+    키를 사용하므로 Redis Cluster 에서는 사용할 수 없습니다.
+
+    """
+
+    prefix = 'word_way:search'
+
+    #: 버전을 현재 시각으로 올리는 스크립트. 같은 밀리초에 여러 번 무효화해도
+    #: 버전이 항상 커지도록 합니다.  다른 프로세스가 ``ARGV[2]`` 밀리초 안에
+    #: 무효화했으면 올리지 않고 0 을 반환합니다.
+    bump_script = """
+    local version = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    if interval > 0 and now - version < interval then
+        return 0
+    end
+    if now <= version then
+        now = version + 1
+    end
+    redis.call('SET', KEYS[1], now)
+    return now
+    """
+
+    #: 현재 버전의 키를 읽는 스크립트. ``ARGV``: 접두어, 키
+    get_script = """
+    local version = redis.call('GET', KEYS[1]) or '0'
+    return redis.call('GET', ARGV[1] .. ':' .. version .. ':' .. ARGV[2])
+    """
+
+    #: 현재 버전의 키에 쓰는 스크립트. 무효화한 지 ``lag`` 밀리초가 지나지
+    #: 않았으면 쓰지 않습니다.  ``ARGV``: 접두어, 키, 현재 시각, lag, TTL, 값
+    set_script = """
+    local version = redis.call('GET', KEYS[1]) or '0'
+    if tonumber(ARGV[3]) - tonumber(version) < tonumber(ARGV[4]) then
+        return 0
+    end
+    redis.call(
+        'SETEX', ARGV[1] .. ':' .. version .. ':' .. ARGV[2], ARGV[5], ARGV[6]
+    )
+    return 1
+    """
+
+    def __init__(self, url: str, ttl: int, invalidate_interval: float = 0.0):
+        super().__init__(invalidate_interval)
+        self.redis = Redis.from_url(url)
+        self.ttl = ttl
+        self.version_key = f'{self.prefix}:version'
+        self.bump = self.redis.register_script(self.bump_script)
+        self.get_current = self.redis.register_script(self.get_script)
+        self.set_current = self.redis.register_script(self.set_script)
+
+    def _get(self, key: str) -> typing.Optional[bytes]:
+        try:
+            return self.get_current(
+                keys=[self.version_key], args=[self.prefix, key],
+            )
+        except RedisError:
+            logger.exception('Failed to read the search cache')
+            return None
+
+    def set(self, key: str, value: bytes, lag: float = 0.0) -> None:
+        try:
+            self.set_current(keys=[self.version_key], args=[
+                self.prefix, key, int(time.time() * 1000), int(lag * 1000),
+                self.ttl, value,
+            ])
+        except RedisError:
+            logger.exception('Failed to write the search cache')
+
+    def bump_version(self) -> None:
+        # 이전 버전의 키는 TTL 이 지나면 Redis 가 지웁니다.
+        try:
+            self.bump(keys=[self.version_key], args=[
+                int(time.time() * 1000), int(self.invalidate_interval * 1000),
+            ])
+        except RedisError:
+            logger.exception('Failed to invalidate the search cache')
+
+
+def make_cache_key(keywords: typing.Iterable[str], **params) -> str:
+    """검색어 순서와 상관없이 같은 검색에 같은 키를 만듭니다."""
+    parts = sorted(set(keywords))
+    parts += [f'{k}={v}' for k, v in sorted(params.items())]
+    return hashlib.sha1('\x1f'.join(parts).encode()).hexdigest()
+
+
+def get_search_cache(config: typing.Mapping) -> SearchCache:
+    """설정에 맞는 캐시를 프로세스마다 한 번만 만들어서 반환합니다."""
+    key = os.getpid(), config['DATABASE']['URL']
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = create_search_cache(config)
+    return cache
+
+
+def create_search_cache(config: typing.Mapping) -> SearchCache:
+    cache_config = config['SEARCH_CACHE'] if 'SEARCH_CACHE' in config else {}
+    backend = cache_config.get('BACKEND', 'none')
+    ttl = int(cache_config.get('TTL', 60))
+    interval = float(cache_config.get('INVALIDATE_INTERVAL', 10))
+    if backend == 'memory':
+        return MemorySearchCache(
+            int(cache_config.get('MAX_SIZE', 1024)), ttl, interval,
+        )
+    elif backend == 'redis':
+        url = cache_config.get('REDIS_URL') or config['WORKER']['BROKER_URL']
+        return RedisSearchCache(url, ttl, interval)
+    elif backend == 'none':
+        return NullSearchCache(interval)
+    raise ValueError(f'Unknown search cache backend: {backend}')
+
+
+def track_search_changes(session: Session, config: typing.Mapping) -> None:
+    """세션이 커밋할 때 검색 캐시를 무효화할 수 있도록 설정을 기록합니다."""
+    session.info['config'] = config
+
+
+def mark_search_changed(session: Session) -> None:
+    """ORM 을 거치지 않고 검색 대상을 바꿨을 때 호출합니다.
+
+    세션이 커밋되면 검색 캐시를 무효화합니다.
+
+    """
+    session.info['search_changed'] = True
+
+
+@event.listens_for(SessionFactory, 'after_flush')
+def detect_search_changes(session: Session, flush_context) -> None:
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(instance, SEARCH_MODELS) for instance in changed):
+        mark_search_changed(session)
+
+
+@event.listens_for(SessionFactory, 'after_commit')
+def invalidate_search_cache(session: Session) -> None:
+    if not session.info.pop('search_changed', False):
+        return
+    config = session.info.get('config')
+    if config is not None:
+        get_search_cache(config).invalidate()
@@ -0,0 +1,416 @@
+""":mod:`word_way.search.graph` --- 유의어/포함어 관계 그래프
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+발음 사이의 관계를 CSR(compressed sparse row) 배열로 파일에 저장해두고, 웹
+서버 프로세스마다 :mod:`mmap` 으로 열어서 검색할 때 DB 대신 사용합니다.
+여러 프로세스가 같은 파일을 열어도 운영체제의 페이지 캐시를 함께 씁니다.
+
+관계 종류 (:data:`KINDS`)
+
+- ``synonyms``: 발음 → 유의어 발음
+- ``synonym_of``: 유의어 발음 → 발음 (``synonyms`` 의 역방향)
+- ``includes``: 발음 → 그 발음의 단어 뜻풀이에 포함된 발음
+- ``included_by``: 포함된 발음 → 발음 (``includes`` 의 역방향)
+
+관계가 있는 발음만 노드가 되며, 노드 번호는 UTF-8 로 인코딩한 발음 순서입니다.
+발음으로 노드를 찾을 때는 이분 탐색을 합니다.
+
+``[SEARCH_GRAPH]`` 설정의 ``PATH`` 에 파일을 저장합니다.
+:func:`update_relation_graph` 는 모든 관계를 다시 읽어서 임시 파일에 만든 뒤
+바꿔 끼우고, 웹 서버 프로세스는 파일이 바뀐 것을 보고 다시 엽니다.  모든 관계를
+다시 읽으므로 지운 관계나 늦게 커밋된 관계도 반영됩니다.  스크래핑할 때마다
+다시 만들지 않도록 :func:`mark_update_pending` 으로 한 번만 예약해두고, 예약한
+작업이 시작할 때 :func:`clear_update_pending` 으로 예약을 풉니다.
+"""
+import contextlib
+import datetime
+import fcntl
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import typing
+import uuid
+from array import array
+
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
+
+from word_way.models import (IncludeWordRelation, Pronunciation,
+                             SynonymsWordRelation, Word)
+from word_way.search.cache import get_search_cache
+from word_way.utils import utc_now
+
+__all__ = (
+    'KINDS', 'RelationGraph', 'clear_update_pending', 'get_relation_graph',
+    'mark_update_pending', 'relation_graph_delay', 'relation_graph_path',
+    'update_relation_graph', 'write_relation_graph',
+)
+
+#: 그래프에 저장하는 관계 종류
+KINDS = 'synonyms', 'synonym_of', 'includes', 'included_by'
+
+#: (:class:`bytes`) 파일 형식 식별자
+MAGIC = b'WWRG0001'
+
+#: (:class:`float`) 파일이 바뀌었는지 확인하는 최소 간격 (초)
+REFRESH_INTERVAL = 5.0
+
+#: (:class:`float`) 예약한 갱신 작업이 이 시간 (초) 안에 시작하지 않으면
+#: 작업을 잃어버렸다고 보고 다시 예약합니다
+PENDING_TIMEOUT = 600.0
+
+_graphs: typing.Dict[typing.Tuple[int, str], 'RelationGraph'] = {}
+_graphs_lock = threading.Lock()
+
+Node = typing.Tuple[uuid.UUID, str]
+Edge = typing.Tuple[uuid.UUID, uuid.UUID]
+
+
+class RelationGraph:
+    """:func:`write_relation_graph` 로 저장한 그래프를 읽습니다.
+
+    :param buffer: 파일 내용. 보통 :class:`mmap.mmap` 입니다
+    :param mtime: 파일을 수정한 시각. 파일이 바뀌었는지 확인할 때 사용합니다
+    :type mtime: :class:`float`
+
+    """
+
+    def __init__(self, buffer, mtime: float = 0.0):
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError('not a relation graph file')
+        header_size = int.from_bytes(
+            view[len(MAGIC):len(MAGIC) + 4], 'little',
+        )
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_size]))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError('the graph was written on another byte order')
+        self.buffer = buffer
+        self.mtime = mtime
+        self.checked_at = 0.0
+        #: (:class:`datetime.datetime`) 그래프에 반영한 관계를 읽기 시작한 시각
+        self.built_at = datetime.datetime.fromisoformat(header['built_at'])
+
+        def section(name: str, format: typing.Optional[str] = None):
+            offset, size = header['sections'][name]
+            data = view[offset:offset + size]
+            return data.cast(format) if format else data
+
+        self.size = header['nodes']
+        self.ids = section('ids')
+        self.text_offsets = section('text_offsets', 'I')
+        self.texts = section('texts')
+        self.csr = {
+            kind: (section(f'{kind}.indptr', 'I'),
+                   section(f'{kind}.indices', 'I'))
+            for kind in KINDS
+        }
+
+    @classmethod
+    def load(cls, path: str) -> 'RelationGraph':
+        with open(path, 'rb') as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, mtime)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def id(self, node: int) -> uuid.UUID:
+        return uuid.UUID(bytes=bytes(self.ids[node * 16:node * 16 + 16]))
+
+    def encoded_text(self, node: int) -> bytes:
+        return bytes(
+            self.texts[self.text_offsets[node]:self.text_offsets[node + 1]]
+        )
+
+    def text(self, node: int) -> str:
+        return self.encoded_text(node).decode()
+
+    def find(self, text: str) -> typing.Optional[int]:
+        """발음의 노드 번호를 찾습니다. 관계가 없는 발음이면 None 입니다."""
+        key = text.encode()
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.encoded_text(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self.encoded_text(low) == key:
+            return low
+        return None
+
+    def neighbors(self, kind: str, node: int) -> typing.Sequence[int]:
+        """``kind`` 관계로 이어진 노드 번호를 정렬된 순서로 반환합니다."""
+        indptr, indices = self.csr[kind]
+        return indices[indptr[node]:indptr[node + 1]]
+
+    def degree(self, kind: str, node: int) -> int:
+        indptr, _ = self.csr[kind]
+        return indptr[node + 1] - indptr[node]
+
+    def nodes(self) -> typing.Iterator[Node]:
+        for node in range(self.size):
+            yield self.id(node), self.text(node)
+
+    def edges(self, kind: str) -> typing.Iterator[Edge]:
+        """``kind`` 관계를 ``(발음 id, 관련된 발음 id)`` 로 반환합니다."""
+        indptr, indices = self.csr[kind]
+        for node in range(self.size):
+            id_ = self.id(node)
+            for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                yield id_, self.id(neighbor)
+
+
+def csr(
+    size: int, edges: typing.Iterable[typing.Tuple[int, int]],
+) -> typing.Tuple[array, array]:
+    """``(출발 노드, 도착 노드)`` 목록으로 CSR 배열을 만듭니다."""
+    edges = sorted(set(edges))
+    indptr = array('I', [0]) * (size + 1)
+    for source, _ in edges:
+        indptr[source + 1] += 1
+    for node in range(size):
+        indptr[node + 1] += indptr[node]
+    return indptr, array('I', [target for _, target in edges])
+
+
+def write_relation_graph(
+    path: str,
+    nodes: typing.Mapping[uuid.UUID, str],
+    synonyms: typing.Iterable[Edge],
+    includes: typing.Iterable[Edge],
+    built_at: datetime.datetime,
+) -> None:
+    """관계를 그래프 파일로 저장합니다.
+
+    임시 파일에 쓴 뒤 바꿔치기하므로 파일을 열어둔 프로세스는 영향을 받지 않습니다.
+
+    :param nodes: ``{발음 id: 발음}``
+    :param synonyms: ``(발음 id, 유의어 발음 id)`` 목록
+    :param includes: ``(발음 id, 포함된 발음 id)`` 목록
+    :param built_at: 관계를 읽기 시작한 시각
+
+    """
+    synonyms = set(synonyms)
+    includes = set(includes)
+    used = {id_ for edge in synonyms | includes for id_ in edge}
+    ordered = sorted(
+        ((nodes[id_].encode(), id_) for id_ in used), key=lambda n: n[0],
+    )
+    index = {id_: node for node, (_, id_) in enumerate(ordered)}
+    size = len(ordered)
+    text_offsets = array('I', [0])
+    for text, _ in ordered:
+        text_offsets.append(text_offsets[-1] + len(text))
+    synonym_edges = [(index[a], index[b]) for a, b in synonyms]
+    include_edges = [(index[a], index[b]) for a, b in includes]
+    sections = {
+        'ids': b''.join(id_.bytes for _, id_ in ordered),
+        'text_offsets': text_offsets.tobytes(),
+        'texts': b''.join(text for text, _ in ordered),
+    }
+    for kind, edges in (
+        ('synonyms', synonym_edges),
+        ('synonym_of', [(b, a) for a, b in synonym_edges]),
+        ('includes', include_edges),
+        ('included_by', [(b, a) for a, b in include_edges]),
+    ):
+        indptr, indices = csr(size, edges)
+        sections[f'{kind}.indptr'] = indptr.tobytes()
+        sections[f'{kind}.indices'] = indices.tobytes()
+
+    # 헤더 크기가 섹션 위치에 영향을 주므로 위치가 바뀌지 않을 때까지 계산합니다.
+    header_size = 0
+    while True:
+        offset = align(len(MAGIC) + 4 + header_size)
+        positions = {}
+        for name, data in sections.items():
+            positions[name] = [offset, len(data)]
+            offset = align(offset + len(data))
+        header = json.dumps({
+            'nodes': size,
+            'byteorder': sys.byteorder,
+            'built_at': built_at.isoformat(),
+            'sections': positions,
+        }).encode()
+        if len(header) == header_size:
+            break
+        header_size = len(header)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(4, 'little'))
+        f.write(header)
+        for name, data in sections.items():
+            f.write(b'\0' * (positions[name][0] - f.tell()))
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def align(offset: int, size: int = 8) -> int:
+    return -(-offset // size) * size
+
+
+def query_relations(
+    session: Session,
+) -> typing.Tuple[typing.Dict[uuid.UUID, str], typing.Set[Edge],
+                  typing.Set[Edge]]:
+    """모든 관계와 관계에 포함된 발음을 읽습니다."""
+    criteria = aliased(Pronunciation, name='criteria')
+    related = aliased(Pronunciation, name='related')
+    synonyms = session.query(
+        criteria.id, criteria.pronunciation,
+        related.id, related.pronunciation,
+    ).select_from(SynonymsWordRelation).join(
+        criteria, criteria.id == SynonymsWordRelation.criteria_id,
+    ).join(
+        related, related.id == SynonymsWordRelation.relation_id,
+    )
+    includes = session.query(
+        criteria.id, criteria.pronunciation,
+        related.id, related.pronunciation,
+    ).select_from(IncludeWordRelation).join(
+        Word, Word.id == IncludeWordRelation.criteria_id,
+    ).join(
+        criteria, criteria.id == Word.pronunciation_id,
+    ).join(
+        related, related.id == IncludeWordRelation.relation_id,
+    )
+    nodes = {}
+    edges = set(), set()
+    for query, kind_edges in zip((synonyms, includes), edges):
+        for a, a_text, b, b_text in query.yield_per(10000):
+            nodes[a] = a_text
+            nodes[b] = b_text
+            kind_edges.add((a, b))
+    return (nodes, *edges)
+
+
+def update_relation_graph(session: Session, path: str) -> bool:
+    """모든 관계를 다시 읽어서 그래프 파일을 만듭니다.
+
+    여러 작업이 동시에 파일을 바꿔 끼우지 않도록 ``{path}.lock`` 을 잠그고
+    한 번에 하나씩 만듭니다.
+
+    :param session: 사용할 세션
+    :type session: :class:`sqlalchemy.orm.session.Session`
+    :param path: 그래프 파일 경로
+    :type path: :class:`str`
+    :return: 파일을 새로 썼는지. 이전 파일과 관계가 같으면 쓰지 않으므로
+             웹 서버 프로세스가 다시 열지 않습니다
+    :rtype: :class:`bool`
+
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        built_at = utc_now()
+        nodes, synonyms, includes = query_relations(session)
+        if os.path.exists(path):
+            previous = RelationGraph.load(path)
+            if (
+                set(previous.edges('synonyms')) == synonyms and
+                set(previous.edges('includes')) == includes and
+                dict(previous.nodes()) == nodes
+            ):
+                return False
+        write_relation_graph(path, nodes, synonyms, includes, built_at)
+    return True
+
+
+def mark_update_pending(path: str) -> bool:
+    """그래프를 갱신하도록 예약했다고 ``{path}.pending`` 에 표시합니다.
+
+    이미 예약되어 있으면 거짓을 반환하므로, 참을 받은 쪽만 갱신 작업을 예약하면
+    됩니다.  :data:`PENDING_TIMEOUT` 이 지나도록 풀리지 않은 예약은 작업을
+    잃어버린 것으로 보고 다시 예약합니다.
+
+    """
+    pending = f'{path}.pending'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    try:
+        os.close(os.open(pending, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        try:
+            if time.time() - os.stat(pending).st_mtime < PENDING_TIMEOUT:
+                return False
+            os.utime(pending)
+        except FileNotFoundError:
+            # 그 사이에 작업이 시작해서 예약을 풀었습니다.
+            return mark_update_pending(path)
+    return True
+
+
+def clear_update_pending(path: str) -> None:
+    """:func:`mark_update_pending` 의 예약을 풉니다.
+
+    갱신 작업이 관계를 읽기 전에 풀어야, 읽는 동안 저장된 관계가 다음 작업을
+    예약합니다.
+
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(f'{path}.pending')
+
+
+def relation_graph_path(config: typing.Mapping) -> typing.Optional[str]:
+    """``[SEARCH_GRAPH]`` 설정의 ``PATH``. 설정이 없으면 None 입니다."""
+    graph_config = config['SEARCH_GRAPH'] if 'SEARCH_GRAPH' in config else {}
+    return graph_config.get('PATH') or None
+
+
+def relation_graph_delay(config: typing.Mapping) -> float:
+    """``[SEARCH_GRAPH]`` 설정의 ``UPDATE_DELAY``.
+
+    스크래핑한 뒤 그래프를 다시 만들기까지 기다리는 시간 (초) 으로, 그동안
+    스크래핑한 관계는 한 번에 반영합니다.
+
+    """
+    graph_config = config['SEARCH_GRAPH'] if 'SEARCH_GRAPH' in config else {}
+    return float(graph_config.get('UPDATE_DELAY', 60))
+
+
+def get_relation_graph(
+    config: typing.Mapping,
+) -> typing.Optional[RelationGraph]:
+    """설정된 그래프 파일을 프로세스마다 한 번 열어서 반환합니다.
+
+    파일이 바뀌면 다시 열고 검색 캐시를 무효화합니다.  설정이 없거나 파일이
+    아직 없으면 None 을 반환합니다.
+
+    """
+    path = relation_graph_path(config)
+    if path is None:
+        return None
+    key = os.getpid(), path
+    graph = _graphs.get(key)
+    now = time.monotonic()
+    if graph is not None and now - graph.checked_at < REFRESH_INTERVAL:
+        return graph
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is not None and now - graph.checked_at < REFRESH_INTERVAL:
+            return graph
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return graph
+        if graph is None or graph.mtime != mtime:
+            reloaded = graph is not None
+            # 이전 그래프는 사용 중인 요청이 있을 수 있으므로 닫지 않습니다.
+            graph = _graphs[key] = RelationGraph.load(path)
+            if reloaded:
+                get_search_cache(config).bump_version()
+        graph.checked_at = now
+    return graph
@@ -0,0 +1,131 @@
+""":mod:`word_way.search.ngram` --- 발음 중간 일치 검색을 위한 n-gram 역색인
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+PostgreSQL 에서는 ``pg_trgm`` GIN 인덱스가 ``LIKE '%검색어%'`` 를 처리하지만
+SQLite 에는 그런 인덱스가 없으므로 프로세스 안에 음절 n-gram 역색인을 두고
+검색어가 포함된 발음을 찾습니다.
+"""
+import bisect
+import os
+import threading
+import time
+import typing
+import uuid
+from array import array
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.orm.session import Session
+
+from word_way.models import Pronunciation
+
+__all__ = 'NgramIndex', 'get_ngram_index',
+
+#: (:class:`float`) 새로 저장된 발음을 색인에 반영하는 최소 간격 (초)
+REFRESH_INTERVAL = 1.0
+
+_indexes: typing.Dict[typing.Tuple[int, str], 'NgramIndex'] = {}
+_indexes_lock = threading.Lock()
+
+
+class NgramIndex:
+    """발음 문자열의 1 ~ n 음절 조각을 문서 번호 목록에 대응시키는 역색인.
+
+    문서 번호는 추가된 순서대로 증가하므로 각 posting 목록은 항상 정렬되어
+    있고, 검색할 때는 가장 짧은 목록부터 이분 탐색으로 교집합을 구합니다.
+
+    """
+
+    def __init__(self, n: int = 2):
+        self.n = n
+        #: (:class:`list`) 문서 번호별 발음 id
+        self.ids: typing.List[uuid.UUID] = []
+        #: (:class:`list`) 문서 번호별 발음
+        self.texts: typing.List[str] = []
+        self.postings: typing.Dict[str, array] = {}
+        #: (:class:`int`) 색인에 반영된 마지막 SQLite ``rowid``
+        self.last_rowid = 0
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+
+    def grams(self, text: str, n: int) -> typing.Set[str]:
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, id_: uuid.UUID, text: str) -> None:
+        doc = len(self.ids)
+        self.ids.append(id_)
+        self.texts.append(text)
+        grams = set()
+        for n in range(1, self.n + 1):
+            grams |= self.grams(text, n)
+        for gram in grams:
+            try:
+                posting = self.postings[gram]
+            except KeyError:
+                posting = self.postings[gram] = array('L')
+            posting.append(doc)
+
+    def search(self, keyword: str) -> typing.List[uuid.UUID]:
+        """``keyword`` 가 포함된 발음의 id 목록을 반환합니다."""
+        return [self.ids[doc] for doc in self.find(keyword)]
+
+    def search_texts(
+        self, keyword: str,
+    ) -> typing.List[typing.Tuple[uuid.UUID, str]]:
+        """``keyword`` 가 포함된 발음의 ``(id, 발음)`` 목록을 반환합니다."""
+        return [(self.ids[doc], self.texts[doc]) for doc in self.find(keyword)]
+
+    def find(self, keyword: str) -> typing.Sequence[int]:
+        n = min(len(keyword), self.n)
+        if not n:
+            return []
+        postings = sorted(
+            (self.postings.get(gram, ()) for gram in self.grams(keyword, n)),
+            key=len,
+        )
+        docs = postings[0]
+        for posting in postings[1:]:
+            docs = [doc for doc in docs if contains(posting, doc)]
+            if not docs:
+                break
+        if len(keyword) > self.n:
+            docs = [doc for doc in docs if keyword in self.texts[doc]]
+        return docs
+
+    def refresh(self, session: Session) -> None:
+        """마지막으로 반영한 ``rowid`` 이후에 저장된 발음을 색인에 추가합니다."""
+        now = time.monotonic()
+        if now - self.refreshed_at < REFRESH_INTERVAL:
+            return
+        with self.lock:
+            if now - self.refreshed_at < REFRESH_INTERVAL:
+                return
+            rowid_column = literal_column('rowid')
+            rows = session.execute(
+                select([
+                    rowid_column,
+                    Pronunciation.id,
+                    Pronunciation.pronunciation,
+                ])
+                .where(rowid_column > self.last_rowid)
+                .order_by(rowid_column)
+            )
+            for rowid, id_, text in rows:
+                self.add(id_, text)
+                self.last_rowid = rowid
+            self.refreshed_at = time.monotonic()
+
+
+def contains(posting: typing.Sequence[int], doc: int) -> bool:
+    i = bisect.bisect_left(posting, doc)
+    return i < len(posting) and posting[i] == doc
+
+
+def get_ngram_index(session: Session) -> NgramIndex:
+    """세션이 연결된 데이터베이스의 색인을 최신 상태로 가져옵니다."""
+    key = os.getpid(), str(session.bind.url)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, NgramIndex())
+    index.refresh(session)
+    return index
@@ -0,0 +1,700 @@
+""":mod:`word_way.search.query` --- 단어 검색 쿼리
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+검색 대상
+
+- 검색어가 발음에 포함된 단어
+- 검색어가 유의어에 포함된 단어
+- 검색어가 의미에 포함된 단어
+
+세 가지 검색 결과를 ``UNION ALL`` 로 합친 한 문장으로 후보 발음과 걸린 관계를
+가져오고, :mod:`word_way.search.score` 로 점수를 매겨 상위 결과만 고릅니다.
+결과 페이지의 발음만 :mod:`word_way.search.rows` 의 읽기 전용 행으로 불러옵니다.
+
+관계 그래프(:mod:`word_way.search.graph`) 가 있으면 유의어와 포함어 검색은
+DB 대신 그래프에서 찾고, DB 에서는 발음 검색만 합니다.
+
+한 글자 검색어처럼 발음 검색에 걸리는 발음이 많으면 모두 파이썬으로 가져와서
+점수를 매기지 않도록, ``or`` 검색은 발음 검색 결과를 발음만으로 매긴 점수
+(:func:`~word_way.search.score.contains_score`) 가 높은 순서로
+:data:`CANDIDATE_WINDOW` 개씩 가져옵니다.  유의어 수 점수를 더해도 아직
+가져오지 않은 발음보다 확실히 앞서는 결과부터 내놓으므로, 한 페이지에 필요한
+만큼만 가져오고 다음 페이지는 커서의 점수부터 다시 가져옵니다.  유의어/포함어
+관계로 걸린 발음은 첫 묶음에서 모두 가져옵니다.
+
+SQLite 에서는 n-gram 색인으로 찾은 발음 id 를 바인드 파라미터로 넘기므로,
+파라미터 수 제한을 넘지 않도록 발음 검색은 관계 검색과 따로 나눠서 실행하고
+점수도 파이썬에서 매깁니다.
+"""
+import functools
+import heapq
+import itertools
+import typing
+import uuid
+
+from sqlalchemy import (Integer, Unicode, and_, bindparam, case, column,
+                        func, literal, null, or_, select, union_all)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+
+from word_way.models import (
+    IncludeWordRelation,
+    Pronunciation,
+    SynonymsWordRelation,
+    Word,
+)
+from word_way.scrapping.bulk import MAX_PARAMETERS
+from word_way.search.graph import RelationGraph
+from word_way.search.ngram import get_ngram_index
+from word_way.search.score import (MAX_RELATION_SCORE, PRIORITY_INCLUDE,
+                                   PRIORITY_PRONUNCIATION, PRIORITY_SYNONYMS,
+                                   SCORE_CO_OCCURRENCE, SCORE_EXACT,
+                                   SCORE_INFIX, SCORE_PREFIX,
+                                   SCORE_SIMILARITY, Candidate, Rank,
+                                   contains_score, rank_candidate, top_k)
+from word_way.search.rows import (PronunciationRow, WordRow,
+                                  load_include_matched_words,
+                                  load_pronunciations)
+from word_way.search.statement import execute, in_list, like_any
+from word_way.utils import chunked
+
+__all__ = (
+    'CANDIDATE_WINDOW', 'PRIORITY_INCLUDE', 'PRIORITY_PRONUNCIATION',
+    'PRIORITY_SYNONYMS', 'SEARCH_OPERATORS', 'candidate_rows',
+    'collect_candidates', 'contains_params', 'contains_rows',
+    'contains_score_column', 'contains_windows', 'escape_like',
+    'include_matched_words', 'intersect_candidates', 'iter_candidates',
+    'iter_ranked', 'iter_search', 'normalize_keywords',
+    'pronunciation_contains', 'relation_rows', 'search', 'search_params',
+    'synonym_count',
+)
+
+#: 검색어를 합치는 방법. ``or``: 합집합, ``and``: 교집합
+SEARCH_OPERATORS = 'or', 'and'
+
+#: (:class:`int`) ``or`` 검색에서 발음 검색 후보를 한 번에 가져오는 수
+CANDIDATE_WINDOW = 1000
+
+#: 발음 검색 후보를 처음부터 가져오는 ``(점수, 발음 id)``. 점수는 PostgreSQL
+#: ``integer`` 의 최댓값이고, id 는 어떤 id 보다도 큽니다
+FIRST_WINDOW = 2 ** 31 - 1, uuid.UUID(int=2 ** 128 - 1)
+
+Key = typing.Tuple[int, uuid.UUID]
+
+
+def normalize_keywords(keywords: typing.Iterable[str]) -> typing.List[str]:
+    """검색어의 공백을 제거하고 빈 검색어와 중복을 걸러냅니다."""
+    return list(dict.fromkeys(filter(None, (k.strip() for k in keywords))))
+
+
+def escape_like(keyword: str) -> str:
+    return keyword.replace('\\', '\\\\').replace('%', '\\%').replace(
+        '_', '\\_',
+    )
+
+
+def pronunciation_contains(dialect: str) -> ColumnElement:
+    """발음에 검색어 중 하나라도 포함되어 있는지 확인하는 조건.
+
+    PostgreSQL 은 ``LIKE ANY(:patterns)`` 를 trigram 인덱스로 처리하고,
+    인덱스가 없는 SQLite 는 프로세스 안의 n-gram 색인으로 찾은 ``:ids`` 를
+    받습니다.  파라미터는 :func:`contains_params` 로 나눠서 만듭니다.
+
+    """
+    if dialect == 'sqlite':
+        return in_list(Pronunciation.id, 'ids', dialect)
+    return like_any(Pronunciation.pronunciation, 'patterns', dialect)
+
+
+def contains_params(
+    session: Session, keywords: typing.Sequence[str],
+) -> typing.List[typing.Dict[str, list]]:
+    """:func:`pronunciation_contains` 조건의 파라미터 목록.
+
+    SQLite 는 n-gram 색인으로 찾은 발음 id 를 :data:`MAX_PARAMETERS` 개씩
+    나누므로 파라미터마다 한 번씩 실행해야 합니다.  PostgreSQL 은 패턴 배열
+    하나만 넘기므로 파라미터도 하나입니다.
+
+    """
+    if session.bind.dialect.name == 'sqlite':
+        index = get_ngram_index(session)
+        ids = {id_ for keyword in keywords for id_ in index.search(keyword)}
+        return [{'ids': chunk} for chunk in chunked(ids, MAX_PARAMETERS)]
+    return [
+        {'patterns': [f'%{escape_like(keyword)}%' for keyword in keywords]},
+    ]
+
+
+def window_params(
+    session: Session, keywords: typing.Sequence[str], last: Key,
+) -> typing.Dict[str, typing.Any]:
+    """``window`` 인 :func:`contains_rows` 문장의 파라미터.
+
+    발음 검색 파라미터를 나누지 않는 PostgreSQL 에서만 사용합니다.
+
+    """
+    params, = contains_params(session, keywords)
+    return {
+        'keywords': list(keywords),
+        'last_score': last[0],
+        'last_id': last[1],
+        'candidate_limit': CANDIDATE_WINDOW,
+        **params,
+    }
+
+
+def search_params(
+    session: Session,
+    keywords: typing.Sequence[str],
+    last: Key = FIRST_WINDOW,
+) -> typing.Dict[str, typing.Any]:
+    """:func:`candidate_rows` 문장의 파라미터.
+
+    발음 검색 파라미터를 나누지 않는 PostgreSQL 에서만 사용합니다.
+
+    """
+    return window_params(session, keywords, last)
+
+
+def synonym_count(pronunciation_id) -> ColumnElement:
+    """``pronunciation_id`` 발음의 유의어 수를 세는 스칼라 서브쿼리."""
+    counted = SynonymsWordRelation.__table__.alias('counted')
+    return select([func.count()]).where(
+        counted.c.pronunciation_id == pronunciation_id,
+    ).as_scalar()
+
+
+def contains_score_column(pronunciation) -> ColumnElement:
+    """:func:`~word_way.search.score.contains_score` 를 계산하는 스칼라
+    서브쿼리.  ``:keywords`` 배열을 ``unnest`` 하므로 PostgreSQL 에서만
+    사용합니다.
+
+    """
+    keyword = column('keyword', Unicode)
+    keywords = func.unnest(
+        bindparam('keywords', type_=ARRAY(Unicode)),
+    ).alias('keyword')
+    position = func.strpos(pronunciation, keyword, type_=Integer)
+    # 검색어가 발음에 포함되면 편집 거리는 길이 차이와 같습니다.
+    similarity = SCORE_SIMILARITY * func.length(keyword, type_=Integer) / \
+        func.length(pronunciation, type_=Integer)
+    keyword_score = case([
+        (pronunciation == keyword, SCORE_EXACT + SCORE_SIMILARITY),
+        (position == 1, SCORE_PREFIX + similarity),
+        (position > 0, SCORE_INFIX + similarity),
+    ], else_=0)
+    matched = func.count().filter(position > 0)
+    return select([
+        func.coalesce(func.sum(keyword_score), 0) +
+        SCORE_CO_OCCURRENCE * func.greatest(matched - 1, 0, type_=Integer),
+    ]).select_from(keywords).as_scalar()
+
+
+@functools.lru_cache()
+def contains_rows(dialect: str, window: bool = False) -> Select:
+    """발음에 검색어가 포함된 발음을 찾는 문장.
+
+    :func:`candidate_rows` 와 같은 컬럼을 가지며, ``kind`` 와 ``keyword`` 는
+    NULL 입니다.  ``window`` 이면 :func:`contains_score_column` 점수가 높은
+    순서로 ``(:last_score, :last_id)`` 다음부터 ``:candidate_limit`` 개만
+    찾고, 유의어 수는 그 발음에서만 셉니다.  그렇지 않으면 ``score`` 도
+    NULL 입니다.  ``window`` 는 PostgreSQL 에서만 사용합니다.
+
+    """
+    columns = [
+        Pronunciation.id.label('pronunciation_id'),
+        Pronunciation.pronunciation.label('pronunciation'),
+    ]
+    if window:
+        columns.append(
+            contains_score_column(Pronunciation.pronunciation).label('score'),
+        )
+    rows = select(columns).where(pronunciation_contains(dialect))
+    rows = rows.alias('contains')
+    if window:
+        last_score = bindparam('last_score', type_=Integer)
+        rows = select(rows.c).where(or_(
+            rows.c.score < last_score,
+            and_(
+                rows.c.score == last_score,
+                rows.c.pronunciation_id > bindparam('last_id'),
+            ),
+        )).order_by(
+            rows.c.score.desc(), rows.c.pronunciation_id,
+        ).limit(bindparam('candidate_limit')).alias('ranked')
+        score = rows.c.score
+    else:
+        score = null()
+    return select([
+        rows.c.pronunciation_id,
+        rows.c.pronunciation,
+        null().label('kind'),
+        null().label('keyword'),
+        synonym_count(rows.c.pronunciation_id).label('relation_count'),
+        score.label('score'),
+    ])
+
+
+def relation_rows(dialect: str) -> typing.List[Select]:
+    """``:keywords`` 와 유의어/포함어 관계인 발음을 찾는 문장들.
+
+    :func:`candidate_rows` 와 같은 컬럼을 가지며, ``score`` 는 NULL 입니다.
+
+    """
+    synonyms = SynonymsWordRelation.__table__
+    include = IncludeWordRelation.__table__
+    related = aliased(Pronunciation, name='related')
+    matched = in_list(related.pronunciation, 'keywords', dialect)
+    return [
+        select([
+            Pronunciation.id,
+            Pronunciation.pronunciation,
+            literal('synonyms'),
+            related.pronunciation,
+            synonym_count(Pronunciation.id),
+            null(),
+        ]).select_from(
+            synonyms.join(
+                Pronunciation,
+                Pronunciation.id == synonyms.c.pronunciation_id,
+            ).join(
+                related, related.id == synonyms.c.related_pronunciation_id,
+            )
+        ).where(matched),
+        select([
+            Pronunciation.id,
+            Pronunciation.pronunciation,
+            literal('includes'),
+            related.pronunciation,
+            synonym_count(Pronunciation.id),
+            null(),
+        ]).select_from(
+            include.join(Word, Word.id == include.c.word_id).join(
+                Pronunciation, Pronunciation.id == Word.pronunciation_id,
+            ).join(
+                related, related.id == include.c.related_pronunciation_id,
+            )
+        ).where(matched),
+    ]
+
+
+@functools.lru_cache()
+def relation_union(dialect: str) -> CompoundSelect:
+    return union_all(*relation_rows(dialect))
+
+
+@functools.lru_cache()
+def candidate_rows(dialect: str) -> CompoundSelect:
+    """검색어에 걸린 발음을 찾는 문장.
+
+    ``pronunciation_id``, ``pronunciation``, ``kind``, ``keyword``,
+    ``relation_count``, ``score`` 컬럼을 가집니다.  발음 검색으로 찾은 행의
+    ``kind`` 와 ``keyword`` 는 NULL 이고, 발음 검색 결과는 첫
+    :data:`CANDIDATE_WINDOW` 개만 찾습니다.  관계로 찾은 행의 ``score`` 는
+    NULL 입니다.  파라미터는 :func:`search_params` 로 만듭니다.  SQLite
+    에서는 발음 검색 파라미터를 나눠야 하므로 사용하지 않습니다.
+
+    """
+    return union_all(contains_rows(dialect, True), *relation_rows(dialect))
+
+
+def contains_windows(
+    session: Session, keywords: typing.Sequence[str], last: Key,
+) -> typing.Iterator[typing.List[tuple]]:
+    """발음 검색 결과를 :func:`contains_rows` 의 ``window`` 순서대로
+    :data:`CANDIDATE_WINDOW` 개씩 나눠서 가져옵니다.
+
+    마지막 묶음은 :data:`CANDIDATE_WINDOW` 개보다 적으며, 빈 목록일 수도
+    있습니다.
+
+    :param last: 이 ``(점수, 발음 id)`` 다음 발음부터 가져옵니다
+
+    """
+    dialect = session.bind.dialect.name
+    if dialect == 'sqlite':
+        yield from sqlite_contains_windows(session, keywords, last)
+        return
+    statement = contains_rows(dialect, True)
+    while True:
+        rows = execute(
+            session, statement, window_params(session, keywords, last),
+        ).fetchall()
+        yield rows
+        if len(rows) < CANDIDATE_WINDOW:
+            return
+        last = last_key((row[0], row[5]) for row in rows)
+
+
+def sqlite_contains_windows(
+    session: Session, keywords: typing.Sequence[str], last: Key,
+) -> typing.Iterator[typing.List[tuple]]:
+    # n-gram 색인이 발음을 가지고 있으므로 점수와 순서는 파이썬에서 정하고,
+    # 유의어 수만 DB 에서 셉니다.  SQLite 의 UUIDType 은 바이트로
+    # 저장되므로 id 순서는 PostgreSQL 과 같습니다.
+    index = get_ngram_index(session)
+    found = {}
+    for keyword in keywords:
+        found.update(index.search_texts(keyword))
+    start = -last[0], last[1]
+    keys = sorted(
+        key for key in (
+            (-contains_score(text, keywords), id_)
+            for id_, text in found.items()
+        )
+        if key > start
+    )
+    statement = contains_rows('sqlite')
+    for i in range(0, len(keys) + 1, CANDIDATE_WINDOW):
+        scores = {id_: -score for score, id_ in keys[i:i + CANDIDATE_WINDOW]}
+        yield [
+            (*row[:-1], scores[row[0]])
+            for chunk in chunked(scores, MAX_PARAMETERS)
+            for row in execute(session, statement, {'ids': chunk})
+        ]
+
+
+def last_key(pairs: typing.Iterable[typing.Tuple[uuid.UUID, int]]) -> Key:
+    """``(발음 id, 점수)`` 중에서 ``window`` 순서로 마지막 ``(점수, 발음 id)``.
+    """
+    id_, score = max(pairs, key=lambda pair: (-pair[1], pair[0]))
+    return score, id_
+
+
+def iter_candidates(
+    session: Session,
+    keywords: typing.Sequence[str],
+    graph: typing.Optional[RelationGraph] = None,
+    after: typing.Optional[Key] = None,
+) -> typing.Iterator[
+    typing.Tuple[typing.Dict[uuid.UUID, Candidate], typing.Optional[int]]
+]:
+    """검색어에 걸린 발음의 :class:`Candidate` 를 묶음으로 나눠서 모읍니다.
+
+    첫 묶음에는 유의어/포함어 관계로 걸린 모든 발음이 들어 있고, 발음 검색
+    결과는 묶음마다 :func:`~word_way.search.score.contains_score` 가 높은
+    순서로 :data:`CANDIDATE_WINDOW` 개씩 들어 있습니다.  앞 묶음에 있던
+    발음은 다시 나오지 않습니다.  관계 그래프가 주어지면 유의어/포함어 관계는
+    그래프에서 찾습니다.
+
+    묶음과 함께 아직 가져오지 않은 발음이 받을 수 있는 최대 점수를 반환하며,
+    더 가져올 발음이 없으면 :const:`None` 입니다.
+
+    :param after: 이전 페이지의 마지막 ``(점수, 발음 id)``.  발음만으로
+                  매긴 점수가 이보다 높은 발음은 이 페이지보다 앞서므로
+                  가져오지 않습니다
+
+    """
+    dialect = session.bind.dialect.name
+    last = FIRST_WINDOW if after is None else (after[0] + 1, FIRST_WINDOW[1])
+    windows = None
+    if graph is None and dialect != 'sqlite':
+        # 첫 묶음은 관계 검색과 함께 한 문장으로 가져옵니다.  후보가 많아도
+        # 드라이버가 결과 전체를 버퍼에 담지 않도록 서버 쪽 커서로 읽으면서
+        # 발음마다 하나의 후보로 합칩니다.
+        rows = execute(
+            session,
+            candidate_rows(dialect),
+            search_params(session, keywords, last),
+            stream_results=True,
+        )
+    else:
+        windows = contains_windows(session, keywords, last)
+        if graph is None:
+            relations = execute(
+                session, relation_union(dialect), {'keywords': list(keywords)},
+            )
+        else:
+            relations = graph_candidate_rows(graph, keywords)
+        rows = itertools.chain(next(windows), relations)
+    first = None
+    while True:
+        candidates = {}
+        contains = []
+        for id_, pronunciation, kind, keyword, relation_count, score in rows:
+            if kind is None:
+                contains.append((id_, score))
+            if first is not None and id_ in first:
+                continue
+            candidate = candidates.get(id_)
+            if candidate is None:
+                candidate = candidates[id_] = Candidate(
+                    pronunciation, relation_count,
+                )
+            if kind is not None:
+                candidate.relations.add((keyword, kind))
+        if len(contains) < CANDIDATE_WINDOW:
+            yield candidates, None
+            return
+        last = last_key(contains)
+        yield candidates, last[0] + MAX_RELATION_SCORE
+        if first is None:
+            # 관계로 걸린 발음은 뒤의 발음 검색 결과에 다시 나올 수 있습니다.
+            first = set(candidates)
+        if windows is None:
+            windows = contains_windows(session, keywords, last)
+        rows = next(windows)
+
+
+def collect_candidates(
+    session: Session,
+    keywords: typing.Sequence[str],
+    graph: typing.Optional[RelationGraph] = None,
+) -> typing.Dict[uuid.UUID, Candidate]:
+    """검색어에 걸린 모든 발음의 :class:`Candidate` 를 모읍니다.
+
+    관계 그래프가 주어지면 유의어/포함어 관계는 그래프에서 찾습니다.
+
+    """
+    candidates = {}
+    for batch, _ in iter_candidates(session, keywords, graph):
+        candidates.update(batch)
+    return candidates
+
+
+def contains_candidate_rows(
+    session: Session, keywords: typing.Sequence[str],
+) -> typing.Iterator[tuple]:
+    """:func:`contains_rows` 를 :func:`contains_params` 마다 실행합니다."""
+    statement = contains_rows(session.bind.dialect.name)
+    for params in contains_params(session, keywords):
+        yield from execute(session, statement, params)
+
+
+def graph_candidate_rows(
+    graph: RelationGraph, keywords: typing.Sequence[str],
+) -> typing.Iterator[typing.Tuple[uuid.UUID, str, str, str, int, None]]:
+    """:func:`candidate_rows` 의 유의어/포함어 행을 그래프에서 찾습니다."""
+    for keyword in keywords:
+        node = graph.find(keyword)
+        if node is None:
+            continue
+        for kind, reverse_kind in (
+            ('synonyms', 'synonym_of'), ('includes', 'included_by'),
+        ):
+            for related in graph.neighbors(reverse_kind, node):
+                yield (
+                    graph.id(related),
+                    graph.text(related),
+                    kind,
+                    keyword,
+                    graph.degree('synonyms', related),
+                    None,
+                )
+
+
+def estimate_contains(session: Session, keyword: str) -> int:
+    """발음에 ``keyword`` 가 포함된 발음 수를 어림합니다.
+
+    SQLite 는 n-gram 색인으로 정확히 세고, PostgreSQL 은 긴 검색어일수록 적게
+    걸린다고 보고 검색어 길이로 어림합니다.
+
+    """
+    if session.bind.dialect.name == 'sqlite':
+        return len(get_ngram_index(session).search(keyword))
+    return -len(keyword)
+
+
+def intersect_candidates(
+    session: Session,
+    keywords: typing.Sequence[str],
+    graph: typing.Optional[RelationGraph] = None,
+) -> typing.Dict[uuid.UUID, Candidate]:
+    """모든 검색어에 걸린 발음의 :class:`Candidate` 를 모읍니다.
+
+    검색어마다 걸린 발음 집합을 작은 것부터 교집합합니다.  유의어/포함어
+    관계는 검색어마다 먼저 모으고, 발음 검색은 가장 적게 걸릴 검색어 하나만
+    DB 에서 한 뒤 나머지 검색어는 남은 후보의 발음에서 확인합니다.  그래서
+    검색어가 늘어날수록 확인할 후보가 줄어듭니다.
+
+    교집합이 빈 집합이 되게 하는 검색어는 건너뛰므로, 모든 검색어에 걸린 발음이
+    없으면 가능한 많은 검색어에 걸린 발음을 반환합니다.
+
+    """
+    dialect = session.bind.dialect.name
+    if graph is None:
+        rows = execute(
+            session, relation_union(dialect), {'keywords': list(keywords)},
+        )
+    else:
+        rows = graph_candidate_rows(graph, keywords)
+    postings = {keyword: set() for keyword in keywords}
+    candidates = {}
+    for id_, pronunciation, kind, keyword, relation_count, _ in rows:
+        candidate = candidates.get(id_)
+        if candidate is None:
+            candidate = candidates[id_] = Candidate(
+                pronunciation, relation_count,
+            )
+        candidate.relations.add((keyword, kind))
+        postings[keyword].add(id_)
+    # 아무 발음에도 걸리지 않는 검색어를 시작점으로 고르면 교집합이 계속 빈
+    # 집합이므로, 어림한 크기 순서로 시도하면서 걸린 발음이 있는 검색어를
+    # 시작점으로 삼습니다.
+    matched = set()
+    for seed in sorted(
+        keywords,
+        key=lambda k: len(postings[k]) + estimate_contains(session, k),
+    ):
+        matched = set(postings[seed])
+        contains = contains_candidate_rows(session, [seed])
+        for id_, pronunciation, _, _, relation_count, _ in contains:
+            if id_ not in candidates:
+                candidates[id_] = Candidate(pronunciation, relation_count)
+            matched.add(id_)
+        if matched:
+            break
+    else:
+        return {}
+    for keyword in sorted(
+        (keyword for keyword in keywords if keyword != seed),
+        key=lambda keyword: len(postings[keyword]),
+    ):
+        posting = postings[keyword]
+        narrowed = {
+            id_ for id_ in matched
+            if id_ in posting or keyword in candidates[id_].pronunciation
+        }
+        if narrowed:
+            matched = narrowed
+    return {id_: candidates[id_] for id_ in matched}
+
+
+def search(
+    session: Session,
+    keywords: typing.Sequence[str],
+    limit: typing.Optional[int] = None,
+    after: typing.Optional[typing.Tuple[int, uuid.UUID]] = None,
+    graph: typing.Optional[RelationGraph] = None,
+    op: str = 'or',
+) -> typing.List[typing.Tuple[PronunciationRow, Rank]]:
+    """검색어로 발음을 찾아 ``(발음 행, 순위)`` 목록을 점수 순서로 반환합니다.
+
+    :param session: 사용할 세션
+    :type session: :class:`sqlalchemy.orm.session.Session`
+    :param keywords: :func:`normalize_keywords` 로 정리한 검색어
+    :type keywords: typing.Sequence[str]
+    :param limit: 가져올 최대 개수. :const:`None` 이면 전부 가져옵니다
+    :type limit: typing.Optional[int]
+    :param after: 이전 페이지의 마지막 ``(점수, 발음 id)``.
+                  주어지면 그 다음 결과부터 가져옵니다
+    :type after: typing.Optional[typing.Tuple[int, uuid.UUID]]
+    :param graph: 유의어/포함어를 찾을 관계 그래프.
+                  없으면 DB 에서 찾습니다
+    :type graph: typing.Optional[RelationGraph]
+    :param op: ``or`` 이면 검색어 중 하나라도 걸린 발음을, ``and`` 이면
+               모든 검색어에 걸린 발음을 찾습니다 (:func:`intersect_candidates`)
+    :type op: :class:`str`
+    :rtype: typing.List[typing.Tuple[PronunciationRow, Rank]]
+
+    """
+    return load_hits(
+        session, rank_hits(session, keywords, limit, after, graph, op),
+    )
+
+
+def iter_search(
+    session: Session,
+    keywords: typing.Sequence[str],
+    after: typing.Optional[typing.Tuple[int, uuid.UUID]] = None,
+    graph: typing.Optional[RelationGraph] = None,
+    op: str = 'or',
+    chunk_size: int = 100,
+) -> typing.Iterator[typing.List[typing.Tuple[PronunciationRow, Rank]]]:
+    """:func:`search` 의 모든 결과를 ``chunk_size`` 개씩 나눠서 불러옵니다.
+
+    응답에 필요한 행은 묶음마다 불러오므로 한 묶음의 행만 메모리에 둡니다.
+    순위를 매기는 가벼운 후보는 연산자에 따라 다음만큼 메모리에 둡니다.
+
+    ``or``
+       :func:`iter_ranked` 로 순위를 매기는 대로 내보내므로 첫 묶음을 보내기
+       전에 모든 후보를 읽지 않습니다.  다만 유의어/포함어 관계로 걸린 발음은
+       첫 후보 묶음에서 모두 읽고, 아직 내보낼 수 없는 후보는 힙에 남습니다.
+       그래서 관계로 걸린 모든 후보와, 점수가 마지막으로 읽은 발음 검색 결과
+       보다 :data:`~word_way.search.score.MAX_RELATION_SCORE` 안쪽으로 높은
+       발음 검색 후보가 함께 메모리에 있을 수 있습니다.
+    ``and``
+       :func:`intersect_candidates` 로 교집합을 먼저 구한 뒤 순위를 한 번에
+       매기므로, 모든 검색어의 유의어/포함어 후보와 가장 적게 걸리는 검색어
+       하나의 발음 검색 후보를 모두 메모리에 둡니다.
+
+    """
+    if op == 'or':
+        hits = iter_ranked(session, keywords, after, graph)
+    else:
+        hits = rank_hits(session, keywords, None, after, graph, op)
+    for chunk in chunked(hits, chunk_size):
+        yield load_hits(session, chunk)
+
+
+def iter_ranked(
+    session: Session,
+    keywords: typing.Sequence[str],
+    after: typing.Optional[Key] = None,
+    graph: typing.Optional[RelationGraph] = None,
+) -> typing.Iterator[typing.Tuple[uuid.UUID, str, Rank]]:
+    """``or`` 검색 결과를 순위 순서대로 ``(발음 id, 발음, 순위)`` 로 하나씩
+    내놓습니다.
+
+    :func:`iter_candidates` 의 묶음마다 점수를 매겨 힙에 넣고, 아직 가져오지
+    않은 발음보다 점수가 높은 결과만 꺼냅니다.  그래서 필요한 만큼만 읽으면
+    뒤의 발음 검색 결과는 가져오지 않습니다.
+
+    """
+    last = None if after is None else (-after[0], after[1])
+    pending = []
+    for candidates, bound in iter_candidates(session, keywords, graph, after):
+        for id_, candidate in candidates.items():
+            rank = rank_candidate(candidate, keywords)
+            if last is not None and (-rank.score, id_) <= last:
+                continue
+            heapq.heappush(
+                pending, (-rank.score, id_, candidate.pronunciation, rank),
+            )
+        # 점수가 같은 발음은 아직 가져오지 않은 발음이 id 순서로 앞설 수
+        # 있으므로 기다립니다.
+        while pending and (bound is None or -pending[0][0] > bound):
+            _, id_, pronunciation, rank = heapq.heappop(pending)
+            yield id_, pronunciation, rank
+
+
+def rank_hits(
+    session: Session,
+    keywords: typing.Sequence[str],
+    limit: typing.Optional[int],
+    after: typing.Optional[typing.Tuple[int, uuid.UUID]],
+    graph: typing.Optional[RelationGraph],
+    op: str,
+) -> typing.List[typing.Tuple[uuid.UUID, str, Rank]]:
+    """순위를 매긴 ``(발음 id, 발음, 순위)`` 목록을 반환합니다."""
+    if op == 'or':
+        hits = iter_ranked(session, keywords, after, graph)
+        return list(itertools.islice(hits, limit))
+    elif op != 'and':
+        raise ValueError(f'Unknown search operator: {op}')
+    candidates = intersect_candidates(session, keywords, graph)
+    return [
+        (id_, candidates[id_].pronunciation, rank)
+        for id_, rank in top_k(candidates, keywords, limit, after)
+    ]
+
+
+def load_hits(
+    session: Session,
+    hits: typing.Sequence[typing.Tuple[uuid.UUID, str, Rank]],
+) -> typing.List[typing.Tuple[PronunciationRow, Rank]]:
+    rows = load_pronunciations(
+        session, {id_: pronunciation for id_, pronunciation, _ in hits},
+    )
+    return [(rows[id_], rank) for id_, _, rank in hits]
+
+
+def include_matched_words(
+    session: Session,
+    keywords: typing.Sequence[str],
+    pronunciation_ids: typing.Collection[uuid.UUID],
+) -> typing.Mapping[uuid.UUID, typing.List[WordRow]]:
+    """의미에 검색어가 포함된 단어를 발음 id 별로 모아서 반환합니다."""
+    return load_include_matched_words(session, keywords, pronunciation_ids)
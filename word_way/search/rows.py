@@ -0,0 +1,205 @@
+""":mod:`word_way.search.rows` --- 검색 응답을 위한 읽기 전용 행
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+검색 응답에 필요한 컬럼만 ``SELECT`` 해서 ``__slots__`` 객체에 담습니다.
+ORM 객체를 만들지 않으므로 identity map 과 관계 상태를 관리하는 비용이 없고,
+세션의 unit of work 에도 들어가지 않습니다.
+
+관계 목록은 관련 발음 순서로, 단어 목록은 ``target_code`` 순서로 정렬합니다.
+문장은 :mod:`word_way.search.statement` 로 한 번만 만들어 재사용합니다.
+"""
+import functools
+import typing
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
+
+from word_way.enum import WordPart
+from word_way.models import (IncludeWordRelation, Pronunciation,
+                             SynonymsWordRelation, Word)
+from word_way.scrapping.bulk import MAX_PARAMETERS
+from word_way.search.statement import execute, in_list
+from word_way.utils import chunked
+
+__all__ = (
+    'PronunciationRow', 'WordRow', 'load_include_matched_words',
+    'load_pronunciations',
+)
+
+
+class WordRow:
+    """검색 응답에 필요한 :class:`~word_way.models.Word` 의 컬럼."""
+
+    __slots__ = (
+        'id', 'pronunciation_id', 'contents', 'part', 'related_pronunciations',
+    )
+
+    def __init__(
+        self,
+        id: uuid.UUID,
+        pronunciation_id: uuid.UUID,
+        contents: str,
+        part: WordPart,
+    ):
+        self.id = id
+        self.pronunciation_id = pronunciation_id
+        self.contents = contents
+        self.part = part
+        #: (:class:`list`) 의미에 포함된 발음
+        self.related_pronunciations: typing.List[str] = []
+
+
+class PronunciationRow:
+    """검색 응답에 필요한 :class:`~word_way.models.Pronunciation` 의 컬럼."""
+
+    __slots__ = 'id', 'pronunciation', 'words', 'related_words',
+
+    def __init__(self, id: uuid.UUID, pronunciation: str):
+        self.id = id
+        self.pronunciation = pronunciation
+        #: (:class:`list`) 발음에 해당하는 :class:`WordRow`
+        self.words: typing.List[WordRow] = []
+        #: (:class:`list`) 유의어 발음
+        self.related_words: typing.List[str] = []
+
+
+def execute_in(
+    session: Session,
+    statement,
+    values: typing.Collection,
+    **params,
+) -> typing.Iterator[tuple]:
+    """``:ids`` 파라미터에 ``values`` 를 나눠서 넘기며 ``statement`` 를
+    실행합니다.
+
+    """
+    for chunk in chunked(values, MAX_PARAMETERS):
+        yield from execute(session, statement, {'ids': chunk, **params})
+
+
+def word_columns():
+    return select([
+        Word.id, Word.pronunciation_id, Word.contents, Word.part,
+    ])
+
+
+@functools.lru_cache()
+def word_rows(dialect: str):
+    """발음 id 가 ``:ids`` 에 있는 단어를 찾는 문장."""
+    return word_columns().where(
+        in_list(Word.pronunciation_id, 'ids', dialect),
+    ).order_by(Word.target_code)
+
+
+@functools.lru_cache()
+def include_matched_word_rows(dialect: str):
+    """발음 id 가 ``:ids`` 에 있고, 의미에 ``:keywords`` 가 포함된 단어를
+    찾는 문장.
+
+    """
+    related = aliased(Pronunciation, name='related')
+    include = IncludeWordRelation.__table__
+    matched = select([include.c.word_id]).select_from(
+        include.join(
+            related, related.id == include.c.related_pronunciation_id,
+        )
+    ).where(in_list(related.pronunciation, 'keywords', dialect))
+    return word_columns().where(Word.id.in_(matched)).where(
+        in_list(Word.pronunciation_id, 'ids', dialect),
+    ).order_by(Word.target_code)
+
+
+@functools.lru_cache()
+def include_rows(dialect: str):
+    """단어 id 가 ``:ids`` 에 있는 단어의 ``(단어 id, 포함어 발음)``."""
+    related = aliased(Pronunciation, name='related')
+    include = IncludeWordRelation.__table__
+    return select([include.c.word_id, related.pronunciation]).select_from(
+        include.join(
+            related, related.id == include.c.related_pronunciation_id,
+        )
+    ).where(
+        in_list(include.c.word_id, 'ids', dialect),
+    ).order_by(related.pronunciation)
+
+
+@functools.lru_cache()
+def synonym_rows(dialect: str):
+    """발음 id 가 ``:ids`` 에 있는 발음의 ``(발음 id, 유의어 발음)``."""
+    related = aliased(Pronunciation, name='related')
+    synonyms = SynonymsWordRelation.__table__
+    return select([
+        synonyms.c.pronunciation_id, related.pronunciation,
+    ]).select_from(
+        synonyms.join(
+            related, related.id == synonyms.c.related_pronunciation_id,
+        )
+    ).where(
+        in_list(synonyms.c.pronunciation_id, 'ids', dialect),
+    ).order_by(related.pronunciation)
+
+
+def load_words(
+    session: Session,
+    statement,
+    pronunciation_ids: typing.Collection[uuid.UUID],
+    **params,
+) -> typing.List[WordRow]:
+    words = [
+        WordRow(id_, pronunciation_id, contents, part)
+        for id_, pronunciation_id, contents, part in execute_in(
+            session, statement, pronunciation_ids, **params,
+        )
+    ]
+    by_id = {word.id: word for word in words}
+    for word_id, pronunciation in execute_in(
+        session, include_rows(session.bind.dialect.name), by_id,
+    ):
+        by_id[word_id].related_pronunciations.append(pronunciation)
+    return words
+
+
+def load_pronunciations(
+    session: Session, pronunciations: typing.Mapping[uuid.UUID, str],
+) -> typing.Dict[uuid.UUID, PronunciationRow]:
+    """발음마다 단어와 유의어를 채운 :class:`PronunciationRow` 를 만듭니다.
+
+    :param pronunciations: ``{발음 id: 발음}``. 검색 후보가 이미 발음을 가지고
+                           있으므로 발음 테이블은 다시 읽지 않습니다
+
+    """
+    rows = {
+        id_: PronunciationRow(id_, pronunciation)
+        for id_, pronunciation in pronunciations.items()
+    }
+    if not rows:
+        return rows
+    dialect = session.bind.dialect.name
+    for word in load_words(session, word_rows(dialect), rows):
+        rows[word.pronunciation_id].words.append(word)
+    for pronunciation_id, pronunciation in execute_in(
+        session, synonym_rows(dialect), rows,
+    ):
+        rows[pronunciation_id].related_words.append(pronunciation)
+    return rows
+
+
+def load_include_matched_words(
+    session: Session,
+    keywords: typing.Sequence[str],
+    pronunciation_ids: typing.Collection[uuid.UUID],
+) -> typing.Dict[uuid.UUID, typing.List[WordRow]]:
+    """의미에 검색어가 포함된 단어를 발음 id 별로 모아서 반환합니다."""
+    if not pronunciation_ids:
+        return {}
+    result = {}
+    for word in load_words(
+        session,
+        include_matched_word_rows(session.bind.dialect.name),
+        pronunciation_ids,
+        keywords=list(keywords),
+    ):
+        result.setdefault(word.pronunciation_id, []).append(word)
+    return result
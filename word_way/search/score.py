@@ -0,0 +1,194 @@
+""":mod:`word_way.search.score` --- 검색 결과 점수
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+검색어마다 아래 점수를 더한 뒤, 둘 이상의 검색어에 걸린 발음에는 함께 걸린
+검색어 수만큼 점수를 더 줍니다.
+
+- 발음이 검색어와 같으면 :data:`SCORE_EXACT`, 검색어로 시작하면
+  :data:`SCORE_PREFIX`, 검색어를 포함하면 :data:`SCORE_INFIX`
+- 발음과 검색어의 편집 거리가 가까울수록 최대 :data:`SCORE_SIMILARITY`
+- 검색어와 유의어 관계면 :data:`SCORE_SYNONYMS`, 포함어 관계면
+  :data:`SCORE_INCLUDE`
+
+검색어에 걸린 발음은 유의어가 많을수록 유의어 하나마다 :data:`SCORE_RELATION`
+을 최대 :data:`RELATION_COUNT_LIMIT` 개까지 더 받습니다.  그래서 검색어가
+발음에 포함되기만 한 발음의 점수는 :func:`contains_score` 보다 낮지 않고
+:data:`MAX_RELATION_SCORE` 이상 높지 않습니다.
+
+검색어가 발음에 포함되면 편집 거리는 길이 차이와 같으므로, 레벤슈타인 거리는
+관계로만 걸린 후보에서만 계산합니다.
+
+점수가 높은 순서, 같은 점수라면 발음 id 순서로 정렬하며, 전체를 정렬하지 않고
+힙으로 상위 ``k`` 개만 고릅니다.
+"""
+import heapq
+import typing
+import uuid
+
+__all__ = (
+    'MAX_RELATION_SCORE', 'Candidate', 'Rank', 'contains_score',
+    'edit_distance', 'rank_candidate', 'top_k',
+)
+
+#: (:class:`int`) 발음이 검색어와 같을 때
+SCORE_EXACT = 1000
+
+#: (:class:`int`) 발음이 검색어로 시작할 때
+SCORE_PREFIX = 600
+
+#: (:class:`int`) 발음에 검색어가 포함될 때
+SCORE_INFIX = 400
+
+#: (:class:`int`) 편집 거리가 0 일 때 받는 최대 점수
+SCORE_SIMILARITY = 150
+
+#: (:class:`int`) 검색어와 유의어 관계일 때
+SCORE_SYNONYMS = 300
+
+#: (:class:`int`) 검색어가 의미에 포함될 때
+SCORE_INCLUDE = 200
+
+#: (:class:`int`) 유의어 하나마다 더하는 점수
+SCORE_RELATION = 10
+
+#: (:class:`int`) 점수에 반영하는 최대 유의어 수
+RELATION_COUNT_LIMIT = 5
+
+#: (:class:`int`) 유의어 수로 받을 수 있는 최대 점수
+MAX_RELATION_SCORE = SCORE_RELATION * RELATION_COUNT_LIMIT
+
+#: (:class:`int`) 함께 걸린 검색어 하나마다 더하는 점수
+SCORE_CO_OCCURRENCE = 500
+
+#: (:class:`int`) 검색어가 발음에 포함된 단어
+PRIORITY_PRONUNCIATION = 0
+
+#: (:class:`int`) 검색어가 유의어에 포함된 단어
+PRIORITY_SYNONYMS = 1
+
+#: (:class:`int`) 검색어가 의미에 포함된 단어
+PRIORITY_INCLUDE = 2
+
+
+class Rank(typing.NamedTuple):
+    #: (:class:`int`) 점수. 높을수록 앞에 옵니다
+    score: int
+
+    #: (:class:`int`) 가장 강하게 걸린 검색 종류 (``PRIORITY_*``)
+    priority: int
+
+
+class Candidate:
+    """검색어에 걸린 발음과 걸린 관계를 모읍니다.
+
+    :param pronunciation: 발음
+    :type pronunciation: :class:`str`
+
+    """
+
+    __slots__ = 'pronunciation', 'relations', 'relation_count',
+
+    def __init__(self, pronunciation: str, relation_count: int = 0):
+        self.pronunciation = pronunciation
+
+        #: ``(검색어, 관계 종류)`` 집합. 관계 종류는 ``synonyms``, ``includes``
+        self.relations: typing.Set[typing.Tuple[str, str]] = set()
+
+        #: (:class:`int`) 발음의 유의어 수
+        self.relation_count = relation_count
+
+
+def edit_distance(a: str, b: str) -> int:
+    """두 문자열의 레벤슈타인 거리."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (x != y),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def rank_candidate(
+    candidate: Candidate, keywords: typing.Sequence[str],
+) -> Rank:
+    text = candidate.pronunciation
+    relations = candidate.relations
+    score = 0
+    matched = 0
+    priority = PRIORITY_INCLUDE
+    for keyword in keywords:
+        keyword_score = 0
+        if text == keyword:
+            keyword_score = SCORE_EXACT
+        elif text.startswith(keyword):
+            keyword_score = SCORE_PREFIX
+        elif keyword in text:
+            keyword_score = SCORE_INFIX
+        if keyword_score:
+            priority = PRIORITY_PRONUNCIATION
+        if (keyword, 'synonyms') in relations:
+            keyword_score += SCORE_SYNONYMS
+            priority = min(priority, PRIORITY_SYNONYMS)
+        if (keyword, 'includes') in relations:
+            keyword_score += SCORE_INCLUDE
+        if keyword_score:
+            matched += 1
+            length = max(len(text), len(keyword))
+            if keyword in text:
+                distance = len(text) - len(keyword)
+            else:
+                distance = edit_distance(text, keyword)
+            score += keyword_score + SCORE_SIMILARITY * (
+                length - distance
+            ) // length
+    if matched:
+        score += SCORE_RELATION * min(
+            candidate.relation_count, RELATION_COUNT_LIMIT,
+        )
+    return Rank(score + SCORE_CO_OCCURRENCE * max(matched - 1, 0), priority)
+
+
+def contains_score(text: str, keywords: typing.Sequence[str]) -> int:
+    """관계와 유의어 수를 빼고 발음만으로 매긴 점수.
+
+    :func:`~word_way.search.query.contains_rows` 가 PostgreSQL 에서 같은
+    점수를 계산합니다.
+
+    """
+    return rank_candidate(Candidate(text), keywords).score
+
+
+def top_k(
+    candidates: typing.Mapping[uuid.UUID, Candidate],
+    keywords: typing.Sequence[str],
+    limit: typing.Optional[int] = None,
+    after: typing.Optional[typing.Tuple[int, uuid.UUID]] = None,
+) -> typing.List[typing.Tuple[uuid.UUID, Rank]]:
+    """후보의 점수를 매겨 상위 ``limit`` 개를 순서대로 반환합니다.
+
+    :param after: 이전 페이지의 마지막 ``(점수, 발음 id)``.
+                  주어지면 그 다음 결과부터 고릅니다
+
+    """
+    ranked = (
+        (-rank.score, id_, rank)
+        for id_, rank in (
+            (id_, rank_candidate(candidate, keywords))
+            for id_, candidate in candidates.items()
+        )
+    )
+    if after is not None:
+        last = -after[0], after[1]
+        ranked = (item for item in ranked if item[:2] > last)
+    if limit is None:
+        hits = sorted(ranked, key=lambda item: item[:2])
+    else:
+        hits = heapq.nsmallest(limit, ranked, key=lambda item: item[:2])
+    return [(id_, rank) for _, id_, rank in hits]
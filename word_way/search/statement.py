@@ -0,0 +1,65 @@
+""":mod:`word_way.search.statement` --- 한 번 만들어 재사용하는 검색 문장
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+검색어 목록을 문장에 직접 넣지 않고 목록 하나를 받는 바인드 파라미터로
+넘기므로, 검색어 수와 상관없이 SQL 이 같습니다.
+
+- PostgreSQL: ``= ANY(:keywords)``, ``LIKE ANY(:patterns)`` 처럼 배열 하나를
+  넘깁니다
+- SQLite: 배열이 없으므로 실행할 때 ``IN (?, ?, ...)`` 로 펼쳐지는 expanding
+  파라미터를 사용합니다
+
+문장은 :func:`functools.lru_cache` 를 붙인 함수로 데이터베이스 종류마다 한
+번만 만들고, :func:`execute` 로 실행하면 SQLAlchemy 의 ``compiled_cache`` 에서
+컴파일한 결과를 재사용합니다.
+"""
+import typing
+
+from sqlalchemy import Unicode, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import ResultProxy
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.util import LRUCache
+
+__all__ = 'execute', 'in_list', 'like_any',
+
+#: (:class:`int`) 컴파일한 문장을 기억해 둘 최대 개수
+COMPILED_CACHE_SIZE = 256
+
+#: 엔진(dialect) 마다 컴파일한 문장. 키에 문장 객체가 포함되므로
+#: 한 번 만든 문장만 실행해야 캐시가 커지지 않습니다.
+_compiled_cache = LRUCache(COMPILED_CACHE_SIZE)
+
+
+def in_list(column, name: str, dialect: str) -> ColumnElement:
+    """``column`` 이 ``name`` 파라미터로 넘길 목록에 있는지 확인하는 조건."""
+    if dialect == 'postgresql':
+        return column == any_(bindparam(name, type_=ARRAY(column.type)))
+    return column.in_(bindparam(name, expanding=True))
+
+
+def like_any(column, name: str, dialect: str) -> ColumnElement:
+    """``column`` 이 ``name`` 파라미터로 넘길 패턴 중 하나와 일치하는지
+    확인하는 조건.  PostgreSQL 에서만 사용합니다.
+
+    PostgreSQL 은 ``LIKE ANY`` 에 ``ESCAPE`` 를 붙일 수 없지만 기본 이스케이프
+    문자가 ``\\`` 이므로 :func:`~word_way.search.query.escape_like` 와 같습니다.
+
+    """
+    assert dialect == 'postgresql'
+    return column.like(any_(bindparam(name, type_=ARRAY(Unicode))))
+
+
+def execute(
+    session: Session, statement, params: typing.Mapping, **options,
+) -> ResultProxy:
+    """한 번 만든 ``statement`` 를 컴파일 캐시를 사용해서 실행합니다.
+
+    :param options: 추가로 지정할 실행 옵션 (e.g. ``stream_results``)
+
+    """
+    connection = session.connection(clause=statement).execution_options(
+        compiled_cache=_compiled_cache, **options,
+    )
+    return connection.execute(statement, params)
@@ -0,0 +1,291 @@
+""":mod:`word_way.search.suggest` --- 발음 자동 완성을 위한 접두어 색인
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+스크래핑한 발음을 자모로 분해해서 정렬된 배열에 두고, 입력한 접두어로
+시작하는 발음을 이분 탐색으로 찾습니다.  자모 단위로 비교하므로 입력 중인
+글자(e.g. ``받`` → ``바다``, ``ㅂ`` → ``바다``) 도 일치합니다.
+
+발음의 인기도는 다른 발음이 유의어나 포함어로 가리키는 관계 수입니다.  짧은
+접두어는 일치하는 발음이 많으므로 접두어마다 인기도 상위 발음을 미리 골라
+두고, 긴 접두어는 일치하는 범위만 훑습니다.
+
+인기도를 갱신하려고 :data:`REBUILD_INTERVAL` 마다 색인을 처음부터 다시 만들
+때는 새 색인을 따로 만든 뒤 바꿔 끼우므로, 그동안 다른 요청은 이전 색인을
+그대로 사용합니다.
+"""
+import bisect
+import datetime
+import heapq
+import os
+import threading
+import time
+import typing
+import uuid
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm.session import Session
+
+from word_way.models import (IncludeWordRelation, Pronunciation,
+                             SynonymsWordRelation)
+from word_way.scrapping.bulk import MAX_PARAMETERS
+from word_way.utils import chunked
+
+__all__ = 'Suggestion', 'SuggestIndex', 'decompose', 'get_suggest_index',
+
+#: (:class:`float`) 새로 스크래핑한 발음을 색인에 반영하는 최소 간격 (초)
+REFRESH_INTERVAL = 1.0
+
+#: (:class:`datetime.timedelta`) 새 발음을 읽을 때 마지막으로 읽은 발음의
+#: ``scrapped_at`` 보다 얼마나 앞서서부터 읽을지. 늦게 커밋된 발음을 놓치지
+#: 않도록 트랜잭션 길이보다 넉넉하게 잡습니다.
+UPDATE_MARGIN = datetime.timedelta(minutes=10)
+
+#: (:class:`float`) 색인을 처음부터 다시 만들어 인기도를 갱신하는 간격 (초)
+REBUILD_INTERVAL = 3600.0
+
+#: (:class:`int`) 인기도 상위 발음을 미리 골라 둘 접두어의 최대 자모 수
+TOP_PREFIX_LENGTH = 3
+
+#: (:class:`int`) 접두어마다 미리 골라 둘 발음 수
+TOP_SIZE = 20
+
+_indexes: typing.Dict[typing.Tuple[int, str], 'SuggestIndex'] = {}
+_indexes_lock = threading.Lock()
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_COUNT = 11172
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ('', *'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ')
+
+#: 두 번에 나눠 입력하는 겹모음과 겹받침
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ',
+    'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ', 'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ',
+    'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ',
+    'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+
+
+def decompose(text: str) -> str:
+    """한글 음절을 입력하는 순서대로 자모로 분해합니다.
+
+    겹모음과 겹받침도 나누므로 ``닭`` 은 ``ㄷㅏㄹㄱ`` 이 되어 ``달`` 로
+    시작합니다.
+
+    """
+    jamo = []
+    for char in text:
+        code = ord(char) - SYLLABLE_BASE
+        if 0 <= code < SYLLABLE_COUNT:
+            jamo.append(CHOSEONG[code // 588])
+            vowel = JUNGSEONG[code // 28 % 21]
+            final = JONGSEONG[code % 28]
+            jamo.append(COMPOUND_JAMO.get(vowel, vowel))
+            jamo.append(COMPOUND_JAMO.get(final, final))
+        else:
+            jamo.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(jamo)
+
+
+class Suggestion(typing.NamedTuple):
+    #: (:class:`uuid.UUID`) 발음 id
+    id: uuid.UUID
+
+    #: (:class:`str`) 발음
+    pronunciation: str
+
+    #: (:class:`int`) 인기도
+    popularity: int
+
+
+class SuggestIndex:
+    """자모로 분해한 발음을 정렬해 둔 접두어 색인.
+
+    ``keys`` 와 ``suggestions`` 는 같은 순서로 정렬된 배열이고, ``tops`` 는
+    :data:`TOP_PREFIX_LENGTH` 자모 이하의 접두어마다 ``(-인기도, 키, 발음)``
+    상위 :data:`TOP_SIZE` 개를 정렬해서 가지고 있습니다.
+
+    """
+
+    def __init__(self):
+        self.clear()
+        self.refreshed_at = 0.0
+        self.built_at = time.monotonic()
+        self.rebuilding = False
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        #: (:class:`list`) 자모로 분해한 발음
+        self.keys: typing.List[str] = []
+        #: (:class:`list`) ``keys`` 와 같은 순서의 :class:`Suggestion`
+        self.suggestions: typing.List[Suggestion] = []
+        self.tops: typing.Dict[str, list] = {}
+        self.known: typing.Set[uuid.UUID] = set()
+        #: (:class:`datetime.datetime`) 색인에 반영된 마지막 ``scrapped_at``
+        self.last_scrapped_at = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, suggestions: typing.Iterable[Suggestion]) -> None:
+        entries = []
+        for suggestion in suggestions:
+            if suggestion.id in self.known:
+                continue
+            self.known.add(suggestion.id)
+            key = decompose(suggestion.pronunciation)
+            entries.append((key, suggestion))
+            entry = -suggestion.popularity, key, suggestion
+            for length in range(1, min(len(key), TOP_PREFIX_LENGTH) + 1):
+                top = self.tops.setdefault(key[:length], [])
+                if len(top) < TOP_SIZE or entry < top[-1]:
+                    bisect.insort(top, entry)
+                    del top[TOP_SIZE:]
+        if len(entries) * 64 < len(self.keys):
+            # 스크래핑으로 조금씩 늘어날 때는 제자리에 끼워 넣습니다.
+            for key, suggestion in entries:
+                i = bisect.bisect_right(self.keys, key)
+                self.keys.insert(i, key)
+                self.suggestions.insert(i, suggestion)
+            return
+        # 정렬된 배열 뒤에 붙여서 정렬하므로 병합하는 비용만 듭니다.
+        entries = sorted(
+            [*zip(self.keys, self.suggestions), *entries],
+            key=lambda entry: entry[0],
+        )
+        self.keys = [key for key, _ in entries]
+        self.suggestions = [suggestion for _, suggestion in entries]
+
+    def suggest(self, prefix: str, limit: int = 10) -> typing.List[Suggestion]:
+        """``prefix`` 로 시작하는 발음을 인기도 순서로 ``limit`` 개 반환합니다.
+
+        인기도가 같으면 발음 순서로 정렬합니다.
+
+        """
+        key = decompose(prefix)
+        if not key or limit <= 0:
+            return []
+        if len(key) <= TOP_PREFIX_LENGTH and limit <= TOP_SIZE:
+            top = self.tops.get(key, ())
+            return [suggestion for _, _, suggestion in top[:limit]]
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + '\U0010ffff', start)
+        top = heapq.nsmallest(
+            limit,
+            range(start, end),
+            key=lambda i: (-self.suggestions[i].popularity, self.keys[i]),
+        )
+        return [self.suggestions[i] for i in top]
+
+    def start_rebuild(self) -> bool:
+        """다시 만들 때가 됐으면 다시 만드는 중이라고 표시하고 참을 반환합니다.
+
+        한 요청만 참을 받으므로 다른 요청은 그동안 이 색인을 사용합니다.
+
+        """
+        if time.monotonic() - self.built_at < REBUILD_INTERVAL:
+            return False
+        with self.lock:
+            if self.rebuilding:
+                return False
+            self.rebuilding = True
+            return True
+
+    def refresh(self, session: Session) -> None:
+        """마지막으로 반영한 뒤에 스크래핑한 발음을 색인에 추가합니다."""
+        now = time.monotonic()
+        if now - self.refreshed_at < REFRESH_INTERVAL:
+            return
+        with self.lock:
+            if now - self.refreshed_at < REFRESH_INTERVAL:
+                return
+            query = session.query(
+                Pronunciation.id,
+                Pronunciation.pronunciation,
+                Pronunciation.scrapped_at,
+            ).filter(Pronunciation.scrapped_at.isnot(None))
+            if self.last_scrapped_at is not None:
+                # ``scrapped_at`` 은 커밋보다 먼저 기록되므로 늦게 커밋된
+                # 발음을 놓치지 않도록 여유를 두고 다시 읽고, 이미 추가한
+                # 발음은 건너뜁니다.
+                query = query.filter(
+                    Pronunciation.scrapped_at >=
+                    self.last_scrapped_at - UPDATE_MARGIN,
+                )
+            rows = [
+                row for row in query.order_by(Pronunciation.scrapped_at)
+                if row[0] not in self.known
+            ]
+            if rows:
+                # 처음 만들 때는 발음마다 IN 으로 나누지 않고 한 번에 셉니다.
+                popularity = relation_counts(
+                    session,
+                    [id_ for id_, _, _ in rows] if self.known else None,
+                )
+                self.add(
+                    Suggestion(id_, text, popularity.get(id_, 0))
+                    for id_, text, _ in rows
+                )
+                self.last_scrapped_at = max(
+                    rows[-1][2], self.last_scrapped_at or rows[-1][2],
+                )
+            self.refreshed_at = time.monotonic()
+
+
+def relation_counts(
+    session: Session,
+    pronunciation_ids: typing.Optional[typing.Collection[uuid.UUID]] = None,
+) -> typing.Dict[uuid.UUID, int]:
+    """발음을 유의어나 포함어로 가리키는 관계 수를 셉니다.
+
+    ``pronunciation_ids`` 가 :const:`None` 이면 모든 발음을 셉니다.
+
+    """
+    synonyms = SynonymsWordRelation.__table__
+    include = IncludeWordRelation.__table__
+    if pronunciation_ids is None:
+        chunks = [None]
+    else:
+        chunks = chunked(pronunciation_ids, MAX_PARAMETERS // 2)
+    counts = {}
+    for chunk in chunks:
+        selects = []
+        for table in synonyms, include:
+            column = table.c.related_pronunciation_id
+            query = select([column.label('pronunciation_id')])
+            if chunk is not None:
+                query = query.where(column.in_(chunk))
+            selects.append(query)
+        relations = union_all(*selects).alias('relations')
+        counts.update(
+            (id_, count)
+            for id_, count in session.execute(
+                select([relations.c.pronunciation_id, func.count()])
+                .group_by(relations.c.pronunciation_id)
+            )
+        )
+    return counts
+
+
+def get_suggest_index(session: Session) -> SuggestIndex:
+    """세션이 연결된 데이터베이스의 색인을 최신 상태로 가져옵니다.
+
+    :data:`REBUILD_INTERVAL` 이 지났으면 새 색인을 만들어 바꿔 끼웁니다.
+
+    """
+    key = os.getpid(), str(session.bind.url)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, SuggestIndex())
+    elif index.start_rebuild():
+        try:
+            rebuilt = SuggestIndex()
+            rebuilt.refresh(session)
+        finally:
+            index.rebuilding = False
+        with _indexes_lock:
+            _indexes[key] = index = rebuilt
+    index.refresh(session)
+    return index
@@ -0,0 +1,308 @@
+""":mod:`word_way.search.traversal` --- 유의어/포함어 관계를 따라가는 탐색
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+발음에서 유의어(``synonyms``) 와 포함어(``includes``) 관계를 따라 여러 단계를
+건너가며 단어를 찾습니다.
+
+- :func:`explore`: 한 발음에서 ``depth`` 단계까지 너비 우선 탐색
+- :func:`find_path`: 두 발음 사이의 가장 짧은 길을 양방향 너비 우선 탐색으로 찾기
+
+한 단계씩 frontier 전체의 이웃을 한꺼번에 가져오므로 관계 그래프
+(:class:`GraphNeighbors`) 에서는 메모리만, DB(:class:`DatabaseNeighbors`)
+에서는 단계마다 쿼리 두 번만 사용합니다.  발음마다 최대 ``fan_out`` 개의
+이웃만 따라가고, ``deadline`` 이 지나면 그때까지 찾은 결과를 반환합니다.
+DB 에서는 frontier 가 커서 한 단계를 여러 쿼리로 나눠 가져올 때도 쿼리
+사이마다 ``deadline`` 을 확인합니다.
+"""
+import abc
+import time
+import typing
+import uuid
+
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
+
+from word_way.models import (IncludeWordRelation, Pronunciation,
+                             SynonymsWordRelation, Word)
+from word_way.scrapping.bulk import MAX_PARAMETERS, select_in
+from word_way.search.graph import RelationGraph
+from word_way.utils import chunked
+
+__all__ = (
+    'DatabaseNeighbors', 'GraphNeighbors', 'Neighbors', 'Step', 'Visit',
+    'explore', 'find_path',
+)
+
+#: 따라가는 관계 종류. 앞의 관계부터 따라갑니다.
+RELATIONS = 'synonyms', 'includes'
+
+#: 역방향으로 따라갈 때 사용하는 그래프 관계 종류
+REVERSE_KINDS = {'synonyms': 'synonym_of', 'includes': 'included_by'}
+
+Key = typing.Hashable
+Expanded = typing.Dict[Key, typing.List[typing.Tuple[Key, str]]]
+
+
+class Visit(typing.NamedTuple):
+    #: 탐색에서 찾은 발음
+    key: Key
+
+    #: (:class:`int`) 시작 발음에서 건너온 단계 수
+    depth: int
+
+    #: 이 발음으로 건너오기 직전의 발음. 시작 발음이면 None
+    parent: typing.Optional[Key]
+
+    #: (:class:`str`) 건너온 관계 종류. 시작 발음이면 None
+    relation: typing.Optional[str]
+
+
+class Step(typing.NamedTuple):
+    #: 길 위의 발음
+    key: Key
+
+    #: (:class:`str`) 이전 발음에서 건너온 관계 종류. 첫 발음이면 None
+    relation: typing.Optional[str]
+
+
+class Neighbors(abc.ABC):
+    """발음의 이웃을 찾는 공통 인터페이스."""
+
+    @abc.abstractmethod
+    def find(self, pronunciation: str) -> typing.Optional[Key]:
+        """발음을 찾습니다. 없으면 None 입니다."""
+
+    @abc.abstractmethod
+    def expand(
+        self,
+        keys: typing.Collection[Key],
+        reverse: bool = False,
+        deadline: typing.Optional[float] = None,
+    ) -> typing.Optional[Expanded]:
+        """발음마다 ``(이웃, 관계 종류)`` 목록을 :data:`RELATIONS` 순서, 같은
+        관계 안에서는 발음 순서로 반환합니다.  ``reverse`` 이면 관계를 거꾸로
+        따라갑니다.
+
+        :param deadline: :func:`time.monotonic` 기준으로 이웃 찾기를 멈출
+                         시각. 그 전에 모두 찾지 못했으면 None 을 반환합니다
+
+        """
+
+    @abc.abstractmethod
+    def describe(
+        self, keys: typing.Collection[Key],
+    ) -> typing.Dict[Key, typing.Tuple[uuid.UUID, str]]:
+        """발음마다 ``(발음 id, 발음)`` 을 반환합니다."""
+
+
+class GraphNeighbors(Neighbors):
+
+    def __init__(self, graph: RelationGraph):
+        self.graph = graph
+
+    def find(self, pronunciation: str) -> typing.Optional[int]:
+        return self.graph.find(pronunciation)
+
+    def expand(
+        self,
+        keys: typing.Collection[int],
+        reverse: bool = False,
+        deadline: typing.Optional[float] = None,
+    ) -> Expanded:
+        # 메모리에서 찾으므로 중간에 멈추지 않습니다.
+        graph = self.graph
+        return {
+            key: [
+                (neighbor, relation)
+                for relation in RELATIONS
+                for neighbor in graph.neighbors(
+                    REVERSE_KINDS[relation] if reverse else relation, key,
+                )
+            ]
+            for key in keys
+        }
+
+    def describe(
+        self, keys: typing.Collection[int],
+    ) -> typing.Dict[int, typing.Tuple[uuid.UUID, str]]:
+        graph = self.graph
+        return {key: (graph.id(key), graph.text(key)) for key in keys}
+
+
+class DatabaseNeighbors(Neighbors):
+    """관계 그래프가 없을 때 DB 에서 이웃을 찾습니다."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find(self, pronunciation: str) -> typing.Optional[uuid.UUID]:
+        return self.session.query(Pronunciation.id).filter(
+            Pronunciation.pronunciation == pronunciation,
+        ).scalar()
+
+    def expand(
+        self,
+        keys: typing.Collection[uuid.UUID],
+        reverse: bool = False,
+        deadline: typing.Optional[float] = None,
+    ) -> typing.Optional[Expanded]:
+        criteria = aliased(Pronunciation, name='criteria')
+        relation = aliased(Pronunciation, name='relation')
+        this, other = (relation, criteria) if reverse else (criteria, relation)
+        queries = {
+            'synonyms': self.session.query(
+                this.id, other.id, other.pronunciation,
+            ).select_from(SynonymsWordRelation).join(
+                criteria, criteria.id == SynonymsWordRelation.criteria_id,
+            ).join(
+                relation, relation.id == SynonymsWordRelation.relation_id,
+            ),
+            'includes': self.session.query(
+                this.id, other.id, other.pronunciation,
+            ).select_from(IncludeWordRelation).join(
+                Word, Word.id == IncludeWordRelation.criteria_id,
+            ).join(
+                criteria, criteria.id == Word.pronunciation_id,
+            ).join(
+                relation, relation.id == IncludeWordRelation.relation_id,
+            ),
+        }
+        expanded = {key: [] for key in keys}
+        for kind in RELATIONS:
+            rows = set()
+            for chunk in chunked(keys, MAX_PARAMETERS):
+                if deadline is not None and time.monotonic() > deadline:
+                    return None
+                rows.update(queries[kind].filter(this.id.in_(chunk)))
+            # 그래프와 같은 순서로 따라가도록 발음의 UTF-8 순서로 정렬합니다.
+            for key, neighbor, _ in sorted(
+                rows, key=lambda row: row[2].encode(),
+            ):
+                expanded[key].append((neighbor, kind))
+        return expanded
+
+    def describe(
+        self, keys: typing.Collection[uuid.UUID],
+    ) -> typing.Dict[uuid.UUID, typing.Tuple[uuid.UUID, str]]:
+        return {
+            id_: (id_, text)
+            for id_, text in select_in(
+                self.session,
+                (Pronunciation.id, Pronunciation.pronunciation),
+                Pronunciation.id,
+                keys,
+            )
+        }
+
+
+def explore(
+    neighbors: Neighbors,
+    source: Key,
+    depth: int,
+    fan_out: int,
+    deadline: float,
+    max_nodes: typing.Optional[int] = None,
+) -> typing.Tuple[typing.List[Visit], bool]:
+    """``source`` 에서 ``depth`` 단계까지 찾은 발음을 찾은 순서대로 반환합니다.
+
+    :param deadline: :func:`time.monotonic` 기준으로 탐색을 멈출 시각
+    :param max_nodes: 찾을 최대 발음 수
+    :return: ``(찾은 발음 목록, 제한 때문에 탐색을 끝내지 못했는지)``
+
+    """
+    visited = {source: Visit(source, 0, None, None)}
+    frontier = [source]
+    for level in range(1, depth + 1):
+        if not frontier:
+            break
+        if time.monotonic() > deadline:
+            return list(visited.values()), True
+        expanded = neighbors.expand(frontier, deadline=deadline)
+        if expanded is None:
+            return list(visited.values()), True
+        next_frontier = []
+        for key in frontier:
+            for neighbor, relation in expanded.get(key, [])[:fan_out]:
+                if neighbor in visited:
+                    continue
+                if max_nodes is not None and len(visited) >= max_nodes:
+                    return list(visited.values()), True
+                visited[neighbor] = Visit(neighbor, level, key, relation)
+                next_frontier.append(neighbor)
+        frontier = next_frontier
+    return list(visited.values()), False
+
+
+def find_path(
+    neighbors: Neighbors,
+    source: Key,
+    target: Key,
+    max_depth: int,
+    fan_out: int,
+    deadline: float,
+) -> typing.Tuple[typing.Optional[typing.List[Step]], bool]:
+    """``source`` 에서 ``target`` 까지 가장 짧은 길을 찾습니다.
+
+    양쪽에서 번갈아 frontier 가 작은 쪽을 한 단계씩 넓히다가 만나면 멈춥니다.
+
+    :param deadline: :func:`time.monotonic` 기준으로 탐색을 멈출 시각
+    :return: ``(길, 제한 때문에 탐색을 끝내지 못했는지)``.
+             ``max_depth`` 단계 안에 길이 없으면 길은 None 입니다
+
+    """
+    if source == target:
+        return [Step(source, None)], False
+    # 발음마다 (이전 발음, 관계) 를 기록합니다. 뒤쪽은 (다음 발음, 관계) 입니다.
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    for _ in range(max_depth):
+        if not forward_frontier or not backward_frontier:
+            return None, False
+        if time.monotonic() > deadline:
+            return None, True
+        reverse = len(backward_frontier) < len(forward_frontier)
+        frontier = backward_frontier if reverse else forward_frontier
+        parents, others = (backward, forward) if reverse else \
+            (forward, backward)
+        expanded = neighbors.expand(
+            frontier, reverse=reverse, deadline=deadline,
+        )
+        if expanded is None:
+            return None, True
+        next_frontier = []
+        for key in frontier:
+            for neighbor, relation in expanded.get(key, [])[:fan_out]:
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = key, relation
+                next_frontier.append(neighbor)
+                if neighbor in others:
+                    return build_path(forward, backward, neighbor), False
+        if reverse:
+            backward_frontier = next_frontier
+        else:
+            forward_frontier = next_frontier
+    return None, False
+
+
+def build_path(
+    forward: typing.Mapping[Key, typing.Optional[typing.Tuple[Key, str]]],
+    backward: typing.Mapping[Key, typing.Optional[typing.Tuple[Key, str]]],
+    meeting: Key,
+) -> typing.List[Step]:
+    path = []
+    key = meeting
+    while True:
+        parent = forward[key]
+        path.append(Step(key, parent and parent[1]))
+        if parent is None:
+            break
+        key = parent[0]
+    path.reverse()
+    key = meeting
+    while backward[key] is not None:
+        key, relation = backward[key]
+        path.append(Step(key, relation))
+    return path
@@ -1,8 +1,9 @@
 import datetime
+import typing
 
 from word_way.enum import WordPart
 
-__all__ = ('convert_word_part', 'utc_now',)
+__all__ = ('chunked', 'convert_word_part', 'utc_now',)
 
 
 def convert_word_part(part: str):
@@ -20,3 +21,15 @@ def convert_word_part(part: str):
 
 def utc_now():
     return datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc)
+
+
+def chunked(iterable: typing.Iterable, size: int) -> typing.Iterator[list]:
+    """``iterable`` 을 ``size`` 개씩 나눈 리스트를 차례로 반환합니다."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk